@@ -0,0 +1,117 @@
+from datetime import datetime
+
+import numpy as np
+from numpy.testing import assert_, assert_allclose, assert_equal
+
+from waste.classes import (
+    ArrivalEvent,
+    ArrivalTrace,
+    Cluster,
+    ShiftPlanEvent,
+)
+from waste.constants import HOURS_IN_DAY, SECONDS_IN_DAY, SECONDS_IN_HOUR
+from waste.functions import to_seconds
+
+
+def test_from_events_sorts_arrivals_per_cluster():
+    clusters = [
+        Cluster("test1", 1, [1] * HOURS_IN_DAY, 1.0, (0.0, 0.0)),
+        Cluster("test2", 2, [1] * HOURS_IN_DAY, 1.0, (0.0, 0.0)),
+    ]
+
+    now = to_seconds(datetime(2023, 8, 9, 10, 0, 0))
+    events = [
+        ArrivalEvent(now + 2 * SECONDS_IN_HOUR, clusters[0], volume=2.0),
+        ArrivalEvent(now + SECONDS_IN_HOUR, clusters[1], volume=3.0),
+        ShiftPlanEvent(now),  # not an arrival, so should be ignored
+        ArrivalEvent(now, clusters[0], volume=1.0),
+    ]
+
+    trace = ArrivalTrace.from_events(clusters, events)
+    assert_equal(len(trace), 3)
+
+    # Arrivals should be grouped by cluster, and sorted in time.
+    assert_equal(len(trace.times[0]), 2)
+    assert_(np.all(np.diff(trace.times[0]) > 0))
+    assert_allclose(trace.volumes[0], [1.0, 2.0])
+
+    assert_equal(len(trace.times[1]), 1)
+    assert_allclose(trace.volumes[1], [3.0])
+
+
+def test_advance_returns_arrivals_since_previous_call():
+    now = to_seconds(datetime(2023, 8, 9, 10, 0, 0))
+    times = now + SECONDS_IN_HOUR * np.arange(5)
+    trace = ArrivalTrace([times], [np.arange(5.0)])
+
+    # First advance to just after the second arrival. That should return the
+    # first two arrivals.
+    arr_times, volumes = trace.advance(0, now + SECONDS_IN_HOUR)
+    assert_equal(len(arr_times), 2)
+    assert_allclose(volumes, [0.0, 1.0])
+
+    # Advancing again to the same time should not return anything new.
+    arr_times, volumes = trace.advance(0, now + SECONDS_IN_HOUR)
+    assert_equal(len(arr_times), 0)
+
+    # Advancing to just before the next arrival's time should not return it
+    # either, but advancing to that time should.
+    next_time = now + 2 * SECONDS_IN_HOUR
+    arr_times, _ = trace.advance(0, next_time, inclusive=False)
+    assert_equal(len(arr_times), 0)
+
+    arr_times, volumes = trace.advance(0, next_time)
+    assert_allclose(volumes, [2.0])
+
+    # Now we advance all the way to the end, which should return the others.
+    arr_times, volumes = trace.advance(0, now + SECONDS_IN_DAY)
+    assert_equal(len(arr_times), 2)
+    assert_allclose(volumes, [3.0, 4.0])
+
+
+def test_num_arrivals():
+    now = to_seconds(datetime(2023, 8, 9, 10, 0, 0))
+    times = now + SECONDS_IN_HOUR * np.arange(5)
+    trace = ArrivalTrace([times], [np.ones(5)])
+
+    assert_equal(trace.num_arrivals(0, now - SECONDS_IN_HOUR), 0)
+    assert_equal(trace.num_arrivals(0, now), 1)  # inclusive
+    assert_equal(trace.num_arrivals(0, now + 5 * SECONDS_IN_HOUR // 2), 3)
+    assert_equal(trace.num_arrivals(0, now + SECONDS_IN_DAY), 5)
+
+    # Arrivals at exactly the given time are excluded, if so requested.
+    assert_equal(trace.num_arrivals(0, now, inclusive=False), 0)
+    assert_equal(trace.num_arrivals(0, now + SECONDS_IN_HOUR, False), 1)
+
+    # Num arrivals does not advance the trace.
+    arr_times, _ = trace.advance(0, now + SECONDS_IN_DAY)
+    assert_equal(len(arr_times), 5)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    trace = ArrivalTrace(
+        [np.array([1, 5, 9]), np.array([], dtype=int), np.array([3])],
+        [np.array([1.0, 2.0, 3.0]), np.array([]), np.array([4.0])],
+    )
+
+    where = str(tmp_path / "trace")
+    trace.save(where)
+    loaded = ArrivalTrace.load(where)
+
+    # The loaded trace should be views into the memory-mapped files, but
+    # otherwise be the same as the saved trace.
+    assert_equal(len(loaded), len(trace))
+    for idx in range(3):
+        assert_(not loaded.times[idx].flags.owndata)
+        assert_(not loaded.volumes[idx].flags.owndata)
+        assert_equal(loaded.times[idx], trace.times[idx])
+        assert_allclose(loaded.volumes[idx], trace.volumes[idx])
+
+    # Advancing the loaded trace should work just like the original trace.
+    times, volumes = loaded.advance(0, 5)
+    assert_equal(times, [1, 5])
+    assert_allclose(volumes, [1.0, 2.0])
+
+    # Saving again to the same location is fine, and keeps the existing trace.
+    trace.save(where)
+    assert_equal(len(ArrivalTrace.load(where)), len(trace))
@@ -0,0 +1,141 @@
+from datetime import date, timedelta
+
+import pytest
+from numpy.random import default_rng
+from numpy.testing import assert_, assert_allclose, assert_equal
+
+from waste.classes import ArrivalEvent, BatchSimulator, Route
+from waste.functions import generate_events, generate_trace, generate_traces
+
+
+def test_replications_have_their_own_clusters(test_db):
+    batch = BatchSimulator(
+        [default_rng(seed) for seed in range(3)],
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+    assert_equal(len(batch), 3)
+
+    # Each replication has its own clusters, so arrivals in one replication
+    # do not affect the clusters of the other replications.
+    batch.sims[1].clusters[2].arrive(10.0)
+    assert_allclose(batch.sims[1].clusters[2].volume, 10.0)
+    assert_(batch.sims[0].clusters[2] is not batch.sims[1].clusters[2])
+
+    for rep in [0, 2]:
+        assert_equal(batch.sims[rep].state.num_arrivals.sum(), 0)
+
+    # The other parts of the simulation environment are shared.
+    assert_(batch.sims[0].vehicles is batch.sims[1].vehicles)
+
+
+def test_cluster_state_is_shared_with_batch(test_db):
+    """
+    Tests that the cluster state of each replication is a row of the batch's
+    (replications x clusters) arrays, so that updates to either are visible in
+    both.
+    """
+    clusters = test_db.clusters()
+    batch = BatchSimulator(
+        [default_rng(seed) for seed in range(3)],
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        clusters,
+        test_db.vehicles(),
+    )
+
+    assert_equal(batch.volumes.shape, (3, len(clusters)))
+    assert_equal(batch.num_arrivals.shape, (3, len(clusters)))
+
+    batch.sims[1].clusters[2].arrive(10.0)
+    assert_allclose(batch.volumes[1, 2], 10.0)
+    assert_equal(batch.num_arrivals[1, 2], 1)
+    assert_equal(batch.num_arrivals.sum(), 1)
+
+    batch.volumes[2, 0] = 5.0
+    batch.num_arrivals[2, 0] = 3
+    assert_allclose(batch.sims[2].clusters[0].volume, 5.0)
+    assert_equal(batch.sims[2].clusters[0].num_arrivals, 3)
+
+
+@pytest.mark.parametrize(
+    ("observes", "store_arrivals"),
+    [((), True), ((), False), ((ArrivalEvent,), True)],
+)
+def test_same_results_as_separate_simulations(
+    test_db, make_sim, make_store, observes, store_arrivals
+):
+    """
+    Tests that simulating replications in a batch results in exactly the same
+    events and cluster state as simulating each replication separately. That
+    should also be the case when the arrivals are not stored, and when the
+    strategy observes the arrivals.
+    """
+    start = date(2023, 8, 1)
+    end = start + timedelta(days=3)
+    seeds = [1, 2, 3]
+
+    class Strategy:
+        def __init__(self, sim):
+            self.sim = sim
+            self.observes = observes
+            self.observed: list = []
+
+        def plan(self, event):
+            volumes = [c.volume for c in self.sim.clusters]
+            self.observed.append((event.time, volumes))
+            return [Route([0, 1, 2, 3, 4], self.sim.vehicles[0], event.time)]
+
+        def observe(self, event):
+            self.observed.append((event.time, event.cluster.volume))
+
+    batch = BatchSimulator(
+        [default_rng(seed) for seed in seeds],
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+    batch_stored: list[list] = [[] for _ in seeds]
+    strategies = [Strategy(sim) for sim in batch.sims]
+    batch(
+        [make_store(stored) for stored in batch_stored],
+        strategies,
+        [
+            generate_events(sim, start, end, arrivals=False)
+            for sim in batch.sims
+        ],
+        generate_traces(batch.sims, start, end),
+        store_arrivals=store_arrivals,
+    )
+
+    for rep, seed in enumerate(seeds):
+        # Each separate simulation needs fresh clusters, so we cannot re-use
+        # the test database's clusters here.
+        _, sim = make_sim(seed)
+
+        init = generate_events(sim, start, end, arrivals=False)
+        trace = generate_trace(sim, start, end)
+
+        separate: list = []
+        strategy = Strategy(sim)
+        sim(
+            make_store(separate),
+            strategy,
+            init,
+            trace,
+            store_arrivals=store_arrivals,
+        )
+
+        assert_(len(batch_stored[rep]) > 0)
+        assert_equal(batch_stored[rep], separate)
+        assert_equal(strategies[rep].observed, strategy.observed)
+        assert_equal(batch.volumes[rep], sim.state.volumes)
+        assert_equal(batch.num_arrivals[rep], sim.state.num_arrivals)
@@ -0,0 +1,127 @@
+import pickle
+from datetime import datetime
+
+from numpy.random import default_rng
+from numpy.testing import assert_, assert_equal, assert_raises
+
+from tests.helpers import NullStrategy
+from waste.classes import (
+    BreakEvent,
+    Checkpoint,
+    Event,
+    Route,
+    ServiceEvent,
+    ShiftPlanEvent,
+    Simulator,
+)
+from waste.functions import to_seconds
+from waste.queues import HeapQueue
+from waste.sinks import MemorySink
+
+
+def test_save_and_load(test_db, tmp_path):
+    sim = Simulator(
+        default_rng(0),
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+    sim.clusters[0].arrive(10.0)
+    checkpoint = Checkpoint(sim, NullStrategy(sim), HeapQueue(), iter([]))
+    checkpoint.save(str(tmp_path / "checkpoint.pkl"))
+
+    loaded = Checkpoint.load(str(tmp_path / "checkpoint.pkl"))
+    assert_(loaded.sim is not sim)
+    assert_equal(loaded.sim.clusters[0].num_arrivals, 1)
+    assert_equal(loaded.sim.clusters[0].volume, 10.0)
+
+    # The random number generator's state should also have been saved, so the
+    # loaded generator continues with exactly the same numbers.
+    assert_equal(loaded.sim.generator.random(), sim.generator.random())
+
+
+def test_load_raises_when_file_is_not_a_checkpoint(tmp_path):
+    with open(tmp_path / "not_a_checkpoint.pkl", "wb") as fh:
+        pickle.dump([1, 2, 3], fh)
+
+    with assert_raises(TypeError):
+        Checkpoint.load(str(tmp_path / "not_a_checkpoint.pkl"))
+
+
+def test_fork_replaces_strategy_and_observes_history(test_db):
+    sim = Simulator(
+        default_rng(0),
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+    history = [
+        ShiftPlanEvent(to_seconds(datetime(2023, 8, 9, 7))) for _ in range(3)
+    ]
+    checkpoint = Checkpoint(sim, NullStrategy(sim), HeapQueue(), iter([]))
+    checkpoint.history = history
+
+    class Mock:
+        observes = (Event,)
+
+        def __init__(self):
+            self.observed = []
+
+        def plan(self, event):
+            return []
+
+        def observe(self, event):
+            self.observed.append(event)
+
+    # The new strategy should replace the old one, and it should have observed
+    # all events in the history, in order.
+    strategy = Mock()
+    checkpoint.fork(strategy)
+
+    assert_(checkpoint.strategy is strategy)
+    assert_equal(strategy.observed, history)
+
+
+def test_store_results_gives_routes_new_ids(test_db):
+    sim = Simulator(
+        default_rng(0),
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+    now = to_seconds(datetime(2023, 8, 9, 7))
+    cluster = sim.clusters[0]
+    vehicle = sim.vehicles[0]
+
+    service = ServiceEvent(now + 1, 10, 7, cluster, vehicle)
+    service.seal()
+    pending = BreakEvent(now + 2, 20, 7, vehicle)
+
+    queue = HeapQueue()
+    queue.push(pending)
+
+    checkpoint = Checkpoint(sim, NullStrategy(sim), queue, iter([]))
+    checkpoint.results = [service]
+    checkpoint.routes = {
+        6: Route([1], vehicle, now - 1),  # not referenced, so not stored
+        7: Route([0], vehicle, now),
+    }
+
+    # Only the referenced route is stored, and it gets a new route ID. Both
+    # the stored and the pending events should refer to that new ID.
+    sink = MemorySink()
+    checkpoint.store_results(sink.store)
+
+    assert_equal(sink["routes"]["id_route"], [1])
+    assert_equal(sink["service_events"]["id_route"], [1])
+    assert_equal(len(checkpoint.queue), 1)
+    assert_equal(checkpoint.queue.pop().id_route, 1)
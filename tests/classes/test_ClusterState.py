@@ -0,0 +1,89 @@
+from datetime import time
+
+from numpy.testing import assert_, assert_allclose, assert_equal
+
+from waste.classes import Cluster, ClusterState
+from waste.constants import HOURS_IN_DAY
+
+
+def test_clusters_become_views_into_shared_state():
+    clusters = [
+        Cluster("a", 1, [1.0] * HOURS_IN_DAY, 100.0, (0.0, 0.0)),
+        Cluster("b", 2, [2.0] * HOURS_IN_DAY, 200.0, (0.0, 0.0)),
+    ]
+
+    # Data registered before the clusters are moved into a shared store should
+    # be carried over into that store.
+    clusters[1].arrive(5.0)
+
+    state = ClusterState.of(clusters)
+    assert_equal(len(state), 2)
+    assert_equal(state.num_arrivals, [0, 1])
+    assert_allclose(state.volumes, [0.0, 5.0])
+    assert_allclose(state.capacities, [100.0, 200.0])
+    assert_allclose(state.rates.sum(axis=1), [24.0, 48.0])
+
+    # Changes to the clusters should be reflected in the state, and the other
+    # way around.
+    clusters[0].arrive(3.0)
+    assert_equal(state.num_arrivals, [1, 1])
+    assert_allclose(state.volumes, [3.0, 5.0])
+
+    state.volumes[1] = 10.0
+    assert_allclose(clusters[1].volume, 10.0)
+
+    clusters[1].service()
+    assert_equal(state.num_arrivals, [1, 0])
+    assert_allclose(state.volumes, [3.0, 0.0])
+
+
+def test_of_reuses_existing_state():
+    clusters = [
+        Cluster("a", 1, [1.0] * HOURS_IN_DAY, 100.0, (0.0, 0.0)),
+        Cluster("b", 2, [2.0] * HOURS_IN_DAY, 200.0, (0.0, 0.0)),
+    ]
+
+    state = ClusterState.of(clusters)
+    assert_(ClusterState.of(clusters) is state)
+
+    # But a different selection of clusters gets its own state.
+    assert_(ClusterState.of(clusters[:1]) is not state)
+
+
+def test_cluster_attributes_round_trip():
+    cluster = Cluster(
+        "a",
+        1,
+        list(range(HOURS_IN_DAY)),
+        100.0,
+        (0.0, 0.0),
+        tw_late=time(15, 30, 45),
+        num_containers=3,
+        correction_factor=0.8,
+    )
+
+    assert_equal(cluster.tw_late, time(15, 30, 45))
+    assert_equal(cluster.num_containers, 3)
+    assert_allclose(cluster.corrected_capacity, 80.0)
+    assert_allclose(cluster.rates, list(range(HOURS_IN_DAY)))
+
+
+def test_copy_is_independent():
+    clusters = [
+        Cluster("a", 1, [1.0] * HOURS_IN_DAY, 100.0, (0.0, 0.0)),
+        Cluster("b", 2, [2.0] * HOURS_IN_DAY, 200.0, (0.0, 0.0)),
+    ]
+
+    state = ClusterState.of(clusters)
+    clusters[0].arrive(5.0)
+
+    # The copy starts out with the same data, but changes to either are not
+    # visible in the other.
+    other = state.copy()
+    assert_allclose(other.volumes, [5.0, 0.0])
+    assert_allclose(other.capacities, state.capacities)
+
+    other.volumes[1] = 10.0
+    clusters[0].service()
+    assert_allclose(state.volumes, [0.0, 0.0])
+    assert_allclose(other.volumes, [5.0, 10.0])
@@ -1,6 +1,20 @@
-from numpy.testing import assert_raises
+import shutil
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from itertools import pairwise
 
-from waste.classes import Database
+from numpy.testing import assert_, assert_equal, assert_raises
+
+from waste.classes import (
+    ArrivalEvent,
+    BreakEvent,
+    Database,
+    Route,
+    ServiceEvent,
+)
+from waste.constants import BUFFER_SIZE, SECONDS_IN_HOUR
+from waste.functions import to_seconds
 
 
 def test_existing_res_db_raises_unless_explicitly_allowed(tmp_path):
@@ -14,3 +28,311 @@ def test_existing_res_db_raises_unless_explicitly_allowed(tmp_path):
         Database(src_db, res_db)
 
     Database(src_db, res_db, exists_ok=True)
+
+
+def test_truncate_discards_results_stored_after_watermark(test_db):
+    cluster = test_db.clusters()[0]
+    vehicle = test_db.vehicles()[0]
+    now = to_seconds(datetime(2023, 8, 9))
+
+    def store_results():
+        event = ArrivalEvent(now, cluster, volume=1.0)
+        event.seal()
+
+        test_db.store(event)
+        return test_db.store(Route([0], vehicle, now))
+
+    store_results()
+    watermark = test_db.watermark()
+    assert_equal(watermark["routes"], 1)
+    assert_equal(watermark["arrival_events"], 1)
+
+    # Store some more results, and then truncate back to the watermark. Only
+    # the results stored before the watermark was taken should remain.
+    store_results()
+    test_db.truncate(watermark)
+    assert_equal(test_db.watermark(), watermark)
+
+    # Route IDs should continue from the watermark after truncating.
+    assert_equal(store_results(), 2)
+
+
+def test_append_offsets_route_ids(tmp_path):
+    src_db = "tests/test.db"
+    res_dbs = [str(tmp_path / "a.db"), str(tmp_path / "b.db")]
+
+    for res_db in res_dbs:
+        db = Database(src_db, res_db)
+        cluster = db.clusters()[0]
+        vehicle = db.vehicles()[0]
+        now = to_seconds(datetime(2023, 8, 9))
+
+        event = ArrivalEvent(now, cluster, volume=1.0)
+        event.seal()
+
+        db.store(event)
+        db.store(Route([0], vehicle, now))
+        db.store(Route([1], vehicle, now))
+        db.commit()
+
+    # Appending the results of the second database to the first should result
+    # in four routes, where the appended routes are given new IDs.
+    db = Database(src_db, res_dbs[0], exists_ok=True)
+    db.append(res_dbs[1])
+
+    sql = "SELECT id_route FROM routes ORDER BY id_route;"
+    assert_equal(db.write.execute(sql).fetchall(), [(1,), (2,), (3,), (4,)])
+    assert_equal(db.watermark()["arrival_events"], 2)
+
+
+def test_arrivals_are_read_in_chunks(tmp_path):
+    src_db = str(tmp_path / "src.db")
+    shutil.copy("tests/test.db", src_db)
+
+    # Insert arrivals one minute apart, in reverse order. The arrivals should
+    # be returned in time order.
+    num_arrivals = 2 * BUFFER_SIZE + 1
+    first = datetime(2023, 8, 1)
+    arrivals = [
+        ("116", str(first + timedelta(minutes=idx)), True)
+        for idx in reversed(range(num_arrivals))
+    ]
+
+    con = sqlite3.connect(src_db)
+    con.executemany("INSERT INTO arrivals VALUES (?, ?, ?);", arrivals)
+    con.commit()
+    con.close()
+
+    db = Database(src_db, ":memory:")
+    chunks = list(db.arrivals(first, first + timedelta(days=7)))
+    assert_equal([len(chunk) for chunk in chunks], [BUFFER_SIZE] * 2 + [1])
+
+    times = [when for chunk in chunks for _, when in chunk]
+    assert_equal(times[0], to_seconds(first))
+    assert_(all(frm < to for frm, to in pairwise(times)))
+
+
+def test_fast_write_groups_buffered_events_by_type(tmp_path):
+    db = Database(
+        "tests/test.db",
+        str(tmp_path / "res.db"),
+        fast_write=True,
+        buffer_size=4,
+    )
+
+    cluster = db.clusters()[0]
+    vehicle = db.vehicles()[0]
+    now = to_seconds(datetime(2023, 8, 9))
+
+    events = [
+        ArrivalEvent(now, cluster, volume=1.0),
+        ServiceEvent(now + 1, 10, 1, cluster, vehicle),
+        BreakEvent(now + 2, 20, 1, vehicle),
+        ArrivalEvent(now + 3, cluster, volume=2.0),
+        ArrivalEvent(now + 4, cluster, volume=3.0),
+    ]
+
+    for event in events:
+        event.seal()
+        db.store(event)
+
+    sql = "PRAGMA main.journal_mode;"
+    assert_equal(db.write.execute(sql).fetchone()[0], "wal")
+
+    # The source database is not ours to change, so it keeps its journal mode.
+    sql = "PRAGMA source.journal_mode;"
+    assert_equal(db.write.execute(sql).fetchone()[0], "delete")
+
+    # The first four events fill the buffer, so those are written. The last
+    # event is written only when the buffer is committed explicitly.
+    sql = "SELECT volume FROM arrival_events ORDER BY rowid;"
+    assert_equal(db.write.execute(sql).fetchall(), [(1.0,), (2.0,)])
+    assert_equal(db.watermark()["arrival_events"], 3)
+
+    assert_equal(db.write.execute(sql).fetchall(), [(1.0,), (2.0,), (3.0,)])
+    assert_equal(db.watermark()["service_events"], 1)
+    assert_equal(db.watermark()["break_events"], 1)
+
+
+def test_raises_given_invalid_buffer_or_queue_size(tmp_path):
+    res_db = str(tmp_path / "res.db")
+
+    with assert_raises(ValueError):
+        Database("tests/test.db", res_db, buffer_size=0)
+
+    with assert_raises(ValueError):
+        Database("tests/test.db", res_db, background=True, queue_size=0)
+
+
+def test_background_writes_same_as_foreground(tmp_path):
+    def store_results(db: Database) -> list[int]:
+        cluster = db.clusters()[0]
+        vehicle = db.vehicles()[0]
+        now = to_seconds(datetime(2023, 8, 9))
+
+        id_routes = []
+        for idx in range(100):
+            event = ArrivalEvent(now + idx, cluster, volume=float(idx))
+            event.seal()
+            db.store(event)
+
+            if idx % 10 == 0:
+                id_route = db.store(Route([0], vehicle, now + idx))
+                assert id_route is not None
+                id_routes.append(id_route)
+
+        return id_routes
+
+    # A small buffer and queue size ensures the writer thread is regularly
+    # behind, so storing events blocks until it catches up.
+    fg_db = Database("tests/test.db", str(tmp_path / "fg.db"), buffer_size=3)
+    bg_db = Database(
+        "tests/test.db",
+        str(tmp_path / "bg.db"),
+        buffer_size=3,
+        background=True,
+        queue_size=1,
+    )
+
+    assert_equal(store_results(bg_db), store_results(fg_db))
+    assert_equal(bg_db.watermark(), fg_db.watermark())
+
+    sql = "SELECT time, volume FROM arrival_events ORDER BY rowid;"
+    fg_rows = fg_db.write.execute(sql).fetchall()
+    assert_equal(bg_db.write.execute(sql).fetchall(), fg_rows)
+
+    # After closing, all results should be on disk, and the writer thread
+    # should have stopped.
+    event = ArrivalEvent(0, bg_db.clusters()[0], volume=1.0)
+    event.seal()
+
+    bg_db.store(event)
+    bg_db.close()
+    bg_db.close()  # closing twice is fine
+
+    con = sqlite3.connect(str(tmp_path / "bg.db"))
+    sql = "SELECT COUNT(*) FROM arrival_events;"
+    assert_equal(con.execute(sql).fetchone()[0], len(fg_rows) + 1)
+    assert_(
+        not any(t.name == "database-writer" for t in threading.enumerate())
+    )
+
+
+def test_route_ids_are_allocated_before_routes_are_written(tmp_path):
+    res_db = str(tmp_path / "res.db")
+    db = Database("tests/test.db", res_db)
+    vehicle = db.vehicles()[0]
+    now = to_seconds(datetime(2023, 8, 9))
+
+    # Routes get their IDs immediately, but are only written to the database
+    # together with the next batch of events.
+    assert_equal(db.store(Route([0], vehicle, now)), 1)
+    assert_equal(db.store(Route([1], vehicle, now)), 2)
+
+    sql = "SELECT COUNT(*) FROM routes;"
+    assert_equal(db.write.execute(sql).fetchone()[0], 0)
+
+    db.commit()
+    sql = "SELECT id_route, vehicle, start_time FROM routes;"
+    assert_equal(
+        db.write.execute(sql).fetchall(),
+        [
+            (1, vehicle.name, "2023-08-09 00:00:00"),
+            (2, vehicle.name, "2023-08-09 00:00:00"),
+        ],
+    )
+
+    # Route IDs continue after those already in an existing database.
+    db.close()
+    db = Database("tests/test.db", res_db, exists_ok=True)
+    assert_equal(db.store(Route([0], vehicle, now)), 3)
+
+
+def test_stores_route_with_given_id(test_db):
+    vehicle = test_db.vehicles()[0]
+    now = to_seconds(datetime(2023, 8, 9))
+
+    # A route ID that was allocated elsewhere is used as-is.
+    assert_equal(test_db.store(Route([0], vehicle, now), 5), 5)
+
+    test_db.commit()
+    sql = "SELECT id_route FROM routes;"
+    assert_equal(test_db.write.execute(sql).fetchall(), [(5,)])
+
+
+def test_arrival_counts_are_aggregated_by_hour_and_cluster(tmp_path):
+    db = Database(
+        "tests/test.db",
+        str(tmp_path / "res.db"),
+        buffer_size=2,
+        arrival_counts=True,
+    )
+
+    clusters = db.clusters()
+    now = to_seconds(datetime(2023, 8, 9, 10))
+
+    def store_arrival(seconds: int, idx: int, volume: float):
+        event = ArrivalEvent(now + seconds, clusters[idx], volume=volume)
+        event.seal()
+        db.store(event)
+
+    store_arrival(1, 0, 1.0)
+    store_arrival(60, 0, 2.0)
+    store_arrival(120, 1, 4.0)  # fills the buffer with two (hour, cluster)s
+    watermark = db.watermark()
+
+    # These arrivals at the first cluster are in the same hour as before, so
+    # that hour's counts are split over two rows. Those should be summed.
+    store_arrival(180, 0, 8.0)
+    store_arrival(SECONDS_IN_HOUR + 1, 0, 16.0)
+    db.commit()
+
+    sql = """
+        SELECT time, cluster, SUM(num_arrivals), SUM(volume)
+        FROM arrival_counts
+        GROUP BY time, cluster;
+    """
+    assert_equal(
+        sorted(db.write.execute(sql).fetchall()),
+        sorted(
+            [
+                ("2023-08-09 10:00:00", clusters[0].name, 3, 11.0),
+                ("2023-08-09 10:00:00", clusters[1].name, 1, 4.0),
+                ("2023-08-09 11:00:00", clusters[0].name, 1, 16.0),
+            ]
+        ),
+    )
+
+    # No arrival events are stored, and truncating also removes the counts
+    # stored since the watermark was taken.
+    assert_equal(db.watermark()["arrival_events"], 0)
+    db.truncate(watermark)
+
+    sql = "SELECT SUM(num_arrivals) FROM arrival_counts;"
+    assert_equal(db.write.execute(sql).fetchone()[0], 3)
+
+
+def test_arrival_counts_exclude_arrivals_at_start_of_hour(test_db):
+    db = Database("tests/test.db", ":memory:", arrival_counts=True)
+    cluster = db.clusters()[0]
+    now = to_seconds(datetime(2023, 8, 9, 10))
+
+    for seconds in [0, 1, SECONDS_IN_HOUR]:
+        event = ArrivalEvent(now + seconds, cluster, volume=1.0)
+        event.seal()
+        db.store(event)
+
+    db.commit()
+
+    # The arrivals at the start of each hour are stored as events, and only
+    # the arrival after the start of the hour is counted.
+    sql = "SELECT time FROM arrival_events ORDER BY time;"
+    assert_equal(
+        db.write.execute(sql).fetchall(),
+        [("2023-08-09 10:00:00",), ("2023-08-09 11:00:00",)],
+    )
+
+    sql = "SELECT time, num_arrivals FROM arrival_counts;"
+    assert_equal(
+        db.write.execute(sql).fetchall(), [("2023-08-09 10:00:00", 1)]
+    )
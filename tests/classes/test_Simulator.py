@@ -1,6 +1,8 @@
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime, time, timedelta
 from itertools import count
 
+import numpy as np
 import pytest
 from numpy.random import default_rng
 from numpy.testing import assert_, assert_equal
@@ -8,17 +10,29 @@ from numpy.testing import assert_, assert_equal
 from tests.helpers import MockStrategy, NullStrategy
 from waste.classes import (
     ArrivalEvent,
+    ArrivalTrace,
     BreakEvent,
+    Checkpoint,
     Cluster,
     Configuration,
+    Database,
     Depot,
+    Event,
     Route,
     ServiceEvent,
     ShiftPlanEvent,
     Simulator,
 )
-from waste.constants import HOURS_IN_DAY
-from waste.functions import generate_events
+from waste.constants import HOURS_IN_DAY, SECONDS_IN_DAY, SECONDS_IN_HOUR
+from waste.functions import (
+    generate_arrivals,
+    generate_events,
+    to_datetime,
+    to_seconds,
+)
+from waste.measures import MEASURES, num_arrivals, num_arrivals_per_hour
+from waste.queues import QUEUES
+from waste.strategies import PrizeCollectingStrategy, RandomStrategy
 
 
 def test_events_are_sealed_and_stored_property():
@@ -26,19 +40,19 @@ def test_events_are_sealed_and_stored_property():
     depot = Depot("depot", (0, 0))
     sim = Simulator(default_rng(0), depot, [], [], [cluster], [])
 
-    now = datetime(2023, 8, 9, 10, 0, 0)
+    now = to_seconds(datetime(2023, 8, 9, 10, 0, 0))
 
     # Create some initial events for the simulator.
     init = [
         ArrivalEvent(time=now, cluster=cluster, volume=0),
         ServiceEvent(
-            time=now + timedelta(hours=1),
-            duration=timedelta(seconds=0),
+            time=now + SECONDS_IN_HOUR,
+            duration=0,
             id_route=1,
             cluster=cluster,
             vehicle=1,
         ),
-        ShiftPlanEvent(time=now + timedelta(hours=2)),
+        ShiftPlanEvent(time=now + 2 * SECONDS_IN_HOUR),
     ]
 
     # After creation, new events are not yet sealed.
@@ -60,17 +74,23 @@ def test_events_are_sealed_and_stored_property():
         assert_(init_event.is_sealed())
 
 
-def test_stored_events_are_sorted_in_time():
-    now = datetime(2023, 8, 9)
+@pytest.mark.parametrize("queue", QUEUES.keys())
+def test_stored_events_are_sorted_in_time(queue: str):
+    now = to_seconds(datetime(2023, 8, 9))
     depot = Depot("depot", (0, 0))
     sim = Simulator(default_rng(0), depot, [], [], [], [])
     init = [
-        ShiftPlanEvent(time=now + timedelta(hours=hour))
+        ShiftPlanEvent(time=now + hour * SECONDS_IN_HOUR)
         for hour in range(5, 0, -1)
     ]
 
-    stored = []
-    sim(lambda event: stored.append(event), NullStrategy(sim), init)
+    stored: list[Event] = []
+
+    def store(item: Event | Route):
+        assert isinstance(item, Event)  # the strategy does not plan routes
+        stored.append(item)
+
+    sim(store, NullStrategy(sim), init, queue=QUEUES[queue]())
     assert_equal(stored, sorted(stored, key=lambda event: event.time))
 
 
@@ -107,14 +127,98 @@ def test_break_is_stored(test_db, start: time, duration: timedelta):
     # the same four clusters five times in a row). That takes about four
     # hours, so the break should be scheduled during that time.
     now = datetime(2023, 8, 18, 7, 0, 0)
-    routes = [Route([1, 2, 3, 4] * 5, sim.vehicles[0], now)]
+    routes = [Route([1, 2, 3, 4] * 5, sim.vehicles[0], to_seconds(now))]
     strategy = MockStrategy(sim, routes)
-    sim(mock_store, strategy, [ShiftPlanEvent(time=now)])
+    sim(mock_store, strategy, [ShiftPlanEvent(time=to_seconds(now))])
 
+    # Durations and times are stored in seconds since the epoch.
     stored_breaks = list(filter(lambda e: isinstance(e, BreakEvent), stored))
+    break_start = to_seconds(datetime.combine(now.date(), start))
     assert_equal(len(stored_breaks), 1)
-    assert_equal(stored_breaks[0].duration, duration)
-    assert_equal(stored_breaks[0].time, datetime.combine(now.date(), start))
+    assert_equal(stored_breaks[0].duration, duration.total_seconds())
+    assert_equal(stored_breaks[0].time, break_start)
+
+
+def _walk_route(
+    sim: Simulator,
+    route: Route,
+) -> list[tuple[str, int, float]]:
+    """
+    Dead simple stop-by-stop route timing, using datetimes and the simulator's
+    configuration directly. This is what the simulator's route timing should
+    agree with. Returns (event type, time, duration) tuples.
+    """
+    config = sim.config
+    durations: np.ndarray = sim.durations
+    now = to_datetime(route.start_time)
+    prev = 0
+    res = []
+
+    break_idx = 0
+    breaks = [
+        (start, dur)
+        for start, dur in config.BREAKS
+        if datetime.combine(now.date(), start) >= now
+    ]
+
+    for cluster_idx in route.plan:
+        idx = cluster_idx + 1
+        cluster = sim.clusters[cluster_idx]
+        service = (
+            config.TIME_PER_CLUSTER
+            + cluster.num_containers * config.TIME_PER_CONTAINER
+        )
+
+        if break_idx < len(breaks):
+            start, dur = breaks[break_idx]
+            break_start = datetime.combine(now.date(), start)
+            travel = timedelta(seconds=int(durations[prev, idx]))
+            back = timedelta(seconds=int(durations[idx, 0]))
+
+            if now + travel + service + back > break_start:
+                break_idx += 1
+                now = break_start
+                res.append(("B", to_seconds(now), dur.total_seconds()))
+                now += dur
+                prev = 0
+
+        now += timedelta(seconds=int(durations[prev, idx]))
+        res.append(("S", to_seconds(now), service.total_seconds()))
+        now += service
+        prev = idx
+
+    return res
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize(
+    "start",
+    [time(hour=7), time(hour=9, minute=50), time(hour=11), time(hour=22)],
+)
+def test_route_timing_same_as_walking_the_route(test_db, seed: int, start):
+    sim = Simulator(
+        default_rng(seed),
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+    # Random route plan, starting at the given time. Routes starting late in
+    # the evening run past midnight, and then have their breaks the next day.
+    gen = default_rng(seed)
+    plan = gen.integers(len(sim.clusters), size=40).tolist()
+    start_time = to_seconds(datetime.combine(date(2023, 8, 9), start))
+    route = Route(plan, sim.vehicles[0], start_time)
+
+    timing = []
+    for event in sim._plan_route(route, id_route=1):  # noqa: SLF001
+        assert isinstance(event, (BreakEvent, ServiceEvent))
+        kind = "B" if isinstance(event, BreakEvent) else "S"
+        timing.append((kind, event.time, event.duration))
+
+    assert_equal(timing, _walk_route(sim, route))
 
 
 def test_observing_events(test_db):
@@ -131,6 +235,8 @@ def test_observing_events(test_db):
     )
 
     class Mock:
+        observes = (Event,)
+
         def __init__(self, sim, **kwargs):
             pass
 
@@ -150,3 +256,401 @@ def test_observing_events(test_db):
     # Should have seen all initial events. Since the mock strategy above does
     # not generate new events, the length of seen should correspond with init.
     assert_equal(len(seen), len(init))
+
+
+def test_strategy_only_observes_subscribed_event_types(test_db):
+    """
+    Tests that the strategy only gets to see events of the types it declares
+    it observes, and none of the other events.
+    """
+    sim = Simulator(
+        default_rng(0),
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+    class Mock:
+        observes = (ServiceEvent,)
+
+        def __init__(self, sim, **kwargs):
+            pass
+
+        def plan(self, *args, **kwargs):
+            return []
+
+        def observe(self, event):
+            seen.append(event)
+
+    seen = []
+    init = generate_events(
+        sim,
+        date.today(),
+        date.today() + timedelta(days=4),
+        seed_events=True,
+    )
+    sim(lambda _: None, Mock(sim), init)
+
+    services = [event for event in init if isinstance(event, ServiceEvent)]
+    assert_(len(services) > 0)
+    assert_equal(seen, services)
+
+
+def test_strategy_without_observes_observes_all_events(test_db):
+    """
+    Tests that a strategy that does not declare the event types it observes
+    gets to see all events.
+    """
+    sim = Simulator(
+        default_rng(0),
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+    class Mock:
+        def __init__(self, sim, **kwargs):
+            pass
+
+        def plan(self, *args, **kwargs):
+            return []
+
+        def observe(self, event):
+            seen.append(event)
+
+    seen = []
+    init = generate_events(sim, date.today(), date.today() + timedelta(days=4))
+    sim(lambda _: None, Mock(sim), init)
+
+    assert_equal(len(seen), len(init))
+
+
+def test_aggregated_arrivals_same_measures_as_arrival_events(make_sim):
+    """
+    Tests that applying arrivals in bulk via an arrival trace results in
+    exactly the same performance measures as processing the arrival events
+    one-by-one.
+    """
+
+    def simulate(aggregate: bool) -> Database:
+        db, sim = make_sim(seed=1)
+
+        start = date(2023, 8, 9)
+        init = generate_events(sim, start, start + timedelta(days=3), True)
+
+        # The mock strategy returns the same routes every time, so we need to
+        # update the start time to match the shift plan event.
+        class Mock(MockStrategy):
+            def plan(self, event: ShiftPlanEvent) -> list[Route]:
+                self.routes[0].start_time = event.time
+                return self.routes
+
+        strategy = Mock(sim, [Route([0, 1, 2, 3, 4], sim.vehicles[0], 0)])
+
+        if aggregate:
+            arrivals = ArrivalTrace.from_events(sim.clusters, init)
+            others = [e for e in init if not isinstance(e, ArrivalEvent)]
+            sim(db.store, strategy, others, arrivals)
+        else:
+            sim(db.store, strategy, init)
+
+        return db
+
+    per_event = simulate(aggregate=False)
+    aggregated = simulate(aggregate=True)
+
+    for measure in MEASURES:
+        per_event_value = per_event.compute(measure)
+        assert_equal(aggregated.compute(measure), per_event_value)
+
+
+@pytest.mark.parametrize("aggregate", [False, True])
+def test_arrivals_at_shift_plan_time_happen_after_planning(
+    test_db, aggregate: bool
+):
+    """
+    Tests that arrivals at exactly the time of a shift plan event happen after
+    the shift plan is made, both when processing the arrival events one by one,
+    and when applying them in bulk from an arrival trace.
+    """
+    sim = Simulator(
+        default_rng(0),
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+    cluster = sim.clusters[0]
+    initial = cluster.num_arrivals
+    seen = []
+
+    class Mock(NullStrategy):
+        def plan(self, event: ShiftPlanEvent) -> list[Route]:
+            seen.append(cluster.num_arrivals - initial)
+            return []
+
+    # The shift plan event is queued before the arrivals, as it is with the
+    # events from generate_events().
+    now = to_seconds(datetime(2023, 8, 9, 7))
+    init: list[Event] = [ShiftPlanEvent(now)]
+    arrivals = [
+        ArrivalEvent(now + offset, cluster, volume=1.0)
+        for offset in [-1, 0, 0, 1]
+    ]
+
+    if aggregate:
+        trace = ArrivalTrace.from_events(sim.clusters, arrivals)
+        sim(lambda _: None, Mock(sim), init, trace)
+    else:
+        sim(lambda _: None, Mock(sim), [*init, *arrivals])
+
+    # Only the arrival before the shift plan has happened when planning. All
+    # arrivals have happened by the end of the simulation.
+    assert_equal(seen, [1])
+    assert_equal(cluster.num_arrivals - initial, 4)
+
+
+def test_unstored_arrivals_are_not_created(make_sim):
+    """
+    Tests that no arrival events are created for the arrivals in an arrival
+    trace when those are not stored, and the strategy does not observe them.
+    The other results should be the same as when the arrivals are stored.
+    """
+
+    def simulate(store_arrivals: bool) -> Database:
+        db, sim = make_sim(seed=1)
+
+        start = date(2023, 8, 9)
+        init = generate_events(sim, start, start + timedelta(days=3), True)
+        arrivals = ArrivalTrace.from_events(sim.clusters, init)
+        others = [e for e in init if not isinstance(e, ArrivalEvent)]
+
+        strategy = RandomStrategy(sim, clusters_per_route=2)
+        sim(
+            db.store, strategy, others, arrivals, store_arrivals=store_arrivals
+        )
+        return db
+
+    stored = simulate(store_arrivals=True)
+    unstored = simulate(store_arrivals=False)
+
+    assert_(stored.compute(num_arrivals) > 0)
+    assert_equal(unstored.compute(num_arrivals), 0)
+
+    for measure in MEASURES:
+        if measure not in (num_arrivals, num_arrivals_per_hour):
+            assert_equal(unstored.compute(measure), stored.compute(measure))
+
+
+def test_stream_events_are_pulled_only_when_due():
+    now = to_seconds(datetime(2023, 8, 9))
+    depot = Depot("depot", (0, 0))
+    sim = Simulator(default_rng(0), depot, [], [], [], [])
+
+    init = [
+        ShiftPlanEvent(time=now + 2 * hour * SECONDS_IN_HOUR)
+        for hour in range(3)
+    ]
+    stored = []
+
+    def stream():
+        for hour in range(1, 6, 2):
+            # The simulator looks ahead at most one stream event. So when the
+            # event at this hour is pulled, all events up to two hours before
+            # should already have been stored. This ensures the stream is not
+            # consumed eagerly.
+            assert_equal(len(stored), max(hour - 2, 0))
+            yield ShiftPlanEvent(time=now + hour * SECONDS_IN_HOUR)
+
+    sim(
+        lambda event: stored.append(event),
+        NullStrategy(sim),
+        init,
+        stream=stream(),
+    )
+
+    # All events should have been stored, in order of time.
+    assert_equal(len(stored), 6)
+    assert_equal(stored, sorted(stored, key=lambda event: event.time))
+
+
+@pytest.mark.parametrize("mode", ["events", "aggregate", "stream"])
+def test_resume_from_checkpoint_same_measures(make_sim, tmp_path, mode: str):
+    """
+    Tests that a simulation that is interrupted, and then resumed from its
+    last checkpoint, results in the same measures as an uninterrupted run.
+    """
+    where = str(tmp_path / "checkpoint.pkl")
+
+    def simulate(res_db: str, interrupt: bool) -> Database:
+        db, sim = make_sim(seed=1, res_db=res_db)
+
+        start = date(2023, 8, 9)
+        end = start + timedelta(days=4)
+        init = generate_events(sim, start, end, True, mode != "stream")
+        stream = generate_arrivals(sim, start, end) if mode == "stream" else []
+        strategy = RandomStrategy(sim, clusters_per_route=2)
+
+        num_calls = count(0)
+
+        def save(checkpoint: Checkpoint):
+            # Save the third checkpoint, and crash at the fourth. That leaves
+            # results in the database that were stored after the checkpoint.
+            if (call := next(num_calls)) == 3 and interrupt:
+                raise KeyboardInterrupt
+
+            if call == 2:
+                checkpoint.watermark = db.watermark()
+                checkpoint.save(where)
+
+        if mode == "aggregate":
+            arrivals = ArrivalTrace.from_events(sim.clusters, init)
+            others = [e for e in init if not isinstance(e, ArrivalEvent)]
+            sim(db.store, strategy, others, arrivals, checkpoint=save)
+        else:
+            sim(db.store, strategy, init, stream=stream, checkpoint=save)
+
+        return db
+
+    uninterrupted = simulate(str(tmp_path / "res1.db"), interrupt=False)
+
+    with pytest.raises(KeyboardInterrupt):
+        simulate(str(tmp_path / "res2.db"), interrupt=True)
+
+    db = Database("tests/test.db", str(tmp_path / "res2.db"), exists_ok=True)
+    checkpoint = Checkpoint.load(where)
+    db.truncate(checkpoint.watermark)
+    checkpoint.sim.resume(db.store, checkpoint)
+
+    for measure in MEASURES:
+        assert_equal(db.compute(measure), uninterrupted.compute(measure))
+
+
+@pytest.mark.parametrize("aggregate", [False, True])
+def test_planning_in_worker_same_results_as_sequential(
+    make_sim, make_store, aggregate: bool
+):
+    """
+    Tests that generating shift plans in a worker process, while continuing
+    with the events that cannot depend on the plan, results in exactly the
+    same stored events and routes as planning sequentially.
+    """
+
+    def simulate(executor) -> list:
+        _, sim = make_sim(seed=1)
+
+        start = date(2023, 8, 1)
+        init = generate_events(sim, start, start + timedelta(days=3))
+        strategy = RandomStrategy(sim, clusters_per_route=2)
+
+        arrivals = None
+        if aggregate:
+            arrivals = ArrivalTrace.from_events(sim.clusters, init)
+            init = [e for e in init if not isinstance(e, ArrivalEvent)]
+
+        stored: list = []
+        sim(make_store(stored), strategy, init, arrivals, executor=executor)
+        return stored
+
+    sequential = simulate(executor=None)
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        speculative = simulate(executor)
+
+    assert_(len(sequential) > 0)
+    assert_equal(speculative, sequential)
+
+
+@pytest.mark.filterwarnings("ignore::pyvrp.exceptions.EmptySolutionWarning")
+def test_planning_in_worker_keeps_strategy_state(make_sim):
+    """
+    Tests that the state the strategy changes while planning in a worker
+    process is kept. The prize-collecting strategy's overflow models update
+    their parameter estimates when planning, and should end up with the same
+    estimates and observations as when planning sequentially.
+    """
+
+    def simulate(executor) -> PrizeCollectingStrategy:
+        db, sim = make_sim(seed=1)
+
+        # No runtime, so the routes only depend on the solver's seed.
+        start = date(2023, 8, 1)
+        init = generate_events(sim, start, start + timedelta(days=3))
+        strategy = PrizeCollectingStrategy(sim, 5_000, max_runtime=0)
+
+        sim(db.store, strategy, init, executor=executor)
+        return strategy
+
+    sequential = simulate(executor=None)
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        speculative = simulate(executor)
+
+    for name, model in sequential.models.items():
+        other = speculative.models[name]
+        assert_equal(other.x, model.x)
+        assert_equal(other.data, model.data)
+
+        # The models refer to the clusters of the simulator that runs in this
+        # process, not to copies of those clusters.
+        assert_(other.cluster is speculative.sim.clusters[other.cluster.idx])
+
+    # Some estimates must have been updated from their initial values while
+    # planning, or this test would not show anything.
+    initial = np.mean(sequential.models[name].bounds, axis=1)
+    assert_(any((m.x != initial).any() for m in sequential.models.values()))
+
+
+def test_until_stops_before_first_shift_plan_at_or_after():
+    now = to_seconds(datetime(2023, 8, 9, 7))
+    depot = Depot("depot", (0, 0))
+    sim = Simulator(default_rng(0), depot, [], [], [], [])
+    init = [
+        ShiftPlanEvent(time=now + day * SECONDS_IN_DAY) for day in range(5)
+    ]
+
+    # Stopping at noon on the second day should stop just before the shift plan
+    # event on the third day. So two events should have been stored.
+    stored = []
+    until = now + SECONDS_IN_DAY + 5 * SECONDS_IN_HOUR
+    state = sim(stored.append, NullStrategy(sim), init, until=until)
+    assert_equal(len(stored), 2)
+    assert_equal(len(state.queue), 3)
+
+    # Resuming from the returned state should then simulate the rest.
+    sim.resume(stored.append, state)
+    assert_equal(stored, init)
+
+
+def test_clone_has_independent_cluster_state(test_db):
+    sim = Simulator(
+        default_rng(0),
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+    sim.clusters[0].arrive(5.0)
+    clone = sim.clone(default_rng(1))
+
+    # The clone shares the static environment, but has its own clusters that
+    # start out with the same state as the original simulator's clusters.
+    assert_(clone.distances is sim.distances)
+    assert_(clone.vehicles is sim.vehicles)
+    assert_(clone.clusters[0] is not sim.clusters[0])
+    assert_equal(clone.clusters[0].name, sim.clusters[0].name)
+    assert_equal(clone.state.volumes, sim.state.volumes)
+
+    # Changes to the clone's clusters should not affect the original.
+    clone.clusters[0].service()
+    clone.clusters[1].arrive(10.0)
+    assert_equal(sim.clusters[0].volume, 5.0)
+    assert_equal(sim.clusters[1].volume, 0.0)
@@ -1,8 +1,56 @@
 import pytest
+from numpy.random import default_rng
 
-from waste.classes import Database
+from waste.classes import Database, Route, Simulator
 
 
 @pytest.fixture(scope="function")
 def test_db():
     return Database("tests/test.db", ":memory:")
+
+
+@pytest.fixture(scope="function")
+def make_sim():
+    """
+    Returns a function that makes a simulator of the test data, with the given
+    seed, together with its own result database. Each call makes a new
+    database and simulator, so independent simulations can be compared.
+    """
+
+    def make(seed: int, res_db: str = ":memory:"):
+        db = Database("tests/test.db", res_db)
+        sim = Simulator(
+            default_rng(seed),
+            db.depot(),
+            db.distances(),
+            db.durations(),
+            db.clusters(),
+            db.vehicles(),
+        )
+
+        return db, sim
+
+    return make
+
+
+@pytest.fixture(scope="function")
+def make_store():
+    """
+    Returns a function that makes a store function for the simulator, which
+    appends a comparable summary of each stored event and route to the given
+    list. Routes get consecutive route IDs.
+    """
+
+    def make(stored: list):
+        def store(item):
+            if isinstance(item, Route):
+                stored.append((item.plan, item.vehicle.name, item.start_time))
+                return len(stored)
+
+            volume = getattr(item, "volume", None)
+            stored.append((type(item), item.time, volume))
+            return None
+
+        return store
+
+    return make
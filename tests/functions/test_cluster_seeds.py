@@ -0,0 +1,32 @@
+from numpy.testing import assert_, assert_equal
+
+from waste.classes import Cluster
+from waste.constants import HOURS_IN_DAY
+from waste.functions import cluster_seeds
+
+
+def test_seeds_are_keyed_by_cluster_name():
+    clusters = [
+        Cluster(name, 0, [0] * HOURS_IN_DAY, 0, (0.0, 0.0))
+        for name in ["a", "b", "ab"]
+    ]
+
+    seeds = cluster_seeds(42, clusters)
+    states = [seed.generate_state(4).tolist() for seed in seeds]
+
+    # All clusters get their own, different seeds.
+    assert_equal(len(seeds), 3)
+    assert_(states[0] != states[1])
+    assert_(states[0] != states[2])
+    assert_(states[1] != states[2])
+
+    # The same cluster gets the same seed, no matter which other clusters there
+    # are, or where it appears in the list of clusters.
+    other = cluster_seeds(42, clusters[::-1][:2])
+    assert_equal(other[0].generate_state(4).tolist(), states[2])
+    assert_equal(other[1].generate_state(4).tolist(), states[1])
+
+    # But with different entropy, the seeds are also different.
+    assert_(
+        cluster_seeds(43, clusters)[0].generate_state(4).tolist() != states[0]
+    )
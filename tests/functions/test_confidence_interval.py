@@ -0,0 +1,32 @@
+import pytest
+from numpy.testing import assert_allclose
+
+from waste.functions import confidence_interval
+
+
+def test_confidence_interval():
+    mean, half_width = confidence_interval([1.0, 2.0, 3.0, 4.0])
+
+    # Sample standard deviation is sqrt(5 / 3), and the 97.5% quantile of the
+    # t-distribution with three degrees of freedom is about 3.182.
+    assert_allclose(mean, 2.5)
+    assert_allclose(half_width, 3.182446 * (5 / 3) ** 0.5 / 2, rtol=1e-6)
+
+
+def test_antithetic_pairs_are_averaged():
+    # The pairs average to 2 and 3, so the pairs have a sample standard
+    # deviation of sqrt(1 / 2), and there is one degree of freedom.
+    mean, half_width = confidence_interval([1.0, 3.0, 2.0, 4.0], True)
+    assert_allclose(mean, 2.5)
+    assert_allclose(half_width, 12.706205 * 0.5, rtol=1e-6)
+
+
+def test_raises_given_invalid_values():
+    with pytest.raises(ValueError):
+        confidence_interval([1.0])
+
+    with pytest.raises(ValueError):
+        confidence_interval([1.0, 2.0, 3.0], antithetic=True)
+
+    with pytest.raises(ValueError):  # only a single antithetic pair
+        confidence_interval([1.0, 2.0], antithetic=True)
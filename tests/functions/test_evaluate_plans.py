@@ -0,0 +1,108 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable
+
+import pytest
+from numpy.random import default_rng
+from numpy.testing import assert_, assert_allclose, assert_equal, assert_raises
+
+from tests.helpers import NullStrategy, cum_value
+from waste.classes import Route, ShiftPlanEvent, Simulator
+from waste.functions import evaluate_plans, to_seconds
+from waste.strategies import Strategy
+
+# Base policy of the rollouts. This policy does not plan any routes.
+POLICY: Callable[[Simulator], Strategy] = NullStrategy
+
+
+def make_sim(test_db) -> Simulator:
+    return Simulator(
+        default_rng(0),
+        test_db.depot(),
+        test_db.distances(),
+        test_db.durations(),
+        test_db.clusters(),
+        test_db.vehicles(),
+    )
+
+
+@pytest.mark.parametrize(("num_rollouts", "num_days"), [(0, 1), (1, 0)])
+def test_raises_invalid_arguments(test_db, num_rollouts: int, num_days: int):
+    sim = make_sim(test_db)
+    event = ShiftPlanEvent(to_seconds(datetime(2023, 8, 9, 7)))
+
+    with assert_raises(ValueError):
+        evaluate_plans(sim, event, [[]], POLICY, num_rollouts, num_days)
+
+
+def test_distance_of_candidate_plans(test_db):
+    sim = make_sim(test_db)
+    now = to_seconds(datetime(2023, 8, 9, 7))
+    vehicle = sim.vehicles[0]
+    candidates = [[], [Route([0, 1, 2], vehicle, now)]]
+
+    # The base policy does not plan any routes, so the distance driven in each
+    # rollout is exactly that of the candidate plan.
+    results = evaluate_plans(
+        sim, ShiftPlanEvent(now), candidates, POLICY, 5, 2, seed=1
+    )
+
+    assert_equal(len(results), 2)
+    for result, routes in zip(results, candidates):
+        assert_equal(len(result), 5)
+        assert_allclose(result.distances, cum_value(sim.distances, routes))
+
+
+def test_servicing_reduces_overflows_at_end(test_db):
+    sim = make_sim(test_db)
+    now = to_seconds(datetime(2023, 8, 9, 7))
+    vehicle = sim.vehicles[0]
+
+    # Fill all clusters to capacity. Then every cluster overflows at the end of
+    # a rollout unless it is serviced.
+    sim.state.volumes[:] = sim.state.capacities
+    before = sim.state.volumes.copy()
+
+    plan = list(range(len(sim.clusters)))
+    candidates = [[], [Route(plan, vehicle, now)]]
+    results = evaluate_plans(
+        sim, ShiftPlanEvent(now), candidates, POLICY, 5, 1, seed=1
+    )
+
+    assert_equal(results[0].overflows, len(sim.clusters))
+    assert_(results[1].expected_overflows < results[0].expected_overflows)
+
+    # Evaluating the candidate plans should not change the simulator's state.
+    assert_equal(sim.state.volumes, before)
+
+
+def test_parallel_same_as_sequential(test_db):
+    sim = make_sim(test_db)
+    now = to_seconds(datetime(2023, 8, 9, 7))
+    vehicle = sim.vehicles[0]
+    candidates = [
+        [],
+        [Route([0], vehicle, now)],
+        [Route([1, 2], vehicle, now)],
+    ]
+
+    def evaluate(executor):
+        event = ShiftPlanEvent(now)
+        return evaluate_plans(
+            sim, event, candidates, POLICY, 4, 2, 42, executor
+        )
+
+    sequential = evaluate(None)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = evaluate(executor)
+
+    for seq, par in zip(sequential, parallel):
+        assert_equal(par.overflows, seq.overflows)
+        assert_allclose(par.excess_volumes, seq.excess_volumes)
+        assert_allclose(par.distances, seq.distances)
+
+    # The results should also be reproducible given the seed.
+    again = evaluate(None)
+    for seq, res in zip(sequential, again):
+        assert_equal(res.overflows, seq.overflows)
+        assert_allclose(res.excess_volumes, seq.excess_volumes)
@@ -0,0 +1,86 @@
+from collections import Counter
+from datetime import date, timedelta
+from itertools import pairwise
+
+import numpy as np
+from numpy.testing import assert_, assert_allclose, assert_equal
+
+from waste.classes import ArrivalEvent, Cluster, Depot, Simulator
+from waste.constants import HOURS_IN_DAY
+from waste.functions import generate_arrivals, to_datetime
+
+
+def test_arrivals_are_ordered_in_time():
+    gen = np.random.default_rng(seed=42)
+    clusters = [
+        Cluster(f"test{idx}", idx, [2] * HOURS_IN_DAY, 0, (0.0, 0.0))
+        for idx in range(5)
+    ]
+
+    depot = Depot("depot", (0, 0))
+    sim = Simulator(gen, depot, [], [], clusters, [])
+
+    today = date.today()
+    events = list(generate_arrivals(sim, today, today + timedelta(days=2)))
+
+    assert_(len(events) > 0)
+    assert_(all(isinstance(event, ArrivalEvent) for event in events))
+    assert_(all(frm.time <= to.time for frm, to in pairwise(events)))
+
+    # All clusters should have arrivals.
+    assert_equal(len({event.cluster.name for event in events}), 5)
+
+
+def test_generates_arrival_events_based_on_cluster_rates():
+    gen = np.random.default_rng(seed=42)
+
+    # No arrivals in all hours, except in the first: there we have on average
+    # 10 arrivals per hour.
+    rates = [0] * HOURS_IN_DAY
+    rates[0] = 10
+
+    cluster = Cluster("test", 1, rates, 0, (0.0, 0.0))
+    depot = Depot("depot", (0, 0))
+    sim = Simulator(gen, depot, [], [], [cluster], [])
+
+    today = date.today()
+    next_year = today.replace(year=today.year + 1)
+    bins = Counter(
+        to_datetime(e.time).hour
+        for e in generate_arrivals(sim, today, next_year)
+    )
+
+    # There are arrivals in the first hour, but none in the other hours.
+    assert_(bins[0] > 0)
+    for hour in range(1, 24):
+        assert_equal(bins[hour], 0)
+
+    # We should have approximately ten arrivals per hour, and we have #days
+    # hours. 5% tolerance because our dataset is not that large.
+    assert_allclose(bins[0] / (next_year - today).days, 10, rtol=0.05)
+
+
+def test_common_random_numbers():
+    """
+    Tests that the generated arrivals do not depend on what happens with the
+    simulator's generator after the arrival stream has been created.
+    """
+    cluster = Cluster("test", 1, [1] * HOURS_IN_DAY, 0, (0.0, 0.0))
+    depot = Depot("depot", (0, 0))
+
+    sim1 = Simulator(np.random.default_rng(1), depot, [], [], [cluster], [])
+    stream1 = generate_arrivals(sim1, date.today(), date.today())
+
+    sim2 = Simulator(np.random.default_rng(1), depot, [], [], [cluster], [])
+    stream2 = generate_arrivals(sim2, date.today(), date.today())
+
+    # Draw from the generator of the first simulator, interleaved with pulling
+    # events from the arrival stream. That should not affect the arrivals.
+    events1 = []
+    for event in stream1:
+        sim1.generator.integers(100)
+        events1.append(event)
+
+    events2 = list(stream2)
+    assert_equal([e.time for e in events1], [e.time for e in events2])
+    assert_equal([e.volume for e in events1], [e.volume for e in events2])
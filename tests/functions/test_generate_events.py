@@ -13,7 +13,7 @@ from waste.classes import (
     Vehicle,
 )
 from waste.constants import HOURS_IN_DAY
-from waste.functions import generate_events
+from waste.functions import generate_events, generate_trace, to_datetime
 
 
 def test_generates_shift_plan_events():
@@ -30,14 +30,16 @@ def test_generates_shift_plan_events():
     events = generate_events(sim, today, today)
     assert_equal(len(events), 1)
     assert_(isinstance(events[0], ShiftPlanEvent))
-    assert_equal(events[0].time.time(), sim.config.SHIFT_PLAN_TIME)
+    assert_equal(
+        to_datetime(events[0].time).time(), sim.config.SHIFT_PLAN_TIME
+    )
 
     # A shift plan event is generated for each day in [start, end].
     events = generate_events(sim, today, tomorrow)
     assert_equal(len(events), 2)
     assert_(all(isinstance(event, ShiftPlanEvent)) for event in events)
     assert_(
-        all(event.time.time() == sim.config.SHIFT_PLAN_TIME)
+        all(to_datetime(event.time).time() == sim.config.SHIFT_PLAN_TIME)
         for event in events
     )
 
@@ -72,7 +74,9 @@ def test_generates_arrival_events_based_on_cluster_rates():
     next_year = today.replace(year=today.year + 1)
     events = generate_events(sim, today, next_year)
 
-    hours = [e.time.hour for e in events if isinstance(e, ArrivalEvent)]
+    hours = [
+        to_datetime(e.time).hour for e in events if isinstance(e, ArrivalEvent)
+    ]
     bins = Counter(hours)
 
     # There are arrivals in the first hour, but none in the other hours.
@@ -98,3 +102,32 @@ def test_seed_events():
 
     # There should be more events when also seeding the strategy.
     assert_(len(seed) > len(no_seed))
+
+
+def test_arrivals_same_as_arrival_trace():
+    clusters = [
+        Cluster(f"test{idx}", idx, [2] * HOURS_IN_DAY, 0, (0.0, 0.0))
+        for idx in range(3)
+    ]
+
+    depot = Depot("depot", (0, 0))
+    today = date.today()
+    end = today + timedelta(days=2)
+
+    # The arrivals are drawn in bulk, exactly like in generate_trace(). So for
+    # the same seed, the arrivals should be the same as those in the trace.
+    sim = Simulator(np.random.default_rng(42), depot, [], [], clusters, [])
+    events = generate_events(sim, today, end)
+
+    sim = Simulator(np.random.default_rng(42), depot, [], [], clusters, [])
+    trace = generate_trace(sim, today, end)
+
+    for cluster, times, volumes in zip(clusters, trace.times, trace.volumes):
+        arrivals = [
+            event
+            for event in events
+            if isinstance(event, ArrivalEvent) and event.cluster is cluster
+        ]
+
+        assert_equal([event.time for event in arrivals], times)
+        assert_allclose([event.volume for event in arrivals], volumes)
@@ -0,0 +1,249 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from itertools import pairwise
+
+import numpy as np
+from numpy.testing import assert_, assert_allclose, assert_equal
+
+from waste.classes import Cluster, Depot, Simulator
+from waste.constants import HOURS_IN_DAY, SECONDS_IN_DAY, SECONDS_IN_HOUR
+from waste.enums import Sampling
+from waste.functions import generate_trace, to_seconds
+
+
+def test_arrivals_are_sorted_and_within_horizon():
+    gen = np.random.default_rng(seed=42)
+    clusters = [
+        Cluster(f"test{idx}", idx, [2] * HOURS_IN_DAY, 0, (0.0, 0.0))
+        for idx in range(5)
+    ]
+
+    depot = Depot("depot", (0, 0))
+    sim = Simulator(gen, depot, [], [], clusters, [])
+
+    today = date.today()
+    end = today + timedelta(days=2)
+    trace = generate_trace(sim, today, end)
+
+    assert_equal(len(trace.times), 5)
+    assert_(len(trace) > 0)
+
+    earliest = to_seconds(datetime.combine(today, time.min))
+    latest = to_seconds(datetime.combine(end, time.max))
+
+    for times, volumes in zip(trace.times, trace.volumes):
+        assert_(len(times) > 0)  # all clusters should have arrivals
+        assert_equal(len(times), len(volumes))
+        assert_(all(frm <= to for frm, to in pairwise(times)))
+        assert_(times.min() >= earliest)
+        assert_(times.max() <= latest)
+
+        # Volumes follow the configured triangular distribution.
+        low, _, high = sim.config.VOLUME_RANGE
+        assert_(np.all((low <= volumes) & (volumes <= high)))
+
+
+def test_generates_arrivals_based_on_cluster_rates():
+    gen = np.random.default_rng(seed=42)
+
+    # No arrivals in all hours, except in the first: there we have on average
+    # 10 arrivals per hour.
+    rates = [0] * HOURS_IN_DAY
+    rates[0] = 10
+
+    cluster = Cluster("test", 1, rates, 0, (0.0, 0.0))
+    depot = Depot("depot", (0, 0))
+    sim = Simulator(gen, depot, [], [], [cluster], [])
+
+    today = date.today()
+    next_year = today.replace(year=today.year + 1)
+    trace = generate_trace(sim, today, next_year)
+
+    hours = trace.times[0] % SECONDS_IN_DAY // SECONDS_IN_HOUR
+    bins = np.bincount(hours, minlength=HOURS_IN_DAY)
+
+    # There are arrivals in the first hour, but none in the other hours. We
+    # should have approximately ten arrivals per hour, and we have #days hours.
+    assert_equal(bins[1:], 0)
+    assert_allclose(bins[0] / (next_year - today).days, 10, rtol=0.05)
+
+
+def test_inversion_handles_large_rates():
+    gen = np.random.default_rng(seed=42)
+
+    # At these rates, the probability of no arrivals in an hour underflows to
+    # zero. The numbers of arrivals should still follow the rates.
+    rates = [1_000] * HOURS_IN_DAY
+    rates[0] = 10_000
+
+    cluster = Cluster("test", 1, rates, 0, (0.0, 0.0))
+    depot = Depot("depot", (0, 0))
+    sim = Simulator(gen, depot, [], [], [cluster], [])
+
+    today = date.today()
+    trace = generate_trace(sim, today, today, sampling=Sampling.INVERSION)
+
+    hours = trace.times[0] % SECONDS_IN_DAY // SECONDS_IN_HOUR
+    bins = np.bincount(hours, minlength=HOURS_IN_DAY)
+    assert_allclose(bins, rates, rtol=0.1)
+
+
+def test_cluster_arrivals_do_not_depend_on_other_clusters():
+    def make_cluster(name: str) -> Cluster:
+        return Cluster(name, 0, [2] * HOURS_IN_DAY, 0, (0.0, 0.0))
+
+    today = date.today()
+    end = today + timedelta(days=2)
+    depot = Depot("depot", (0, 0))
+
+    gen = np.random.default_rng(seed=42)
+    sim = Simulator(gen, depot, [], [], [make_cluster(c) for c in "abc"], [])
+    trace = generate_trace(sim, today, end)
+
+    # Removing cluster b, and changing the order of the other clusters should
+    # not change the arrivals at clusters a and c.
+    gen = np.random.default_rng(seed=42)
+    sim = Simulator(gen, depot, [], [], [make_cluster(c) for c in "ca"], [])
+    other = generate_trace(sim, today, end)
+
+    assert_equal(other.times[0], trace.times[2])
+    assert_equal(other.volumes[0], trace.volumes[2])
+    assert_equal(other.times[1], trace.times[0])
+    assert_equal(other.volumes[1], trace.volumes[0])
+
+
+def test_parallel_same_as_sequential():
+    clusters = [
+        Cluster(f"test{idx}", idx, [2] * HOURS_IN_DAY, 0, (0.0, 0.0))
+        for idx in range(5)
+    ]
+
+    today = date.today()
+    end = today + timedelta(days=2)
+    depot = Depot("depot", (0, 0))
+
+    gen = np.random.default_rng(seed=42)
+    sim = Simulator(gen, depot, [], [], clusters, [])
+    sequential = generate_trace(sim, today, end)
+
+    gen = np.random.default_rng(seed=42)
+    sim = Simulator(gen, depot, [], [], clusters, [])
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = generate_trace(sim, today, end, executor)
+
+    for idx in range(len(clusters)):
+        assert_equal(parallel.times[idx], sequential.times[idx])
+        assert_equal(parallel.volumes[idx], sequential.volumes[idx])
+
+
+def test_cache_reuses_trace(tmp_path):
+    clusters = [
+        Cluster(f"test{idx}", idx, [2] * HOURS_IN_DAY, 0, (0.0, 0.0))
+        for idx in range(3)
+    ]
+
+    today = date.today()
+    end = today + timedelta(days=2)
+    depot = Depot("depot", (0, 0))
+    cache_dir = str(tmp_path)
+
+    def make_trace(seed: int):
+        gen = np.random.default_rng(seed)
+        sim = Simulator(gen, depot, [], [], clusters, [])
+        trace = generate_trace(sim, today, end, cache_dir=cache_dir)
+        return trace, gen.random()
+
+    # The first call generates and caches the trace, and the second loads it
+    # from the cache. Both should leave the simulator's generator in the same
+    # state, so anything drawn afterwards is the same too.
+    trace, after = make_trace(42)
+    assert_equal(len(list(tmp_path.iterdir())), 1)
+
+    cached, cached_after = make_trace(42)
+    assert_equal(len(list(tmp_path.iterdir())), 1)
+    assert_equal(cached_after, after)
+
+    for idx in range(len(clusters)):
+        assert_equal(cached.times[idx], trace.times[idx])
+        assert_equal(cached.volumes[idx], trace.volumes[idx])
+
+    # A different seed results in a different trace, which is cached as well.
+    make_trace(43)
+    assert_equal(len(list(tmp_path.iterdir())), 2)
+
+
+def test_antithetic_arrival_counts_are_negatively_correlated():
+    clusters = [
+        Cluster(f"test{idx}", idx, [1] * HOURS_IN_DAY, 0, (0.0, 0.0))
+        for idx in range(20)
+    ]
+
+    today = date.today()
+    end = today + timedelta(days=6)
+    depot = Depot("depot", (0, 0))
+
+    def make_trace(sampling: Sampling):
+        gen = np.random.default_rng(seed=42)
+        sim = Simulator(gen, depot, [], [], clusters, [])
+        return generate_trace(sim, today, end, sampling=sampling)
+
+    trace = make_trace(Sampling.INVERSION)
+    antithetic = make_trace(Sampling.ANTITHETIC)
+
+    # Clusters with many arrivals in one trace should have few arrivals in
+    # the antithetic trace, and the other way around.
+    counts = [len(times) for times in trace.times]
+    anti_counts = [len(times) for times in antithetic.times]
+    assert_(np.corrcoef(counts, anti_counts)[0, 1] < -0.5)
+
+
+def test_stratified_arrival_counts_are_close_to_expected():
+    clusters = [
+        Cluster(f"test{idx}", idx, [2] * HOURS_IN_DAY, 0, (0.0, 0.0))
+        for idx in range(20)
+    ]
+
+    today = date.today()
+    end = today + timedelta(days=29)
+    depot = Depot("depot", (0, 0))
+
+    def deviations(sampling: Sampling) -> np.ndarray:
+        gen = np.random.default_rng(seed=42)
+        sim = Simulator(gen, depot, [], [], clusters, [])
+        trace = generate_trace(sim, today, end, sampling=sampling)
+
+        # The expected number of arrivals in each clock hour is 2 per day.
+        expected = 2 * 30
+        return np.array(
+            [
+                np.bincount(
+                    times % SECONDS_IN_DAY // SECONDS_IN_HOUR,
+                    minlength=HOURS_IN_DAY,
+                )
+                - expected
+                for times in trace.times
+            ]
+        )
+
+    # Stratifying the hourly counts over the days should result in hourly
+    # totals that are much closer to their expectation than without.
+    standard = deviations(Sampling.STANDARD)
+    stratified = deviations(Sampling.STRATIFIED)
+    assert_(np.abs(stratified).mean() < 0.5 * np.abs(standard).mean())
+
+
+def test_cache_distinguishes_sampling(tmp_path):
+    clusters = [Cluster("test", 0, [2] * HOURS_IN_DAY, 0, (0.0, 0.0))]
+
+    today = date.today()
+    end = today + timedelta(days=2)
+    depot = Depot("depot", (0, 0))
+
+    for sampling in Sampling:
+        gen = np.random.default_rng(seed=42)
+        sim = Simulator(gen, depot, [], [], clusters, [])
+        generate_trace(
+            sim, today, end, cache_dir=str(tmp_path), sampling=sampling
+        )
+
+    assert_equal(len(list(tmp_path.iterdir())), len(Sampling))
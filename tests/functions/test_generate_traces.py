@@ -0,0 +1,105 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from numpy.testing import assert_, assert_equal
+
+from waste.classes import Cluster, Depot, Simulator
+from waste.constants import HOURS_IN_DAY
+from waste.enums import Sampling
+from waste.functions import generate_trace, generate_traces
+
+
+def make_sims(seeds: list[int]) -> list[Simulator]:
+    # Clusters with different rates, including a large one, so that all the
+    # ways of drawing the numbers of arrivals are covered.
+    clusters = [
+        Cluster(f"test{idx}", idx, [rate] * HOURS_IN_DAY, 0, (0.0, 0.0))
+        for idx, rate in enumerate([0, 0.5, 2, 1_000])
+    ]
+
+    depot = Depot("depot", (0, 0))
+    return [
+        Simulator(np.random.default_rng(seed), depot, [], [], clusters, [])
+        for seed in seeds
+    ]
+
+
+@pytest.mark.parametrize("sampling", list(Sampling))
+def test_same_as_separate_traces(sampling: Sampling):
+    """
+    Tests that the traces generated for all simulators at once have exactly
+    the same arrivals as the traces generated for each simulator separately.
+    """
+    today = date.today()
+    end = today + timedelta(days=2)
+    seeds = [1, 2, 3]
+
+    sims = make_sims(seeds)
+    traces = generate_traces(sims, today, end, [sampling] * len(seeds))
+
+    for sim, trace in zip(make_sims(seeds), traces):
+        separate = generate_trace(sim, today, end, sampling=sampling)
+
+        for idx in range(len(sim.clusters)):
+            assert_equal(trace.times[idx], separate.times[idx])
+            assert_equal(trace.volumes[idx], separate.volumes[idx])
+
+
+def test_mixed_samplings_same_as_separate_traces():
+    """
+    Tests that each simulator can use its own sampling method, for example to
+    generate antithetic pairs of traces in one batch.
+    """
+    today = date.today()
+    end = today + timedelta(days=1)
+    samplings = [Sampling.STANDARD, Sampling.INVERSION, Sampling.ANTITHETIC]
+
+    traces = generate_traces(make_sims([5, 5, 5]), today, end, samplings)
+    sims = make_sims([5, 5, 5])
+
+    for sim, trace, sampling in zip(sims, traces, samplings):
+        separate = generate_trace(sim, today, end, sampling=sampling)
+
+        for idx in range(len(sim.clusters)):
+            assert_equal(trace.times[idx], separate.times[idx])
+            assert_equal(trace.volumes[idx], separate.volumes[idx])
+
+
+def test_cache_shared_with_generate_trace(tmp_path):
+    """
+    Tests that the traces are cached under the same keys as those generated by
+    ``generate_trace()``, so that either function reuses the other's cache.
+    """
+    today = date.today()
+    end = today + timedelta(days=2)
+    cache_dir = str(tmp_path)
+
+    # Caches the trace of the second simulator only. The batch then loads that
+    # one, and generates and caches the other two.
+    cached = generate_trace(make_sims([2])[0], today, end, cache_dir=cache_dir)
+    assert_equal(len(list(tmp_path.iterdir())), 1)
+
+    sims = make_sims([1, 2, 3])
+    traces = generate_traces(sims, today, end, cache_dir=cache_dir)
+    assert_equal(len(list(tmp_path.iterdir())), 3)
+
+    for idx in range(len(sims[1].clusters)):
+        assert_equal(traces[1].times[idx], cached.times[idx])
+        assert_equal(traces[1].volumes[idx], cached.volumes[idx])
+
+    # The generators of all simulators advanced as if there was no cache.
+    for sim, other in zip(sims, make_sims([1, 2, 3])):
+        generate_trace(other, today, end)
+        assert_equal(sim.generator.random(), other.generator.random())
+
+    # The traces that were generated in the batch are also loaded from the
+    # cache by generate_trace().
+    sim = make_sims([3])[0]
+    loaded = generate_trace(sim, today, end, cache_dir=cache_dir)
+    assert_equal(len(list(tmp_path.iterdir())), 3)
+    assert_(len(loaded) > 0)
+
+    for idx in range(len(sim.clusters)):
+        assert_equal(loaded.times[idx], traces[2].times[idx])
+        assert_equal(loaded.volumes[idx], traces[2].volumes[idx])
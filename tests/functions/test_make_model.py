@@ -6,7 +6,7 @@ from numpy.random import default_rng
 from numpy.testing import assert_, assert_allclose, assert_equal
 
 from waste.classes import ShiftPlanEvent, Simulator
-from waste.functions import make_model
+from waste.functions import make_model, to_seconds
 
 
 def test_required_and_prize_defaults(test_db):
@@ -23,7 +23,7 @@ def test_required_and_prize_defaults(test_db):
         test_db.vehicles(),
     )
 
-    event = ShiftPlanEvent(datetime(2023, 8, 23, 7, 0, 0))
+    event = ShiftPlanEvent(to_seconds(datetime(2023, 8, 23, 7, 0, 0)))
     model = make_model(sim, event, np.arange(len(sim.clusters)))
     assert_(all(client.required) for client in model.locations)
     assert_allclose([client.prize for client in model.locations], 0)
@@ -40,7 +40,7 @@ def test_model_filters_by_given_clusters(test_db, cluster_idcs: list[int]):
         test_db.vehicles(),
     )
 
-    event = ShiftPlanEvent(datetime(2023, 8, 23, 7, 0, 0))
+    event = ShiftPlanEvent(to_seconds(datetime(2023, 8, 23, 7, 0, 0)))
     model = make_model(sim, event, cluster_idcs)
     assert_(len(model.locations), len(cluster_idcs) + 1)  # + depot
 
@@ -55,7 +55,7 @@ def test_creating_model_with_specified_vehicles(test_db):
         test_db.vehicles(),
     )
 
-    event = ShiftPlanEvent(datetime(2023, 8, 23, 7, 0, 0))
+    event = ShiftPlanEvent(to_seconds(datetime(2023, 8, 23, 7, 0, 0)))
     model = make_model(sim, event, [0, 1, 2])
     assert_(len(sim.vehicles) > 1)
     assert_equal(len(model.vehicle_types), len(sim.vehicles))
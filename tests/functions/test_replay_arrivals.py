@@ -0,0 +1,65 @@
+import shutil
+import sqlite3
+from datetime import date, datetime
+
+import numpy as np
+from numpy.testing import assert_, assert_equal
+
+from waste.classes import ArrivalEvent, Database, Simulator
+from waste.functions import replay_arrivals, to_seconds
+
+
+def make_db(tmp_path, arrivals: list[tuple[str, str, bool]]) -> Database:
+    src_db = str(tmp_path / "src.db")
+    shutil.copy("tests/test.db", src_db)
+
+    con = sqlite3.connect(src_db)
+    con.executemany("INSERT INTO arrivals VALUES (?, ?, ?);", arrivals)
+    con.commit()
+    con.close()
+
+    return Database(src_db, ":memory:")
+
+
+def make_sim(db: Database) -> Simulator:
+    return Simulator(
+        np.random.default_rng(seed=42),
+        db.depot(),
+        db.distances(),
+        db.durations(),
+        db.clusters(),
+        db.vehicles(),
+    )
+
+
+def test_replays_successful_arrivals_in_time_order(tmp_path):
+    name = "116"
+    db = make_db(
+        tmp_path,
+        [
+            (name, "2023-08-02 10:00:00", True),
+            (name, "2023-08-01 12:30:00", True),
+            (name, "2023-08-01 13:00:00", False),  # not successful
+            (None, "2023-08-01 14:00:00", True),  # not matched to a cluster
+            ("unknown", "2023-08-01 15:00:00", True),  # not a known cluster
+            (name, "2023-08-05 09:00:00", True),  # after end
+        ],
+    )
+
+    sim = make_sim(db)
+    events = list(replay_arrivals(sim, db, date(2023, 8, 1), date(2023, 8, 2)))
+
+    assert_equal(len(events), 2)
+    assert_(all(isinstance(event, ArrivalEvent) for event in events))
+    assert_(all(event.cluster.name == name for event in events))
+    assert_equal(
+        [event.time for event in events],
+        [
+            to_seconds(datetime(2023, 8, 1, 12, 30)),
+            to_seconds(datetime(2023, 8, 2, 10)),
+        ],
+    )
+
+    # Volumes are sampled from the configured volume range.
+    low, _, high = sim.config.VOLUME_RANGE
+    assert_(all(low <= event.volume <= high for event in events))
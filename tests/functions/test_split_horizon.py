@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+
+import pytest
+from numpy.testing import assert_equal, assert_raises
+
+from waste.functions import split_horizon
+
+
+def test_single_segment_is_entire_horizon():
+    start, end = date(2023, 8, 1), date(2023, 8, 31)
+    segments = split_horizon(start, end, 1, timedelta(days=7))
+    assert_equal(segments, [(start, start, end)])
+
+
+def test_segments_cover_horizon_and_overlap_by_warmup():
+    start, end = date(2023, 8, 1), date(2023, 8, 31)
+    segments = split_horizon(start, end, 3, timedelta(days=7))
+
+    # 31 days split into three segments of 11, 10, and 10 days. The first
+    # segment has no warmup, the others start their warmup a week early.
+    assert_equal(
+        segments,
+        [
+            (date(2023, 8, 1), date(2023, 8, 1), date(2023, 8, 11)),
+            (date(2023, 8, 5), date(2023, 8, 12), date(2023, 8, 21)),
+            (date(2023, 8, 15), date(2023, 8, 22), date(2023, 8, 31)),
+        ],
+    )
+
+
+def test_warmup_does_not_start_before_horizon():
+    start, end = date(2023, 8, 1), date(2023, 8, 4)
+    segments = split_horizon(start, end, 4, timedelta(days=7))
+
+    for warmup_start, seg_start, seg_end in segments:
+        assert_equal(warmup_start, start)
+        assert_equal(seg_start, seg_end)
+
+
+@pytest.mark.parametrize("num_segments", [0, 5])
+def test_raises_invalid_number_of_segments(num_segments: int):
+    start, end = date(2023, 8, 1), date(2023, 8, 4)
+    with assert_raises(ValueError):
+        split_horizon(start, end, num_segments, timedelta(days=1))
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+import pytest
+from numpy.testing import assert_equal
+
+from waste.constants import EPOCH, SECONDS_IN_DAY
+from waste.functions import to_datetime, to_seconds
+
+
+def test_epoch_is_zero():
+    assert_equal(to_seconds(EPOCH), 0)
+    assert_equal(to_datetime(0), EPOCH)
+
+
+@pytest.mark.parametrize(
+    "when",
+    [
+        datetime(2023, 8, 9, 7, 0, 0),
+        datetime(2023, 8, 9, 23, 59, 59),
+        datetime.min,
+        datetime.max.replace(microsecond=0),
+    ],
+)
+def test_round_trip(when: datetime):
+    assert_equal(to_datetime(to_seconds(when)), when)
+
+
+def test_truncates_to_whole_seconds():
+    when = datetime(2023, 8, 9, 7, 0, 0)
+    assert_equal(to_seconds(when + timedelta(seconds=0.9)), to_seconds(when))
+
+
+def test_time_of_day():
+    # The epoch is at midnight, so the time of day is the remainder after
+    # division by the number of seconds in a day.
+    when = datetime(2023, 8, 9, 7, 30, 15)
+    assert_equal(to_seconds(when) % SECONDS_IN_DAY, 7 * 3_600 + 30 * 60 + 15)
@@ -13,6 +13,8 @@ class NullStrategy:
     Strategy that does nothing.
     """
 
+    observes = ()
+
     def __init__(self, sim: Simulator, **kwargs):
         pass
 
@@ -28,6 +30,8 @@ class MockStrategy:
     Simple mock strategy that returns the same routes upon each call.
     """
 
+    observes = ()
+
     def __init__(self, sim: Simulator, routes: list[Route], **kwargs):
         self.routes = routes
 
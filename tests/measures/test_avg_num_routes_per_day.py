@@ -12,6 +12,7 @@ from waste.classes import (
     ShiftPlanEvent,
     Simulator,
 )
+from waste.functions import to_seconds
 from waste.measures import avg_num_routes_per_day
 
 
@@ -35,7 +36,7 @@ def test_for_single_shift(test_db, visits: list[list[int]]):
         Configuration(BREAKS=tuple()),
     )
 
-    now = datetime.now()
+    now = to_seconds(datetime.now())
     routes = [Route(plan, veh, now) for plan, veh in zip(visits, sim.vehicles)]
     strategy = MockStrategy(sim, routes)
 
@@ -13,6 +13,7 @@ from waste.classes import (
     ShiftPlanEvent,
     Simulator,
 )
+from waste.functions import to_seconds
 from waste.measures import avg_route_distance
 
 
@@ -39,7 +40,7 @@ def test_for_routes_without_breaks(test_db, visits: list[list[int]]):
         Configuration(BREAKS=tuple()),  # no breaks
     )
 
-    now = datetime.now()
+    now = to_seconds(datetime.now())
     routes = [Route(plan, veh, now) for plan, veh in zip(visits, sim.vehicles)]
     events: list[Event] = [ShiftPlanEvent(time=now)]
     sim(test_db.store, MockStrategy(sim, routes), events)
@@ -82,9 +83,10 @@ def test_with_breaks(test_db, break_dur):
 
     # Single route plan visiting all five clusters three times. That takes
     # several hours, so the break should definitely be scheduled.
-    routes = [Route([0, 1, 2, 3, 4] * 4, sim.vehicles[0], now)]
+    start = to_seconds(now)
+    routes = [Route([0, 1, 2, 3, 4] * 4, sim.vehicles[0], start)]
     strategy = MockStrategy(sim, routes)
-    sim(test_db.store, strategy, [ShiftPlanEvent(time=now)])
+    sim(test_db.store, strategy, [ShiftPlanEvent(time=start)])
 
     # First check that the total distance returned by avg_route_distance is
     # indeed not the same as our simple helper would suggest, since the latter
@@ -12,6 +12,7 @@ from waste.classes import (
     ShiftPlanEvent,
     Simulator,
 )
+from waste.functions import to_seconds
 from waste.measures import avg_route_duration
 
 
@@ -42,7 +43,7 @@ def test_for_routes_without_breaks(test_db, visits: list[list[int]]):
         ),
     )
 
-    now = datetime.now()
+    now = to_seconds(datetime.now())
     routes = [Route(plan, veh, now) for plan, veh in zip(visits, sim.vehicles)]
     events: list[Event] = [ShiftPlanEvent(time=now)]
     sim(test_db.store, MockStrategy(sim, routes), events)
@@ -51,12 +52,12 @@ def test_for_routes_without_breaks(test_db, visits: list[list[int]]):
     # computing the travel duration. When we add the actual number of stops,
     # the total duration should be the same.
     num_stops = sum(len(route) for route in routes)
-    service_time = sim.config.TIME_PER_CONTAINER * num_stops
+    service_time = sim.config.TIME_PER_CONTAINER.total_seconds() * num_stops
     helper_dur = cum_value(test_db.durations(), routes) + service_time
     avg_dur = helper_dur / max(len(routes), 1)
     assert_allclose(
         test_db.compute(avg_route_duration).total_seconds(),
-        avg_dur.total_seconds(),
+        avg_dur,
     )
 
 
@@ -93,8 +94,10 @@ def test_with_breaks(test_db, container_time, break_time, between):
 
     # Single route plan visiting all five clusters three times. That takes
     # several hours, so the break should definitely be scheduled.
-    routes = [Route([0, 1, 2, 3, 4] * 3, sim.vehicles[0], now)]
-    sim(test_db.store, MockStrategy(sim, routes), [ShiftPlanEvent(time=now)])
+    start = to_seconds(now)
+    routes = [Route([0, 1, 2, 3, 4] * 3, sim.vehicles[0], start)]
+    strategy = MockStrategy(sim, routes)
+    sim(test_db.store, strategy, [ShiftPlanEvent(time=start)])
 
     # The break is had between the given two location IDs. So we should have
     # additional duration of travelling back to the depot in between, minus
@@ -103,10 +106,10 @@ def test_with_breaks(test_db, container_time, break_time, between):
     service_time = sim.config.TIME_PER_CONTAINER * len(routes[0])
     expected_dur = (
         cum_value(test_db.durations(), routes)
-        + service_time
+        + service_time.total_seconds()
         + (mat[between[0], 0] + mat[0, between[1]]).item()
         - mat[*between].item()
-        + break_time
+        + break_time.total_seconds()
     )
     measure_dur = test_db.compute(avg_route_duration)
-    assert_allclose(measure_dur.total_seconds(), expected_dur.total_seconds())
+    assert_allclose(measure_dur.total_seconds(), expected_dur)
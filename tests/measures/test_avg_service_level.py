@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import pytest
 from numpy.random import default_rng
@@ -12,6 +12,8 @@ from waste.classes import (
     ServiceEvent,
     Simulator,
 )
+from waste.constants import SECONDS_IN_HOUR
+from waste.functions import to_seconds
 from waste.measures import avg_service_level
 
 
@@ -45,12 +47,12 @@ def test_single_cluster(
     cluster = sim.clusters[0]
     assert_allclose(cluster.capacity, 4_000)
 
-    now = datetime.now()
+    now = to_seconds(datetime.now())
     events: list[Event] = []
     for hours, event_type in enumerate(event_pattern):
         # The pattern provides a sequence of service (S) and arrival (A) events
         # at the same cluster. We separate each event by an hour.
-        time = now + timedelta(hours=hours)
+        time = now + hours * SECONDS_IN_HOUR
 
         if event_type == "A":
             events.append(ArrivalEvent(time, sim.clusters[0], volume=volume))
@@ -61,7 +63,7 @@ def test_single_cluster(
             events.append(
                 ServiceEvent(
                     time,
-                    timedelta(minutes=2),
+                    120,
                     0,
                     sim.clusters[0],
                     sim.vehicles[0],
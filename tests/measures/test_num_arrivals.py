@@ -1,9 +1,11 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import pytest
 from numpy.testing import assert_equal
 
-from waste.classes import ArrivalEvent
+from waste.classes import ArrivalEvent, Database
+from waste.constants import SECONDS_IN_HOUR
+from waste.functions import to_seconds
 from waste.measures import num_arrivals
 
 
@@ -11,10 +13,10 @@ from waste.measures import num_arrivals
 def test_single_cluster(test_db, num_events: int):
     clusters = test_db.clusters()
 
-    now = datetime.now()
+    now = to_seconds(datetime.now())
     for hours in range(num_events):
         event = ArrivalEvent(
-            now + timedelta(hours=hours),
+            now + hours * SECONDS_IN_HOUR,
             clusters[0],
             volume=0.0,
         )
@@ -23,3 +25,35 @@ def test_single_cluster(test_db, num_events: int):
         test_db.store(event)
 
     assert_equal(test_db.compute(num_arrivals), num_events)
+
+
+@pytest.mark.parametrize("num_events", [0, 1, 139])
+def test_same_for_arrival_counts(num_events: int):
+    db = Database("tests/test.db", ":memory:", arrival_counts=True)
+    clusters = db.clusters()
+
+    now = to_seconds(datetime(2023, 8, 9))
+    for minutes in range(num_events):
+        event = ArrivalEvent(now + 20 * minutes, clusters[0], volume=0.0)
+        event.seal()
+        db.store(event)
+
+    assert_equal(db.compute(num_arrivals), num_events)
+
+
+def test_arrival_counts_agree_at_cutoff(test_db):
+    counts_db = Database("tests/test.db", ":memory:", arrival_counts=True)
+    clusters = test_db.clusters()
+
+    # Arrivals just before, exactly at, and after the cutoff at the start of
+    # an hour. Both ways of storing arrivals should count only the arrivals
+    # after the cutoff.
+    cutoff = datetime(2023, 8, 9, 12)
+    for offset in [-1, 0, 1, SECONDS_IN_HOUR]:
+        for db in [test_db, counts_db]:
+            event = ArrivalEvent(to_seconds(cutoff) + offset, clusters[0], 0.0)
+            event.seal()
+            db.store(event)
+
+    assert_equal(test_db.compute(num_arrivals, cutoff), 2)
+    assert_equal(counts_db.compute(num_arrivals, cutoff), 2)
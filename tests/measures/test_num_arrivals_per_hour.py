@@ -1,11 +1,12 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import numpy as np
 import pytest
 from numpy.testing import assert_equal
 
-from waste.classes import ArrivalEvent
-from waste.constants import HOURS_IN_DAY
+from waste.classes import ArrivalEvent, Database
+from waste.constants import HOURS_IN_DAY, SECONDS_IN_HOUR
+from waste.functions import to_datetime, to_seconds
 from waste.measures import num_arrivals_per_hour
 
 
@@ -13,12 +14,12 @@ from waste.measures import num_arrivals_per_hour
 def test_single_cluster(test_db, num_events: int):
     clusters = test_db.clusters()
 
-    now = datetime.now()
+    now = to_seconds(datetime.now())
     histogram = np.zeros((HOURS_IN_DAY,))
 
     for hours in range(num_events):
-        time = now + timedelta(hours=hours)
-        histogram[time.hour] += 1
+        time = now + hours * SECONDS_IN_HOUR
+        histogram[to_datetime(time).hour] += 1
 
         event = ArrivalEvent(time, clusters[0], volume=0.0)
         event.seal()
@@ -27,3 +28,46 @@ def test_single_cluster(test_db, num_events: int):
     res = test_db.compute(num_arrivals_per_hour)
     assert_equal(len(res), HOURS_IN_DAY)
     assert_equal(res, histogram)
+
+
+@pytest.mark.parametrize("num_events", [0, 1, 24, 25, 72, 73])
+def test_same_for_arrival_counts(num_events: int):
+    db = Database("tests/test.db", ":memory:", arrival_counts=True)
+    clusters = db.clusters()
+
+    now = to_seconds(datetime(2023, 8, 9, 12, 30))
+    histogram = np.zeros((HOURS_IN_DAY,))
+
+    # Several arrivals at different clusters in each hour, which are counted
+    # together for each cluster.
+    for hours in range(num_events):
+        for cluster in clusters[:2]:
+            time = now + hours * SECONDS_IN_HOUR
+            histogram[to_datetime(time).hour] += 1
+
+            event = ArrivalEvent(time, cluster, volume=0.0)
+            event.seal()
+            db.store(event)
+
+    assert_equal(db.compute(num_arrivals_per_hour), histogram)
+
+
+def test_arrival_counts_agree_at_cutoff(test_db):
+    counts_db = Database("tests/test.db", ":memory:", arrival_counts=True)
+    clusters = test_db.clusters()
+
+    # Arrivals just before, exactly at, and after the cutoff at the start of
+    # an hour. Both ways of storing arrivals should count only the arrivals
+    # after the cutoff.
+    cutoff = datetime(2023, 8, 9, 12)
+    for offset in [-1, 0, 1, SECONDS_IN_HOUR]:
+        for db in [test_db, counts_db]:
+            event = ArrivalEvent(to_seconds(cutoff) + offset, clusters[0], 0.0)
+            event.seal()
+            db.store(event)
+
+    histogram = [0] * HOURS_IN_DAY
+    histogram[12] = histogram[13] = 1
+
+    assert_equal(test_db.compute(num_arrivals_per_hour, cutoff), histogram)
+    assert_equal(counts_db.compute(num_arrivals_per_hour, cutoff), histogram)
@@ -1,9 +1,11 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import pytest
 from numpy.testing import assert_equal
 
 from waste.classes import ServiceEvent
+from waste.constants import SECONDS_IN_HOUR
+from waste.functions import to_seconds
 from waste.measures import num_services
 
 
@@ -12,11 +14,11 @@ def test_single_cluster(test_db, num_events: int):
     clusters = test_db.clusters()
     vehicles = test_db.vehicles()
 
-    now = datetime.now()
+    now = to_seconds(datetime.now())
     for hours in range(num_events):
         event = ServiceEvent(
-            now + timedelta(hours=hours),
-            timedelta(minutes=2),
+            now + hours * SECONDS_IN_HOUR,
+            120,
             0,  # slight abuse of id_route, but should be OK
             clusters[0],
             vehicles[0],
@@ -11,6 +11,7 @@ from waste.classes import (
     ShiftPlanEvent,
     Simulator,
 )
+from waste.functions import to_seconds
 from waste.measures import num_unserved_containers
 
 
@@ -34,7 +35,7 @@ def test_clusters(test_db, visits: list[int], expected: int):
         Configuration(BREAKS=tuple()),
     )
 
-    now = datetime.now()
+    now = to_seconds(datetime.now())
     strategy = MockStrategy(sim, [Route(visits, sim.vehicles[0], now)])
     sim(test_db.store, strategy, [ShiftPlanEvent(time=now)])
 
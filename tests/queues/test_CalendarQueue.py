@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+from numpy.random import default_rng
+from numpy.testing import assert_, assert_equal, assert_raises
+
+from waste.classes import ShiftPlanEvent
+from waste.constants import SECONDS_IN_DAY, SECONDS_IN_HOUR
+from waste.functions import to_seconds
+from waste.queues import CalendarQueue
+
+
+@pytest.mark.parametrize(
+    ("width", "scan_limit"),
+    [(0, 24), (-SECONDS_IN_HOUR, 24), (SECONDS_IN_HOUR, -1)],
+)
+def test_init_raises_given_invalid_arguments(width: int, scan_limit: int):
+    with assert_raises(ValueError):
+        CalendarQueue(width, scan_limit)
+
+
+@pytest.mark.parametrize(
+    "width",
+    [60, SECONDS_IN_HOUR, 6 * SECONDS_IN_HOUR],
+)
+def test_pops_events_in_order_of_time(width: int):
+    now = to_seconds(datetime(2023, 8, 9))
+    gen = default_rng(42)
+    queue = CalendarQueue(width)
+
+    # Push many events at random times over a couple of days. The queue should
+    # return them sorted in time, no matter the bucket width.
+    for minutes in gen.integers(0, 5_000, size=1_000):
+        queue.push(ShiftPlanEvent(now + 60 * int(minutes)))
+
+    assert_equal(len(queue), 1_000)
+    popped = [queue.pop() for _ in range(len(queue))]
+
+    assert_equal(len(queue), 0)
+    assert_equal(popped, sorted(popped, key=lambda event: event.time))
+
+
+def test_push_before_current_bucket():
+    now = to_seconds(datetime(2023, 8, 9))
+    queue = CalendarQueue()
+
+    queue.push(ShiftPlanEvent(now + 5 * SECONDS_IN_HOUR))
+    queue.push(ShiftPlanEvent(now + 6 * SECONDS_IN_HOUR))
+    assert_equal(queue.pop().time, now + 5 * SECONDS_IN_HOUR)
+
+    # This event is added before the current bucket of the queue. It should
+    # still be the first to be returned.
+    queue.push(ShiftPlanEvent(now))
+    assert_equal(queue.peek().time, now)
+    assert_equal(queue.pop().time, now)
+    assert_equal(queue.pop().time, now + 6 * SECONDS_IN_HOUR)
+
+
+def test_large_gap_between_events():
+    """
+    Tests that the queue handles events that are very far apart in time. This
+    happens e.g. with seed events, which happen at ``datetime.min``.
+    """
+    now = to_seconds(datetime(2023, 8, 9))
+    earliest = to_seconds(datetime.min)
+    queue = CalendarQueue(scan_limit=2)
+
+    queue.push(ShiftPlanEvent(now))
+    queue.push(ShiftPlanEvent(earliest))
+    queue.push(ShiftPlanEvent(now + 365 * SECONDS_IN_DAY))
+
+    assert_equal(queue.pop().time, earliest)
+    assert_equal(queue.pop().time, now)
+    assert_equal(queue.pop().time, now + 365 * SECONDS_IN_DAY)
+    assert_(not queue)
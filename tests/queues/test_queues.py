@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import pytest
+from numpy.testing import assert_, assert_equal
+
+from waste.classes import ShiftPlanEvent
+from waste.constants import SECONDS_IN_HOUR
+from waste.functions import to_seconds
+from waste.queues import QUEUES
+
+
+@pytest.mark.parametrize("name", QUEUES.keys())
+def test_pop_and_peek_return_earliest_event(name: str):
+    now = to_seconds(datetime(2023, 8, 9))
+    queue = QUEUES[name]()
+
+    for hour in [5, 1, 3, 2, 4]:
+        queue.push(ShiftPlanEvent(now + hour * SECONDS_IN_HOUR))
+
+    for hour in range(1, 6):
+        assert_equal(queue.peek().time, now + hour * SECONDS_IN_HOUR)
+        assert_equal(queue.pop().time, now + hour * SECONDS_IN_HOUR)
+
+    assert_equal(len(queue), 0)
+
+
+@pytest.mark.parametrize("name", QUEUES.keys())
+def test_events_at_same_time_are_first_in_first_out(name: str):
+    now = to_seconds(datetime(2023, 8, 9))
+    queue = QUEUES[name]()
+
+    events = [ShiftPlanEvent(now) for _ in range(10)]
+    for event in events:
+        queue.push(event)
+
+    # Events at the same time should be returned in the order in which they
+    # were added to the queue.
+    for event in events:
+        assert_(queue.pop() is event)
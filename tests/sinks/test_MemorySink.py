@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+from numpy.testing import assert_allclose, assert_equal
+
+from waste.classes import (
+    ArrivalEvent,
+    BreakEvent,
+    Route,
+    ServiceEvent,
+    ShiftPlanEvent,
+)
+from waste.functions import to_seconds
+from waste.sinks import MemorySink
+
+
+def test_keeps_results_in_columns(test_db):
+    sink = MemorySink()
+    cluster = test_db.clusters()[0]
+    vehicle = test_db.vehicles()[0]
+    now = to_seconds(datetime(2023, 8, 9))
+
+    for volume in [1.0, 2.0]:
+        cluster.arrive(volume)
+        event = ArrivalEvent(now, cluster, volume=volume)
+        event.seal()
+        sink.store(event)
+
+    id_route = sink.store(Route([0], vehicle, now))
+    assert_equal(id_route, 1)
+
+    service = ServiceEvent(now + 1, 10, id_route, cluster, vehicle)
+    service.seal()
+    sink.store(service)
+    sink.store(BreakEvent(now + 2, 20, id_route, vehicle))
+    sink.store(ShiftPlanEvent(now + 3))  # not stored
+
+    assert_equal(len(sink), 5)
+
+    arrivals = sink["arrival_events"]
+    assert_equal(arrivals["time"], [now, now])
+    assert_equal(arrivals["cluster"], [cluster.name, cluster.name])
+    assert_allclose(arrivals["volume"], [1.0, 2.0])
+
+    routes = sink["routes"]
+    assert_equal(routes["id_route"], [1])
+    assert_equal(routes["vehicle"], [vehicle.name])
+
+    services = sink["service_events"]
+    assert_equal(services["id_route"], [1])
+    assert_equal(services["num_arrivals"], [2])
+    assert_allclose(services["volume"], [3.0])
+
+    assert_equal(sink["break_events"]["duration"], [20])
+
+
+def test_raises_given_unknown_item():
+    with pytest.raises(TypeError):
+        MemorySink().store("not an event")  # type: ignore
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from numpy.testing import assert_equal
+
+from waste.classes import ArrivalEvent, Route
+from waste.functions import to_seconds
+from waste.sinks import NullSink
+
+
+def test_discards_events_but_returns_route_ids(test_db):
+    sink = NullSink()
+    cluster = test_db.clusters()[0]
+    vehicle = test_db.vehicles()[0]
+    now = to_seconds(datetime(2023, 8, 9))
+
+    assert_equal(sink.store(ArrivalEvent(now, cluster, volume=1.0)), None)
+    assert_equal(sink.store(Route([0], vehicle, now)), 1)
+    assert_equal(sink.store(Route([1], vehicle, now)), 2)
+
+    # A given route ID is returned as-is.
+    assert_equal(sink.store(Route([2], vehicle, now), 5), 5)
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+from numpy.testing import assert_equal
+
+from waste.classes import ArrivalEvent, Route, ServiceEvent
+from waste.functions import to_seconds
+from waste.sinks import MemorySink, NullSink, TeeSink
+
+
+def test_passes_results_to_all_sinks(test_db):
+    first = MemorySink()
+    second = MemorySink()
+    sink = TeeSink(first, second)
+
+    cluster = test_db.clusters()[0]
+    vehicle = test_db.vehicles()[0]
+    now = to_seconds(datetime(2023, 8, 9))
+
+    event = ArrivalEvent(now, cluster, volume=1.0)
+    event.seal()
+    sink.store(event)
+
+    assert_equal(sink.store(Route([0], vehicle, now)), 1)
+    assert_equal(len(first), 2)
+    assert_equal(len(second), 2)
+
+
+def test_returns_route_ids_of_first_sink(test_db):
+    null = NullSink()
+    null.store(Route([0], test_db.vehicles()[0], 0))  # advances its IDs
+
+    sink = TeeSink(null, MemorySink())
+    assert_equal(sink.store(Route([0], test_db.vehicles()[0], 0)), 2)
+
+
+def test_passes_given_route_id_to_all_sinks(test_db):
+    first = MemorySink()
+    second = MemorySink()
+    sink = TeeSink(first, second)
+
+    route = Route([0], test_db.vehicles()[0], 0)
+    assert_equal(sink.store(route, 5), 5)
+    assert_equal(first["routes"]["id_route"], [5])
+    assert_equal(second["routes"]["id_route"], [5])
+
+
+def test_other_sinks_use_route_ids_of_first_sink(test_db):
+    null = NullSink()
+    null.store(Route([0], test_db.vehicles()[0], 0))  # advances its IDs
+
+    other = MemorySink()
+    sink = TeeSink(null, other)
+
+    cluster = test_db.clusters()[0]
+    vehicle = test_db.vehicles()[0]
+    now = to_seconds(datetime(2023, 8, 9))
+
+    id_route = sink.store(Route([0], vehicle, now))
+    assert_equal(id_route, 2)
+
+    service = ServiceEvent(now + 1, 10, id_route, cluster, vehicle)
+    service.seal()
+    sink.store(service)
+
+    # The service event refers to the route, which the other sink must have
+    # stored under the same ID for the two to be joined.
+    routes = other["routes"]
+    services = other["service_events"]
+    assert_equal(routes["id_route"], [2])
+    assert_equal(services["id_route"], routes["id_route"])
+    assert_equal(routes["vehicle"], [vehicle.name])
+
+
+def test_raises_given_no_sinks():
+    with pytest.raises(ValueError):
+        TeeSink()
@@ -13,6 +13,7 @@ from waste.classes import (
     Vehicle,
 )
 from waste.constants import HOURS_IN_DAY
+from waste.functions import to_seconds
 from waste.strategies import BaselineStrategy
 
 
@@ -55,7 +56,7 @@ def test_strategy_with_a_lot_of_arrivals():
         default_rng(0),
         Depot("depot", (0, 0)),
         np.where(np.eye(4), 0, 1),
-        np.where(np.eye(4), 0, 1).astype(np.timedelta64(1, "s")),
+        np.where(np.eye(4), 0, 1),
         [
             Cluster("1", 1, [0.0] * HOURS_IN_DAY, 1.0, (0, 0)),
             Cluster("2", 2, [0.0] * HOURS_IN_DAY, 1.0, (0, 0)),
@@ -77,7 +78,7 @@ def test_strategy_with_a_lot_of_arrivals():
     # Only first two clusters have any arrivals (and a lot of them, too).
     # Since num_clusters = 2, only those two should show up in the routing
     # decisions.
-    routes = baseline.plan(ShiftPlanEvent(time=datetime.now()))
+    routes = baseline.plan(ShiftPlanEvent(time=to_seconds(datetime.now())))
     assert_equal(len(routes), 1)
     assert_equal(len(routes[0]), 2)
     assert_(0 in routes[0].plan)
@@ -94,7 +95,7 @@ def test_strategy_considers_cluster_capacities():
         default_rng(0),
         Depot("depot", (0, 0)),
         np.where(np.eye(4), 0, 1),
-        np.where(np.eye(4), 0, 1).astype(np.timedelta64(1, "s")),
+        np.where(np.eye(4), 0, 1),
         [
             Cluster("1", 1, [0.0] * HOURS_IN_DAY, 1.0, (0, 0)),
             Cluster("2", 2, [0.0] * HOURS_IN_DAY, 2.0, (0, 0)),
@@ -115,7 +116,7 @@ def test_strategy_considers_cluster_capacities():
     # Both clusters have seen two arrivals. But the second cluster has
     # double the capacity of the first. Since we can visit only a single
     # cluster, the baseline strategy should visit the smaller cluster.
-    routes = baseline.plan(ShiftPlanEvent(time=datetime.now()))
+    routes = baseline.plan(ShiftPlanEvent(time=to_seconds(datetime.now())))
     assert_equal(len(routes), 1)
     assert_equal(len(routes[0]), 1)
     assert_(0 in routes[0].plan)
@@ -130,7 +131,7 @@ def test_strategy_considers_cluster_arrival_rates():
         default_rng(0),
         Depot("depot", (0, 0)),
         np.where(np.eye(4), 0, 1),
-        np.where(np.eye(4), 0, 1).astype(np.timedelta64(1, "s")),
+        np.where(np.eye(4), 0, 1),
         [
             Cluster("1", 1, [1.0] * HOURS_IN_DAY, 1.0, (0, 0)),
             Cluster("2", 2, [2.0] * HOURS_IN_DAY, 1.0, (0, 0)),
@@ -148,7 +149,7 @@ def test_strategy_considers_cluster_arrival_rates():
     # Neither cluster has seen any arrival. The second cluster fills up
     # twice as fast as the first cluster. Since we can visit only a single
     # cluster, we should prioritise the second one.
-    routes = baseline.plan(ShiftPlanEvent(time=datetime.now()))
+    routes = baseline.plan(ShiftPlanEvent(time=to_seconds(datetime.now())))
     assert_equal(len(routes), 1)
     assert_equal(len(routes[0]), 1)
     assert_(1 in routes[0].plan)
@@ -1,5 +1,6 @@
 from datetime import date
 
+import numpy as np
 import pytest
 from numpy.random import default_rng
 from numpy.testing import assert_allclose, assert_equal, assert_raises
@@ -71,7 +72,7 @@ def test_predicted_full_clusters_are_visited(test_db, clusters: list[int]):
         # The probability estimates are forward looking, taking into account
         # that the cluster might fill up before the next shift plan event.
         # We want to avoid that by setting the rates to zero.
-        cluster.rates = [0] * HOURS_IN_DAY
+        cluster.rates = np.zeros(HOURS_IN_DAY)
 
     for idx in clusters:
         sim.clusters[idx].num_arrivals = 150
@@ -102,7 +103,7 @@ def test_visit_required_clusters(test_db):
         # The probability estimates are forward looking, taking into account
         # that the cluster might fill up before the next shift plan event.
         # We want to avoid that by setting the rates to zero.
-        cluster.rates = [0] * HOURS_IN_DAY
+        cluster.rates = np.zeros(HOURS_IN_DAY)
 
     # This ensures at least the first two clusters will be visited. Since
     # the other clusters start empty, they will not be visited, and we expect
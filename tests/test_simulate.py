@@ -0,0 +1,155 @@
+import sys
+from datetime import datetime
+
+import pytest
+from numpy.testing import assert_, assert_allclose, assert_equal
+
+from waste import simulate
+from waste.classes import Database
+from waste.measures import (
+    MEASURES,
+    avg_fill_factor,
+    avg_num_arrivals_between_service,
+    avg_route_distance,
+    num_arrivals,
+    num_services,
+)
+
+
+def parse_args(monkeypatch, *argv: str):
+    monkeypatch.setattr(sys, "argv", ["simulate", *argv])
+    args = simulate.parse_args()
+    simulate.validate_args(args)
+    return args
+
+
+def test_segments_same_as_sequential_segments(tmp_path, monkeypatch):
+    """
+    Tests that simulating the horizon segments in parallel worker processes
+    results in the same measures as simulating those segments one after the
+    other in this process, and combining their results.
+    """
+    args = parse_args(
+        monkeypatch,
+        "--seed=1",
+        "--start=2023-08-01",
+        "--end=2023-08-06",
+        "--num_segments=2",
+        "--segment_warmup=1",
+        "random",
+        "--clusters_per_route=2",
+        "tests/test.db",
+        str(tmp_path / "parallel.db"),
+    )
+
+    simulate.simulate_segments(args)
+    parallel = Database("tests/test.db", args.res_db, exists_ok=True)
+
+    (tmp_path / "segments").mkdir()
+    sequential = Database("tests/test.db", str(tmp_path / "sequential.db"))
+    for job in simulate.segment_jobs(args, str(tmp_path / "segments")):
+        simulate.simulate_segment(*job)
+        sequential.append(job[1])
+
+    assert_(sequential.compute(num_arrivals) > 0)
+    for measure in MEASURES:
+        assert_equal(parallel.compute(measure), sequential.compute(measure))
+
+
+def test_segments_agree_with_sequential_run(tmp_path, monkeypatch):
+    """
+    Tests that the measures of a horizon simulated in parallel segments agree
+    with those of a single sequential run, within statistical tolerance. The
+    segments after the first use other seeds than the sequential run, so the
+    results are not exactly the same. But after its warmup period, each
+    segment should behave like the sequential run does at that time.
+    """
+    argv = [
+        "--seed=1",
+        "--start=2023-08-01",
+        "--end=2023-08-29",
+        "random",
+        "--clusters_per_route=2",
+        "tests/test.db",
+    ]
+
+    args = parse_args(
+        monkeypatch,
+        "--num_segments=2",
+        "--segment_warmup=7",
+        *argv,
+        str(tmp_path / "parallel.db"),
+    )
+
+    simulate.simulate_segments(args)
+    parallel = Database("tests/test.db", args.res_db, exists_ok=True)
+
+    args = parse_args(monkeypatch, *argv, str(tmp_path / "sequential.db"))
+    sequential = Database("tests/test.db", args.res_db)
+    simulate.simulate(args, sequential)
+
+    # Seed-to-seed differences in these measures are about one percent over
+    # this horizon, so a five percent difference would not be due to chance.
+    # The measures are computed after the first week, to skip the initial
+    # transient of both runs.
+    after = datetime(2023, 8, 8)
+    measures = [
+        num_arrivals,
+        num_services,
+        avg_fill_factor,
+        avg_num_arrivals_between_service,
+        avg_route_distance,
+    ]
+
+    for measure in measures:
+        expected = sequential.compute(measure, after)
+        assert_allclose(parallel.compute(measure, after), expected, rtol=0.05)
+
+
+@pytest.mark.parametrize(
+    "warmup_end", ["2023-08-03T00:00", "2023-08-03T07:05"]
+)
+def test_snapshot_variant_same_as_full_run(tmp_path, monkeypatch, warmup_end):
+    """
+    Tests that a variant started from a warmup snapshot stores the same results
+    after warmup as a full run with the same strategy. The end of the warmup
+    period is before the next shift plan, and possibly while routes are still
+    underway, so the results between the two must also be stored.
+    """
+    argv = [
+        "--seed=1",
+        "--start=2023-08-01",
+        "--end=2023-08-05",
+        f"--warmup_end={warmup_end}",
+        "random",
+        "--clusters_per_route=2",
+        "tests/test.db",
+    ]
+
+    args = parse_args(monkeypatch, *argv, str(tmp_path / "full.db"))
+    full = Database("tests/test.db", args.res_db)
+    simulate.simulate(args, full)
+
+    snapshot = str(tmp_path / "warmup.pkl")
+    args = parse_args(
+        monkeypatch,
+        f"--snapshot={snapshot}",
+        *argv,
+        str(tmp_path / "warmup.db"),
+    )
+    simulate.simulate(args, Database("tests/test.db", args.res_db))
+
+    args = parse_args(
+        monkeypatch,
+        f"--from_snapshot={snapshot}",
+        *argv,
+        str(tmp_path / "variant.db"),
+    )
+    variant = Database("tests/test.db", args.res_db)
+    simulate.simulate_from_snapshot(args, variant)
+
+    after = datetime.fromisoformat(warmup_end)
+    assert_(full.compute(num_arrivals, after) > 0)
+    for measure in MEASURES:
+        expected = full.compute(measure, after)
+        assert_equal(variant.compute(measure, after), expected)
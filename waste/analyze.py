@@ -1,8 +1,11 @@
 import argparse
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import numpy as np
 
 from waste.classes import Database
+from waste.functions import confidence_interval
 from waste.measures import MEASURES
 
 
@@ -10,27 +13,63 @@ def parse_args():
     parser = argparse.ArgumentParser(prog="analyze")
 
     parser.add_argument("src_db", help="Location of the input database.")
-    parser.add_argument("res_db", help="Location of the output database.")
+    parser.add_argument(
+        "res_db",
+        nargs="+",
+        help="""
+        Location of the output database. When multiple output databases of
+        independent replications are given, the mean and a 95% confidence
+        interval half-width of each measure are reported.
+        """,
+    )
     parser.add_argument(
         "--warmup_end",
         type=datetime.fromisoformat,
         default=datetime.min,
         help="End ISO datetime of the warmup period. Default no warmup.",
     )
+    parser.add_argument(
+        "--antithetic",
+        action="store_true",
+        help="Whether consecutive output databases are antithetic pairs.",
+    )
     parser.add_argument("--output", help="Output file (should be JSON).")
 
     return parser.parse_args()
 
 
+def summarise(values: list, antithetic: bool) -> tuple:
+    """
+    Summarises the values of a measure over several replications into a mean
+    and confidence interval half-width. Durations are summarised in seconds.
+    """
+    if isinstance(values[0], timedelta):
+        secs = np.array([value.total_seconds() for value in values])
+        secs_mean, secs_half_width = confidence_interval(secs, antithetic)
+        return (
+            timedelta(seconds=float(secs_mean)),
+            timedelta(seconds=float(secs_half_width)),
+        )
+
+    mean, half_width = confidence_interval(np.asarray(values), antithetic)
+    return np.round(mean, 6).tolist(), np.round(half_width, 6).tolist()
+
+
 def main():
     args = parse_args()
-    db = Database(args.src_db, args.res_db, exists_ok=True)
+    dbs = [Database(args.src_db, res, exists_ok=True) for res in args.res_db]
 
     values = {}
     for func in MEASURES:
         name = func.__name__
-        values[name] = db.compute(func, args.warmup_end)
-        print(f"{name:36}: {values[name]}")
+
+        if len(dbs) == 1:
+            values[name] = dbs[0].compute(func, args.warmup_end)
+            print(f"{name:36}: {values[name]}")
+        else:
+            reps = [db.compute(func, args.warmup_end) for db in dbs]
+            values[name] = summarise(reps, args.antithetic)
+            print(f"{name:36}: {values[name][0]} +/- {values[name][1]}")
 
     if args.output:
         with open(args.output, "w+") as fh:
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from heapq import heappop, heappush, heapreplace
+from typing import TYPE_CHECKING, Iterator
+
+import numpy as np
+
+from waste.constants import SECONDS_IN_DAY, SECONDS_IN_HOUR
+
+from .Event import ArrivalEvent
+
+if TYPE_CHECKING:
+    from numpy.random import Generator
+
+    from .Cluster import Cluster
+
+
+class _ClusterArrivals:
+    """
+    Lazily generates the arrivals at a single cluster, one hour at a time.
+    """
+
+    def __init__(
+        self,
+        cluster: Cluster,
+        generator: Generator,
+        start: int,
+        end: int,
+        volume_range: tuple[float, float, float],
+    ):
+        self.cluster = cluster
+        self.generator = generator
+        self.now = start
+        self.end = end
+        self.volume_range = volume_range
+
+        self._buffer: list[ArrivalEvent] = []
+
+    def __iter__(self) -> Iterator[ArrivalEvent]:
+        return self
+
+    def __next__(self) -> ArrivalEvent:
+        while not self._buffer:
+            if self.now > self.end:
+                raise StopIteration
+
+            # Non-homogeneous Poisson arrivals, with hourly rates as given by
+            # the rates list for this cluster. The arrivals within an hour are
+            # sorted in time, and kept in reverse so we can pop from the end.
+            gen = self.generator
+            hour = self.now % SECONDS_IN_DAY // SECONDS_IN_HOUR
+            num_deposits = gen.poisson(self.cluster.rates[hour])
+            time_offsets = np.sort(gen.uniform(size=num_deposits))
+            volumes = gen.triangular(*self.volume_range, num_deposits)
+            times = self.now + (SECONDS_IN_HOUR * time_offsets).astype(int)
+
+            self._buffer = [
+                ArrivalEvent(time, cluster=self.cluster, volume=volume)
+                for time, volume in zip(times.tolist(), volumes)
+            ]
+            self._buffer.reverse()
+            self.now += SECONDS_IN_HOUR
+
+        return self._buffer.pop()
+
+
+class ArrivalStream:
+    """
+    Lazily generates arrival events for all clusters, in order of time. Each
+    cluster has its own random number generator, and generates its arrivals
+    one hour at a time. These per-cluster streams are merged together in time
+    order. As a result, only a few arrivals per cluster are kept in memory at
+    any moment, no matter the length of the time horizon.
+
+    Parameters
+    ----------
+    clusters
+        Clusters to generate arrivals for.
+    generators
+        Random number generators, one for each cluster.
+    start
+        Start time of the arrival stream, in seconds since the epoch. Should be
+        at the start of an hour.
+    end
+        Last time of the arrival stream (inclusive), in seconds since the
+        epoch.
+    volume_range
+        (min, mode, max) triple of the triangular deposit volume distribution.
+    """
+
+    def __init__(
+        self,
+        clusters: list[Cluster],
+        generators: list[Generator],
+        start: int,
+        end: int,
+        volume_range: tuple[float, float, float],
+    ):
+        assert len(clusters) == len(generators)
+
+        # This is a k-way merge of the cluster streams. The heap contains the
+        # next arrival of each cluster that has arrivals remaining. Ties are
+        # broken by cluster index, so the stream order is deterministic.
+        self._heap: list[tuple[int, int, ArrivalEvent]] = []
+        self._streams = [
+            _ClusterArrivals(cluster, gen, start, end, volume_range)
+            for cluster, gen in zip(clusters, generators)
+        ]
+
+        for idx, stream in enumerate(self._streams):
+            if (event := next(stream, None)) is not None:
+                heappush(self._heap, (event.time, idx, event))
+
+    def __iter__(self) -> Iterator[ArrivalEvent]:
+        return self
+
+    def __next__(self) -> ArrivalEvent:
+        if not self._heap:
+            raise StopIteration
+
+        _, idx, event = self._heap[0]
+
+        if (upcoming := next(self._streams[idx], None)) is not None:
+            heapreplace(self._heap, (upcoming.time, idx, upcoming))
+        else:
+            heappop(self._heap)
+
+        return event
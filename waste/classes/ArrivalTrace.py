@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from itertools import pairwise
+from typing import TYPE_CHECKING, Iterable, Literal
+
+import numpy as np
+
+from .Event import ArrivalEvent, Event
+
+if TYPE_CHECKING:
+    from .Cluster import Cluster
+
+
+class ArrivalTrace:
+    """
+    Array-based representation of all arrivals at each cluster. For each
+    cluster, the arrival times and volumes are stored as arrays sorted in time.
+    This allows the simulator to apply all arrivals up to a given time in one
+    go, rather than processing each arrival as a separate event.
+
+    Parameters
+    ----------
+    times
+        List of arrival time arrays (in seconds since the epoch), one for each
+        cluster. Each array must be sorted in increasing order.
+    volumes
+        List of arrival volume arrays, one for each cluster.
+    """
+
+    def __init__(self, times: list[np.ndarray], volumes: list[np.ndarray]):
+        assert len(times) == len(volumes)
+        assert all(len(t) == len(v) for t, v in zip(times, volumes))
+
+        # The arrays are only copied when they are not already of the right
+        # type. That way, e.g. memory-mapped arrays remain memory-mapped.
+        self.times = [np.asarray(t, dtype=np.int64) for t in times]
+        self.volumes = [np.asarray(v, dtype=float) for v in volumes]
+
+        # Index of the first arrival that has not yet been applied, for each
+        # cluster. All arrivals before this index have already happened.
+        self.cursors = np.zeros(len(times), dtype=int)
+
+    @classmethod
+    def from_events(
+        cls,
+        clusters: list[Cluster],
+        events: Iterable[Event],
+    ) -> ArrivalTrace:
+        """
+        Creates an arrival trace from the arrival events in the given events.
+        Any events that are not arrival events are ignored.
+        """
+        cluster2idx = {
+            id(cluster): idx for idx, cluster in enumerate(clusters)
+        }
+        times: list[list[int]] = [[] for _ in clusters]
+        volumes: list[list[float]] = [[] for _ in clusters]
+
+        for event in events:
+            if isinstance(event, ArrivalEvent):
+                idx = cluster2idx[id(event.cluster)]
+                times[idx].append(event.time)
+                volumes[idx].append(event.volume)
+
+        # Sorting must be stable, so that arrivals at the same time are
+        # applied in the order in which they were generated. That mirrors what
+        # the simulator's event queue does.
+        arr_times = [np.array(t, dtype=np.int64) for t in times]
+        orders = [np.argsort(t, kind="stable") for t in arr_times]
+
+        return cls(
+            [t[order] for t, order in zip(arr_times, orders)],
+            [np.array(v)[order] for v, order in zip(volumes, orders)],
+        )
+
+    @classmethod
+    def load(cls, where: str) -> ArrivalTrace:
+        """
+        Loads an arrival trace from the given directory, as written by
+        ``save()``. The arrays are memory-mapped, rather than read into
+        memory: only the parts of the trace that the simulation needs are
+        read from disk, and several processes loading the same trace share it.
+        """
+        times = np.load(os.path.join(where, "times.npy"), mmap_mode="r")
+        volumes = np.load(os.path.join(where, "volumes.npy"), mmap_mode="r")
+        bounds = np.load(os.path.join(where, "bounds.npy"))
+
+        return cls(
+            [times[frm:to] for frm, to in pairwise(bounds.tolist())],
+            [volumes[frm:to] for frm, to in pairwise(bounds.tolist())],
+        )
+
+    def save(self, where: str):
+        """
+        Saves this arrival trace to the given directory. The arrival times and
+        volumes of all clusters are stored as two contiguous arrays, one after
+        the other in cluster order, together with the bounds of each cluster's
+        arrivals in those arrays. The trace is first written to a temporary
+        directory, which is then renamed to the given directory. This ensures
+        a partially written trace is never loaded.
+        """
+        parent = os.path.dirname(os.path.abspath(where))
+        os.makedirs(parent, exist_ok=True)
+
+        counts = [len(times) for times in self.times]
+        bounds = np.zeros(len(counts) + 1, dtype=np.int64)
+        bounds[1:] = np.cumsum(counts)
+
+        tmp = tempfile.mkdtemp(dir=parent)
+        np.save(os.path.join(tmp, "times.npy"), np.concatenate(self.times))
+        np.save(os.path.join(tmp, "volumes.npy"), np.concatenate(self.volumes))
+        np.save(os.path.join(tmp, "bounds.npy"), bounds)
+
+        try:
+            os.rename(tmp, where)
+        except OSError:
+            # The trace already exists, e.g. because another process saved the
+            # same trace in the meantime. That is fine.
+            shutil.rmtree(tmp)
+            if not os.path.isdir(where):
+                raise
+
+    def __len__(self) -> int:
+        return sum(len(times) for times in self.times)
+
+    def num_arrivals(
+        self,
+        idx: int,
+        until: int,
+        inclusive: bool = True,
+    ) -> int:
+        """
+        Returns the number of arrivals at the given cluster index up to
+        ``until``, from the start of the trace. Arrivals at ``until`` are
+        included only when ``inclusive`` is set.
+        """
+        side: Literal["left", "right"] = "right" if inclusive else "left"
+        return int(np.searchsorted(self.times[idx], until, side=side))
+
+    def advance(
+        self,
+        idx: int,
+        until: int,
+        inclusive: bool = True,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Advances the given cluster index to ``until``. Returns the arrival
+        times and volumes of all arrivals that happened since the previous
+        call, up to ``until``. Arrivals at ``until`` are included only when
+        ``inclusive`` is set.
+        """
+        start = self.cursors[idx]
+        end = max(self.num_arrivals(idx, until, inclusive), start)
+        self.cursors[idx] = end
+
+        return self.times[idx][start:end], self.volumes[idx][start:end]
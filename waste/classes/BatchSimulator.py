@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import copy
+import logging
+from typing import TYPE_CHECKING, Callable, Optional
+
+import numpy as np
+
+from .Configuration import Configuration
+from .Event import ArrivalEvent, Event, ShiftPlanEvent
+from .Simulator import Simulator
+
+if TYPE_CHECKING:
+    from numpy.random import Generator
+
+    from waste.strategies import Strategy
+
+    from .ArrivalTrace import ArrivalTrace
+    from .Checkpoint import Checkpoint
+    from .Cluster import Cluster
+    from .Depot import Depot
+    from .Route import Route
+    from .Vehicle import Vehicle
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSimulator:
+    """
+    Simulates several replications of the same simulation environment
+    together. Each replication has its own random number generator and its own
+    copy of the clusters, but the depot, vehicles, and distance and duration
+    matrices are shared between all replications. The replications' cluster
+    volumes and numbers of arrivals are kept in (replications x clusters)
+    arrays, and all replications are advanced through the same shift plan
+    epochs together.
+
+    Parameters
+    ----------
+    generators
+        Random number generators, one for each replication.
+    depot
+        Depot, shared by all replications.
+    distances
+        Distance matrix, shared by all replications.
+    durations
+        Duration matrix, in seconds, shared by all replications.
+    clusters
+        Clusters. Each replication gets its own copy of these clusters.
+    vehicles
+        Vehicles, shared by all replications.
+    config
+        Simulation configuration, shared by all replications.
+    """
+
+    def __init__(
+        self,
+        generators: list[Generator],
+        depot: Depot,
+        distances: np.ndarray,
+        durations: np.ndarray,
+        clusters: list[Cluster],
+        vehicles: list[Vehicle],
+        config: Configuration = Configuration(),
+    ):
+        shape = (len(generators), len(clusters))
+        self.volumes = np.zeros(shape, dtype=float)
+        self.num_arrivals = np.zeros(shape, dtype=np.int64)
+
+        self.sims: list[Simulator] = []
+        for rep, gen in enumerate(generators):
+            sim = Simulator(
+                gen,
+                depot,
+                distances,
+                durations,
+                copy.deepcopy(clusters),
+                vehicles,
+                config,
+            )
+
+            # The replication's cluster state becomes a view into the rows of
+            # the shared arrays, so updates to either are visible in both.
+            self.volumes[rep] = sim.state.volumes
+            self.num_arrivals[rep] = sim.state.num_arrivals
+            sim.state.volumes = self.volumes[rep]
+            sim.state.num_arrivals = self.num_arrivals[rep]
+
+            self.sims.append(sim)
+
+    def __len__(self) -> int:
+        return len(self.sims)
+
+    def __call__(
+        self,
+        stores: list[Callable[[Event | Route], Optional[int]]],
+        strategies: list[Strategy],
+        initial_events: list[list[Event]],
+        arrivals: Optional[list[ArrivalTrace]] = None,
+        store_arrivals: bool = True,
+    ) -> list[Checkpoint]:
+        """
+        Applies a strategy to each replication, starting with the given initial
+        events for that replication. All list arguments have one entry for
+        each replication. See ``Simulator.__call__()`` for details.
+
+        The replications are advanced from one shift plan epoch to the next
+        together. At each epoch, the arrivals since the previous epoch are
+        first applied to the clusters of all replications at once, using the
+        arrival traces. Only planning the shifts, and the events in between
+        epochs, are then simulated for each replication separately. The
+        results are exactly the same as when simulating each replication on
+        its own.
+
+        Returns
+        -------
+        list
+            The simulation state of each replication at the end.
+        """
+        num_reps = len(self)
+        assert len(stores) == len(strategies) == num_reps
+        assert len(initial_events) == num_reps
+
+        traces: list[Optional[ArrivalTrace]] = [None] * num_reps
+        if arrivals is not None:
+            assert len(arrivals) == num_reps
+            traces = [*arrivals]
+
+        epochs = sorted(
+            {
+                event.time
+                for events in initial_events
+                for event in events
+                if isinstance(event, ShiftPlanEvent)
+            }
+        )
+
+        until = epochs[0] if epochs else None
+        states = [
+            sim(
+                store,
+                strategy,
+                events,
+                trace,
+                until=until,
+                store_arrivals=store_arrivals,
+            )
+            for sim, store, strategy, events, trace in zip(
+                self.sims, stores, strategies, initial_events, traces
+            )
+        ]
+
+        batch = _BatchTrace(arrivals) if arrivals is not None else None
+
+        for epoch, until in zip(epochs, [*epochs[1:], None]):
+            logger.info(f"Advancing {num_reps} replications to {epoch}.")
+
+            if batch is not None:
+                self._arrive(batch, states, stores, epoch, store_arrivals)
+
+            states = [
+                sim.resume(
+                    store, state, until=until, store_arrivals=store_arrivals
+                )
+                for sim, store, state in zip(self.sims, stores, states)
+            ]
+
+        return states
+
+    def _arrive(
+        self,
+        batch: _BatchTrace,
+        states: list[Checkpoint],
+        stores: list[Callable[[Event | Route], Optional[int]]],
+        epoch: int,
+        store_arrivals: bool,
+    ):
+        """
+        Applies the arrivals before the given epoch to the clusters of each
+        replication that is about to plan a shift at that epoch. This is the
+        same update that each replication would do itself just before the
+        shift plan (see ``Simulator._process()``), but vectorised over all
+        these replications and their clusters.
+
+        Replications whose strategy observes arrival events are skipped. Their
+        strategy may depend on the cluster state while observing, so those
+        replications apply their arrivals themselves, one cluster at a time.
+        """
+        reps = []
+        for rep, state in enumerate(states):
+            observes = getattr(state.strategy, "observes", (Event,))
+            if (
+                state.queue
+                and isinstance(state.queue.peek(), ShiftPlanEvent)
+                and state.queue.peek().time == epoch
+                and not issubclass(ArrivalEvent, observes)
+            ):
+                reps.append(rep)
+
+        if not reps:
+            return
+
+        rows = np.array(reps)
+        start, end = batch.advance(rows, epoch)
+        counts = end - start
+
+        # The volumes are accumulated sequentially, starting from the current
+        # volume, exactly like Cluster.arrive_many() does. Each row holds the
+        # arrivals at one cluster, padded with zeros, which do not change the
+        # accumulated volume.
+        volumes = self.volumes[rows].ravel()
+        active = np.flatnonzero(counts)
+
+        if len(active):
+            sizes = counts[active]
+            which = np.repeat(np.arange(len(active)), sizes)
+            nth = np.arange(sizes.sum()) - np.repeat(
+                sizes.cumsum() - sizes, sizes
+            )
+
+            acc = np.zeros((len(active), sizes.max() + 1))
+            acc[:, 0] = volumes[active]
+            acc[which, nth + 1] = batch.volumes[start[active][which] + nth]
+            volumes[active] = np.add.accumulate(acc, axis=1)[:, -1]
+
+        self.volumes[rows] = volumes.reshape(len(rows), -1)
+        self.num_arrivals[rows] += counts.reshape(len(rows), -1)
+
+        if not store_arrivals:
+            return
+
+        # The arrival events are stored in the same order as the replication
+        # itself would store them: cluster by cluster, in order of time.
+        start = start.reshape(len(rows), -1)
+        end = end.reshape(len(rows), -1)
+
+        for row, rep in enumerate(reps):
+            store = stores[rep]
+            clusters = self.sims[rep].clusters
+
+            for idx, cluster in enumerate(clusters):
+                frm, to = start[row, idx], end[row, idx]
+                times = batch.times[frm:to].tolist()
+
+                for arr_time, volume in zip(times, batch.volumes[frm:to]):
+                    event = ArrivalEvent(
+                        arr_time, cluster=cluster, volume=volume
+                    )
+                    event.seal()
+                    store(event)
+
+
+class _BatchTrace:
+    """
+    The arrival traces of all replications, concatenated into flat arrays of
+    arrival times and volumes, so that they can be advanced together. Each
+    (replication, cluster) pair is a segment of these arrays. The traces'
+    cursors become views into the rows of a (replications x clusters) array,
+    so advancing either the traces or this batch advances both.
+    """
+
+    def __init__(self, traces: list[ArrivalTrace]):
+        segments = [times for trace in traces for times in trace.times]
+        sizes = np.array([len(times) for times in segments], dtype=np.int64)
+
+        self.times = np.concatenate([*segments, np.empty(0, np.int64)])
+        self.volumes = np.concatenate(
+            [*[vols for trace in traces for vols in trace.volumes], []]
+        )
+        self.starts = np.cumsum(sizes) - sizes
+
+        self.cursors = np.zeros((len(traces), len(sizes) // len(traces)), int)
+        for rep, trace in enumerate(traces):
+            self.cursors[rep] = trace.cursors
+            trace.cursors = self.cursors[rep]
+
+        # The segments are sorted in time, so sorting on (segment, time) keys
+        # lets a single search find the arrivals before a time in all segments.
+        seg_ids = np.repeat(np.arange(len(sizes)), sizes)
+        self.base = int(self.times.min()) if len(self.times) else 0
+        self.span = (
+            int(self.times.max()) - self.base + 2 if len(self.times) else 1
+        )
+        self.keys = seg_ids * self.span + (self.times - self.base)
+
+    def advance(
+        self, rows: np.ndarray, until: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Advances the clusters of the given replications to just before
+        ``until``. Returns the start and end positions, in the flat arrays, of
+        the arrivals that happened since they were last advanced. These are
+        given for each cluster of each replication, as flat arrays.
+        """
+        num_clusters = self.cursors.shape[1]
+        segs = (rows[:, None] * num_clusters + np.arange(num_clusters)).ravel()
+
+        offset = np.clip(until - self.base, 0, self.span - 1)
+        query = segs * self.span + offset
+
+        start = self.starts[segs] + self.cursors[rows].ravel()
+        end = np.maximum(np.searchsorted(self.keys, query, side="left"), start)
+        self.cursors[rows] = (end - self.starts[segs]).reshape(len(rows), -1)
+
+        return start, end
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import copy
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Iterator, Optional
+
+from .Event import BreakEvent, Event, ServiceEvent
+
+if TYPE_CHECKING:
+    from waste.queues import EventQueue
+    from waste.strategies import Strategy
+
+    from .ArrivalTrace import ArrivalTrace
+    from .Route import Route
+    from .Simulator import Simulator
+
+
+@dataclass
+class Checkpoint:
+    """
+    Snapshot of a running simulation, taken just before a shift plan event.
+    This captures everything needed to resume the simulation from that point:
+    the simulation environment (including the cluster states and the random
+    number generator), the strategy, the pending events, and any remaining
+    arrivals. All of these are saved together, so that references between
+    them (e.g., from events to clusters) remain intact when loading.
+    """
+
+    sim: Simulator
+    strategy: Strategy
+    queue: EventQueue
+    stream: Iterator[Event]
+    upcoming: Optional[Event] = None  # next event pulled from the stream
+    arrivals: Optional[ArrivalTrace] = None
+
+    # Result database watermark: the largest row ID in each result table when
+    # the checkpoint was taken. See ``Database.watermark()``.
+    watermark: dict[str, int] = field(default_factory=dict)
+
+    # Events (other than arrivals) that happened before the checkpoint was
+    # taken, if these were recorded. See ``fork()``.
+    history: list[Event] = field(default_factory=list)
+
+    # Events that were stored after the end of the warmup period, but before
+    # the checkpoint was taken, and all routes stored before the checkpoint
+    # was taken, by route ID, if these were recorded. See ``store_results()``.
+    results: list[Event] = field(default_factory=list)
+    routes: dict[int, Route] = field(default_factory=dict)
+
+    def fork(self, strategy: Strategy):
+        """
+        Replaces the strategy of this checkpoint by the given strategy, which
+        should use this checkpoint's simulator. The new strategy first observes
+        the recorded history, so that it starts with the same information as
+        the strategy it replaces.
+        """
+        observes = getattr(strategy, "observes", (Event,))
+        for event in self.history:
+            if isinstance(event, observes):
+                strategy.observe(event)
+
+        self.strategy = strategy
+
+    def store_results(self, store: Callable[[Event | Route], Optional[int]]):
+        """
+        Stores the recorded results with the given store function, so that a
+        simulation resumed from this checkpoint has all results after the end
+        of the warmup period. The routes that the stored or pending events
+        refer to are stored as well. These routes get new route IDs from the
+        store function, and the events are updated to refer to those new IDs.
+        """
+        pending = [self.queue.pop() for _ in range(len(self.queue))]
+        on_route = [
+            event
+            for event in self.results + pending
+            if isinstance(event, (BreakEvent, ServiceEvent))
+        ]
+
+        referenced = {event.id_route for event in on_route}
+        id_routes = {}
+        for id_route, route in self.routes.items():
+            if id_route in referenced:
+                new_id_route = store(route)
+                assert new_id_route is not None
+                id_routes[id_route] = new_id_route
+
+        # The stored events are copied, but the pending events are updated in
+        # place, and then put back in the queue in their original order.
+        for event in self.results:
+            if isinstance(event, (BreakEvent, ServiceEvent)):
+                event = copy.copy(event)
+                event.id_route = id_routes[event.id_route]
+
+            store(event)
+
+        for event in pending:
+            if isinstance(event, (BreakEvent, ServiceEvent)):
+                event.id_route = id_routes[event.id_route]
+
+            self.queue.push(event)
+
+    def save(self, where: str):
+        """
+        Saves this checkpoint to the given file. The checkpoint is first
+        written to a temporary file, which then replaces the given file. This
+        ensures an existing checkpoint is not lost when saving is interrupted.
+        """
+        tmp = where + ".tmp"
+
+        with open(tmp, "wb") as fh:
+            pickle.dump(self, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp, where)
+
+    @classmethod
+    def load(cls, where: str) -> Checkpoint:
+        """
+        Loads a checkpoint from the given file.
+        """
+        with open(where, "rb") as fh:
+            checkpoint = pickle.load(fh)
+
+        if not isinstance(checkpoint, cls):
+            raise TypeError(f"File {where} does not contain a checkpoint.")
+
+        return checkpoint
@@ -1,6 +1,10 @@
 from datetime import time
 
-from waste.constants import HOURS_IN_DAY
+import numpy as np
+
+from waste.constants import HOURS_IN_DAY, SECONDS_IN_HOUR
+
+from .ClusterState import ClusterState
 
 
 class Cluster:
@@ -8,8 +12,14 @@ class Cluster:
     Models a cluster of underground containers. This cluster registers arrivals
     and services, and tracks the currently used volume and number of arrivals
     since last service.
+
+    The cluster's data is not stored on the cluster itself, but in a
+    ``ClusterState`` store shared with other clusters. Each cluster starts out
+    with its own store; ``ClusterState.of()`` moves clusters into a shared one.
     """
 
+    __slots__ = ("_idx", "_state", "id_location", "location", "name")
+
     def __init__(
         self,
         name: str,
@@ -25,15 +35,108 @@ class Cluster:
 
         self.name = name
         self.id_location = id_location
-        self.rates = rates  # arrival rates, per clock hour ([0 - 23])
-        self.capacity = capacity  # in volume, liters
-        self.correction_factor = correction_factor  # cap. correction factor
         self.location = location  # (lat, lon) pair
-        self.tw_late = tw_late
-        self.num_containers = num_containers  # number of containers in cluster
 
-        self.num_arrivals = 0  # number of arrivals since last service
-        self.volume = 0.0  # current volume in cluster, in liters
+        tw_late_secs = (
+            tw_late.hour * SECONDS_IN_HOUR
+            + tw_late.minute * 60
+            + tw_late.second
+        )
+
+        self._state = ClusterState(
+            [rates],
+            [capacity],
+            [correction_factor],
+            [tw_late_secs],
+            [num_containers],
+        )
+        self._idx = 0
+
+    def bind(self, state: ClusterState, idx: int):
+        """
+        Makes this cluster a view into the given store, at the given index.
+        """
+        self._state = state
+        self._idx = idx
+
+    @property
+    def state(self) -> ClusterState:
+        """
+        Store containing this cluster's data.
+        """
+        return self._state
+
+    @property
+    def idx(self) -> int:
+        """
+        Index of this cluster's data in its store.
+        """
+        return self._idx
+
+    @property
+    def rates(self) -> np.ndarray:
+        """
+        Arrival rates, per clock hour ([0 - 23]).
+        """
+        return self._state.rates[self._idx]
+
+    @rates.setter
+    def rates(self, rates: np.ndarray):
+        assert len(rates) == HOURS_IN_DAY
+        self._state.rates[self._idx] = rates
+
+    @property
+    def capacity(self) -> float:
+        """
+        Capacity of this cluster, in liters.
+        """
+        return float(self._state.capacities[self._idx])
+
+    @property
+    def correction_factor(self) -> float:
+        """
+        Municipality's capacity correction factor.
+        """
+        return float(self._state.correction_factors[self._idx])
+
+    @property
+    def tw_late(self) -> time:
+        """
+        Latest time of day at which this cluster can be serviced.
+        """
+        hours, secs = divmod(
+            int(self._state.tw_late[self._idx]), SECONDS_IN_HOUR
+        )
+        return time(hours, *divmod(secs, 60))
+
+    @property
+    def num_containers(self) -> int:
+        """
+        Number of containers in this cluster.
+        """
+        return int(self._state.num_containers[self._idx])
+
+    @property
+    def num_arrivals(self) -> int:
+        """
+        Number of arrivals since the last service.
+        """
+        return int(self._state.num_arrivals[self._idx])
+
+    @num_arrivals.setter
+    def num_arrivals(self, num_arrivals: int):
+        self._state.num_arrivals[self._idx] = num_arrivals
+
+    @property
+    def volume(self) -> float:
+        """
+        Current volume in this cluster, in liters.
+        """
+        return float(self._state.volumes[self._idx])
+
+    @volume.setter
+    def volume(self, volume: float):
+        self._state.volumes[self._idx] = volume
 
     @property
     def corrected_capacity(self) -> float:
@@ -47,15 +150,27 @@ class Cluster:
         """
         Registers an arrival at this cluster.
         """
-        self.num_arrivals += 1
-        self.volume += volume
+        self._state.num_arrivals[self._idx] += 1
+        self._state.volumes[self._idx] += volume
+
+    def arrive_many(self, volumes: np.ndarray):
+        """
+        Registers several arrivals at this cluster at once. The volumes are
+        added in order, so that the resulting volume is exactly the same as
+        when calling ``arrive()`` for each volume separately.
+        """
+        if len(volumes) == 0:
+            return
+
+        self.num_arrivals += len(volumes)
+        self.volume = np.add.accumulate(np.r_[self.volume, volumes])[-1]
 
     def service(self):
         """
         Services this cluster.
         """
-        self.num_arrivals = 0
-        self.volume = 0.0
+        self._state.num_arrivals[self._idx] = 0
+        self._state.volumes[self._idx] = 0.0
 
     def __str__(self) -> str:
         return (
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import copy
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from waste.constants import HOURS_IN_DAY
+
+if TYPE_CHECKING:
+    from .Cluster import Cluster
+
+
+class ClusterState:
+    """
+    Structure-of-arrays store of cluster data. Each attribute is a contiguous
+    array with one entry (or, for the rates, one row) per cluster. Cluster
+    objects are thin views into such a store, so that e.g. strategies can read
+    the current volumes of all clusters as a single array, rather than building
+    one from the individual clusters on every call.
+
+    Parameters
+    ----------
+    rates
+        Arrival rates per clock hour ([0 - 23]), one row for each cluster.
+    capacities
+        Capacity of each cluster, in liters.
+    correction_factors
+        Municipality's capacity correction factor of each cluster.
+    tw_late
+        Latest service time of each cluster, in seconds since midnight.
+    num_containers
+        Number of containers in each cluster.
+    """
+
+    def __init__(
+        self,
+        rates: list[list[float]] | list[np.ndarray],
+        capacities: list[float],
+        correction_factors: list[float],
+        tw_late: list[int],
+        num_containers: list[int],
+    ):
+        self.rates = np.array(rates, dtype=float).reshape(-1, HOURS_IN_DAY)
+        self.capacities = np.array(capacities, dtype=float)
+        self.correction_factors = np.array(correction_factors, dtype=float)
+        self.tw_late = np.array(tw_late, dtype=np.int64)
+        self.num_containers = np.array(num_containers, dtype=np.int64)
+
+        assert len(self.rates) == len(self.capacities)
+        assert len(self.rates) == len(self.correction_factors)
+        assert len(self.rates) == len(self.tw_late)
+        assert len(self.rates) == len(self.num_containers)
+
+        # Current volume in each cluster (in liters), and the number of
+        # arrivals at each cluster since its last service.
+        self.volumes = np.zeros(len(self.rates), dtype=float)
+        self.num_arrivals = np.zeros(len(self.rates), dtype=np.int64)
+
+    @classmethod
+    def of(cls, clusters: list[Cluster]) -> ClusterState:
+        """
+        Returns a store for the given clusters, in order. If the clusters are
+        already views into such a store, that store is returned. Otherwise, a
+        new store is created with the clusters' current data, and the clusters
+        become views into the new store.
+        """
+        if clusters:
+            state = clusters[0].state
+            if len(state) == len(clusters) and all(
+                cluster.state is state and cluster.idx == idx
+                for idx, cluster in enumerate(clusters)
+            ):
+                return state
+
+        state = cls(
+            [cluster.rates for cluster in clusters],
+            [cluster.capacity for cluster in clusters],
+            [cluster.correction_factor for cluster in clusters],
+            [cluster.state.tw_late[cluster.idx] for cluster in clusters],
+            [cluster.num_containers for cluster in clusters],
+        )
+
+        for idx, cluster in enumerate(clusters):
+            state.volumes[idx] = cluster.volume
+            state.num_arrivals[idx] = cluster.num_arrivals
+            cluster.bind(state, idx)
+
+        return state
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    def copy(self) -> ClusterState:
+        """
+        Returns a copy of this store. All arrays are copied, so changes to the
+        copy do not affect this store, and the other way around.
+        """
+        state = copy.copy(self)
+        state.__dict__.update(
+            {attr: arr.copy() for attr, arr in vars(self).items()}
+        )
+        return state
+
+    @property
+    def corrected_capacities(self) -> np.ndarray:
+        """
+        Capacity of each cluster with the municipality's correction factor
+        applied.
+        """
+        return self.correction_factors * self.capacities
@@ -3,14 +3,22 @@ from __future__ import annotations
 import logging
 import math
 import sqlite3
-from datetime import datetime, time
+import threading
+from datetime import datetime, time, timedelta
 from functools import cache
+from itertools import count
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Optional
+from queue import Queue
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 
 import numpy as np
 
-from waste.constants import BUFFER_SIZE, HOURS_IN_DAY
+from waste.constants import (
+    BUFFER_SIZE,
+    EPOCH,
+    HOURS_IN_DAY,
+    SECONDS_IN_HOUR,
+)
 from waste.enums import LocationType
 
 from .Cluster import Cluster
@@ -31,59 +39,180 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Arrival counts and volume sums, by the hour (in seconds since the epoch) and
+# cluster name.
+_Counts = dict[tuple[int, str], list]
+
+# A batch of buffered results: routes with their IDs, events, and arrival
+# counts.
+_Batch = tuple[list[tuple[int, Route]], list[Event], _Counts]
+
+_RESULT_TABLES = (
+    "routes",
+    "arrival_events",
+    "arrival_counts",
+    "break_events",
+    "service_events",
+)
+
+# Connection settings applied in fast-write mode. These trade durability for
+# write throughput: with synchronous writes turned off, a crash of the machine
+# (not of this process) may corrupt the result database. The settings only
+# apply to the result database, not to the attached source database.
+_FAST_WRITE_PRAGMAS = (
+    "PRAGMA main.journal_mode = WAL;",
+    "PRAGMA main.synchronous = OFF;",
+    "PRAGMA main.cache_size = -65536;",  # in KiB, so 64MiB
+)
+
 
 class Database:
     """
     Simple database wrapper/model class for interacting with the static and
     simulation data.
+
+    Parameters
+    ----------
+    src_db
+        Location of the input database.
+    res_db
+        Location of the output database.
+    exists_ok
+        Whether the output database may already exist. Default False.
+    fast_write
+        Whether to configure the output database for fast writes, by using
+        write-ahead logging, a larger page cache, and no synchronous writes.
+        This is safe when the simulation process crashes, but not when the
+        machine does. Default False.
+    buffer_size
+        Number of events to buffer before they are written to the output
+        database. Default ``BUFFER_SIZE``.
+    background
+        Whether to write buffered events in a background thread, so that the
+        simulation does not wait for them to be written. Default False.
+    queue_size
+        Maximum number of full buffers waiting to be written in the background.
+        When the writer thread falls this far behind, storing another event
+        blocks until a buffer has been written. Default 4.
+    arrival_counts
+        Whether to store the number of arrivals and their total volume for
+        each cluster and hour, rather than each arrival event. This results in
+        a much smaller result database. Arrivals exactly at the start of an
+        hour are still stored as events. Default False.
     """
 
-    def __new__(cls, src_db: str, res_db: str, exists_ok: bool = False):
+    def __new__(
+        cls,
+        src_db: str,
+        res_db: str,
+        exists_ok: bool = False,
+        fast_write: bool = False,
+        buffer_size: int = BUFFER_SIZE,
+        background: bool = False,
+        queue_size: int = 4,
+        arrival_counts: bool = False,
+    ):
         if Path(res_db).exists() and not exists_ok:
             raise FileExistsError(f"Database {res_db} already exists!")
 
+        if buffer_size < 1:
+            raise ValueError("Expected buffer_size >= 1.")
+
+        if queue_size < 1:
+            raise ValueError("Expected queue_size >= 1.")
+
         return super().__new__(cls)
 
-    def __init__(self, src_db: str, res_db: str, exists_ok: bool = False):
+    def __init__(
+        self,
+        src_db: str,
+        res_db: str,
+        exists_ok: bool = False,
+        fast_write: bool = False,
+        buffer_size: int = BUFFER_SIZE,
+        background: bool = False,
+        queue_size: int = 4,
+        arrival_counts: bool = False,
+    ):
         self.buffer: list[Event] = []
+        self.route_buffer: list[tuple[int, Route]] = []
+        self.count_buffer: _Counts = {}
+        self.buffer_size = buffer_size
+        self.arrival_counts = arrival_counts
         self.read = sqlite3.connect(src_db)
 
-        # Prepare the result database
-        res_db_exists = Path(res_db).exists()
-        self.write = sqlite3.connect(res_db)
+        # Prepare the result database. Tables are only created when they do not
+        # yet exist, so existing result databases are left as they are.
+        self.write = sqlite3.connect(res_db, check_same_thread=False)
         self.write.execute("ATTACH DATABASE ? AS source;", (src_db,))
 
-        if not res_db_exists:
-            self.write.executescript(
-                """-- sql
-                    CREATE TABLE routes (
-                        id_route INTEGER PRIMARY KEY,
-                        vehicle NAME,
-                        start_time DATETIME
-                    );
-
-                    CREATE TABLE arrival_events (
-                        time DATETIME,
-                        cluster VARCHAR,
-                        volume FLOAT
-                    );
-
-                    CREATE TABLE break_events (
-                        time DATETIME,
-                        duration FLOAT,
-                        id_route INTEGER references routes
-                    );
-
-                    CREATE TABLE service_events (
-                        time DATETIME,
-                        duration FLOAT,
-                        cluster VARCHAR,
-                        id_route INTEGER references routes,
-                        num_arrivals INT,
-                        volume FLOAT
-                    );
-                """
+        if fast_write:
+            for pragma in _FAST_WRITE_PRAGMAS:
+                self.write.execute(pragma)
+
+        self.write.executescript(
+            """-- sql
+                CREATE TABLE IF NOT EXISTS routes (
+                    id_route INTEGER PRIMARY KEY,
+                    vehicle NAME,
+                    start_time DATETIME
+                );
+
+                CREATE TABLE IF NOT EXISTS arrival_events (
+                    time DATETIME,
+                    cluster VARCHAR,
+                    volume FLOAT
+                );
+
+                -- Arrivals per cluster in the hour starting at the given time,
+                -- excluding those exactly at its start: those are stored as
+                -- arrival events. There may be several rows for the same hour
+                -- and cluster, which should be summed.
+                CREATE TABLE IF NOT EXISTS arrival_counts (
+                    time DATETIME,
+                    cluster VARCHAR,
+                    num_arrivals INT,
+                    volume FLOAT
+                );
+
+                CREATE TABLE IF NOT EXISTS break_events (
+                    time DATETIME,
+                    duration FLOAT,
+                    id_route INTEGER references routes
+                );
+
+                CREATE TABLE IF NOT EXISTS service_events (
+                    time DATETIME,
+                    duration FLOAT,
+                    cluster VARCHAR,
+                    id_route INTEGER references routes,
+                    num_arrivals INT,
+                    volume FLOAT
+                );
+            """
+        )
+
+        # Route IDs are allocated from this counter, which is seeded with the
+        # largest route ID in the result database when the first route is
+        # stored. See ``store()``.
+        self._id_routes: Optional[Iterator[int]] = None
+
+        # The write connection is shared with the background writer thread,
+        # if any. That thread holds the lock while it writes.
+        self._lock = threading.Lock()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._queue: Optional[Queue[Optional[_Batch]]] = None
+        self._writer: Optional[threading.Thread] = None
+
+        if background:
+            self._queue = Queue(maxsize=queue_size)
+            self._writer = threading.Thread(
+                target=self._write_in_background,
+                name="database-writer",
+                daemon=True,
             )
+            self._writer.start()
 
     @cache
     def clusters(self) -> list[Cluster]:
@@ -163,8 +292,8 @@ class Database:
     @cache
     def durations(self) -> np.array:
         """
-        Returns the matrix of travel durations (in seconds) for the depot (at
-        index 0) and all clusters returned by ``clusters()``, in order.
+        Returns the matrix of travel durations (in whole seconds) for the depot
+        (at index 0) and all clusters returned by ``clusters()``, in order.
         The duration matrix is *not* symmetric.
         """
         cursor = self.read.execute("SELECT duration FROM matrix;")
@@ -174,7 +303,7 @@ class Database:
 
         id_locations = [0] + [c.id_location for c in self.clusters()]
         mat = durations[np.ix_(id_locations, id_locations)]
-        return mat.astype(np.timedelta64(1, "s"))
+        return mat.astype(np.int64)
 
     @cache
     def vehicles(self) -> list[Vehicle]:
@@ -184,6 +313,35 @@ class Database:
             for name, capacity in self.read.execute(sql)
         ]
 
+    def arrivals(
+        self,
+        start: datetime,
+        end: datetime,
+    ) -> Iterator[list[tuple[str, int]]]:
+        """
+        Returns the successful historical arrivals (deposits) between the given
+        start and end datetimes (inclusive), ordered in time, as (cluster name,
+        time) pairs. Times are in seconds since the epoch. The arrivals are
+        read lazily from the source database, and returned in chunks of at
+        most ``BUFFER_SIZE`` arrivals. So the arrivals table is never loaded
+        into memory in full.
+        """
+        sql = """-- sql
+            SELECT cluster, date
+            FROM arrivals
+            WHERE cluster NOTNULL
+                AND successful
+                AND date BETWEEN ? AND ?
+            ORDER BY date;
+        """
+        cursor = self.read.execute(sql, (str(start), str(end)))
+
+        while rows := cursor.fetchmany(BUFFER_SIZE):
+            yield [
+                (cluster, _to_seconds(datetime.fromisoformat(when)))
+                for cluster, when in rows
+            ]
+
     def compute(self, measure: Measure, after: datetime = datetime.min) -> Any:
         """
         Computes the given performance measure from data managed by this
@@ -192,23 +350,55 @@ class Database:
         self.commit()
         return measure(self, after)
 
-    def store(self, item: Event | Route) -> Optional[int]:
+    def store(
+        self,
+        item: Event | Route,
+        id_route: Optional[int] = None,
+    ) -> Optional[int]:
         # Only arrival, service and route events are logged; other arguments
         #  are currently an intended no-op.
         match item:
             case Event():
                 assert item.is_sealed()
 
-                self.buffer.append(item)
-                if len(self.buffer) >= BUFFER_SIZE:
-                    self.commit()
+                # Arrivals exactly at the start of an hour are stored as
+                # events. Each count then covers only arrivals strictly after
+                # the start of its hour, so that measures select the same
+                # arrivals after a cutoff at the start of an hour as from the
+                # arrival events.
+                if (
+                    self.arrival_counts
+                    and isinstance(item, ArrivalEvent)
+                    and item.time % SECONDS_IN_HOUR != 0
+                ):
+                    hour = item.time - item.time % SECONDS_IN_HOUR
+                    key = (hour, item.cluster.name)
+                    counts = self.count_buffer.setdefault(key, [0, 0.0])
+                    counts[0] += 1
+                    counts[1] += item.volume
+                else:
+                    self.buffer.append(item)
+
+                # Arrival counts are buffered per hour and cluster, so those
+                # count towards the buffer size once for each such pair.
+                num_buffered = len(self.buffer) + len(self.count_buffer)
+                if num_buffered >= self.buffer_size:
+                    self._flush()
 
                 return None
-            case Route(vehicle=vehicle, start_time=start_time):
-                sql = "INSERT INTO routes (vehicle, start_time) VALUES (?, ?)"
-                cursor = self.write.execute(sql, (vehicle.name, start_time))
-                self.write.commit()
-                return cursor.lastrowid
+            case Route():
+                # The route is written together with the next batch of events,
+                # so its ID is allocated here, rather than by the database.
+                # That is, unless the ID has already been allocated elsewhere.
+                if id_route is None:
+                    if self._id_routes is None:
+                        with self._lock:
+                            self._id_routes = count(self._max_route_id() + 1)
+
+                    id_route = next(self._id_routes)
+
+                self.route_buffer.append((id_route, item))
+                return id_route
             case _:
                 return None
 
@@ -216,59 +406,84 @@ class Database:
         """
         Commits any events in the write buffer to the write connection. After
         calling this method, the write buffer is empty and all events have been
-        written to the write connection's database.
+        written to the write connection's database. Event times are converted
+        from seconds since the epoch to datetimes when they are written.
+
+        When writing in the background, this method waits until the writer
+        thread has written all events stored so far.
         """
-        self.write.execute("BEGIN TRANSACTION;")
+        if self._queue is None:
+            with self._lock:
+                self._write(
+                    (self.route_buffer, self.buffer, self.count_buffer)
+                )
+
+            self.buffer = []
+            self.route_buffer = []
+            self.count_buffer = {}
+            return
+
+        self._flush()
+        self._queue.join()
+        self._raise_writer_error()
+
+    def _flush(self):
+        if self._queue is None:
+            self.commit()
+            return
+
+        # Blocks when the queue is full, until the writer thread has caught up
+        # enough. That way, the simulation cannot outrun the writer.
+        self._raise_writer_error()
+        if self.buffer or self.route_buffer or self.count_buffer:
+            self._queue.put(
+                (self.route_buffer, self.buffer, self.count_buffer)
+            )
+            self.buffer = []
+            self.route_buffer = []
+            self.count_buffer = {}
+
+    def _write_in_background(self):
+        assert self._queue is not None
+
+        while (batch := self._queue.get()) is not None:
+            try:
+                if self._error is None:  # discard batches after an error
+                    with self._lock:
+                        self._write(batch)
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+        self._queue.task_done()
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _write(self, batch: _Batch):
+        """
+        Writes the given batch of routes, events, and arrival counts to the
+        write connection, and commits. The events are grouped by type, and each
+        group is written to its table in a single statement, as are the routes
+        and arrival counts. Within each table, rows are written in the order in
+        which they were stored.
+        """
+        routes, events, counts = batch
+        arrivals: list[ArrivalEvent] = []
+        services: list[ServiceEvent] = []
+        breaks: list[BreakEvent] = []
 
-        for event in self.buffer:
+        for event in events:
             match event:
-                case ArrivalEvent() as e:
-                    self.write.execute(
-                        """--sql
-                            INSERT INTO arrival_events (
-                                time,
-                                cluster,
-                                volume
-                            ) VALUES (?, ?, ?);
-                        """,
-                        (e.time, e.cluster.name, e.volume),
-                    )
-                case ServiceEvent() as e:
-                    self.write.execute(
-                        """--sql
-                            INSERT INTO service_events (
-                                time,
-                                duration,
-                                cluster,
-                                id_route,
-                                num_arrivals,
-                                volume
-                            ) VALUES (?, ?, ?, ?, ?, ?);
-                        """,
-                        (
-                            e.time,
-                            e.duration.total_seconds(),
-                            e.cluster.name,
-                            e.id_route,
-                            e.num_arrivals,
-                            e.volume,
-                        ),
-                    )
-                case BreakEvent() as e:
-                    self.write.execute(
-                        """--sql
-                            INSERT INTO break_events (
-                                time,
-                                duration,
-                                id_route
-                            ) VALUES (?, ?, ?);
-                        """,
-                        (
-                            e.time,
-                            e.duration.total_seconds(),
-                            e.id_route,
-                        ),
-                    )
+                case ArrivalEvent():
+                    arrivals.append(event)
+                case ServiceEvent():
+                    services.append(event)
+                case BreakEvent():
+                    breaks.append(event)
                 case ShiftPlanEvent():
                     continue
                 case _:
@@ -276,12 +491,237 @@ class Database:
                     logger.error(msg)
                     raise TypeError(msg)
 
+        self.write.execute("BEGIN TRANSACTION;")
+        self.write.executemany(
+            """--sql
+                INSERT INTO routes (
+                    id_route,
+                    vehicle,
+                    start_time
+                ) VALUES (?, ?, ?);
+            """,
+            zip(
+                [id_route for id_route, _ in routes],
+                [route.vehicle.name for _, route in routes],
+                _to_timestamps([route.start_time for _, route in routes]),
+            ),
+        )
+        self.write.executemany(
+            """--sql
+                INSERT INTO arrival_events (
+                    time,
+                    cluster,
+                    volume
+                ) VALUES (?, ?, ?);
+            """,
+            zip(
+                _to_timestamps([e.time for e in arrivals]),
+                [e.cluster.name for e in arrivals],
+                [e.volume for e in arrivals],
+            ),
+        )
+        self.write.executemany(
+            """--sql
+                INSERT INTO arrival_counts (
+                    time,
+                    cluster,
+                    num_arrivals,
+                    volume
+                ) VALUES (?, ?, ?, ?);
+            """,
+            zip(
+                _to_timestamps([hour for hour, _ in counts]),
+                [cluster for _, cluster in counts],
+                [num_arrivals for num_arrivals, _ in counts.values()],
+                [volume for _, volume in counts.values()],
+            ),
+        )
+        self.write.executemany(
+            """--sql
+                INSERT INTO service_events (
+                    time,
+                    duration,
+                    cluster,
+                    id_route,
+                    num_arrivals,
+                    volume
+                ) VALUES (?, ?, ?, ?, ?, ?);
+            """,
+            zip(
+                _to_timestamps([e.time for e in services]),
+                [e.duration for e in services],
+                [e.cluster.name for e in services],
+                [e.id_route for e in services],
+                [e.num_arrivals for e in services],
+                [e.volume for e in services],
+            ),
+        )
+        self.write.executemany(
+            """--sql
+                INSERT INTO break_events (
+                    time,
+                    duration,
+                    id_route
+                ) VALUES (?, ?, ?);
+            """,
+            zip(
+                _to_timestamps([e.time for e in breaks]),
+                [e.duration for e in breaks],
+                [e.id_route for e in breaks],
+            ),
+        )
+
         self.write.commit()
+
+    def watermark(self) -> dict[str, int]:
+        """
+        Returns the largest row ID in each result table, after first committing
+        any buffered events. This can later be passed to ``truncate()`` to
+        discard all results stored after this moment.
+        """
+        self.commit()
+
+        watermark = {}
+        for table in _RESULT_TABLES:
+            sql = f"SELECT MAX(rowid) FROM {table};"
+            row = self.write.execute(sql).fetchone()
+            watermark[table] = row[0] if row[0] is not None else 0
+
+        return watermark
+
+    def truncate(self, watermark: dict[str, int]):
+        """
+        Deletes all results stored after the given watermark was taken. See
+        also ``watermark()``. Any buffered events are discarded as well.
+        """
+        if self._queue is not None:
+            # Events that were already handed to the writer thread were stored
+            # before now, so they must be written before they can be deleted.
+            self._queue.join()
+            self._raise_writer_error()
+
         self.buffer = []
+        self.route_buffer = []
+        self.count_buffer = {}
+
+        for table in _RESULT_TABLES:
+            sql = f"DELETE FROM {table} WHERE rowid > ?;"
+            self.write.execute(sql, (watermark.get(table, 0),))
+
+        self.write.commit()
+        self._id_routes = None  # continue after the remaining routes
+
+    def append(self, res_db: str):
+        """
+        Appends all results in the given result database to the results in
+        this database. The appended routes are given new route IDs that follow
+        the largest route ID already in this database, so they do not clash.
+        """
+        self.commit()
+
+        offset = self._max_route_id()
+        self.write.execute("ATTACH DATABASE ? AS other;", (res_db,))
+        self.write.execute(
+            """--sql
+                INSERT INTO routes (id_route, vehicle, start_time)
+                SELECT id_route + ?, vehicle, start_time
+                FROM other.routes;
+            """,
+            (offset,),
+        )
+        self.write.execute(
+            """--sql
+                INSERT INTO arrival_events (time, cluster, volume)
+                SELECT time, cluster, volume
+                FROM other.arrival_events;
+            """
+        )
+        self.write.execute(
+            """--sql
+                INSERT INTO arrival_counts (
+                    time,
+                    cluster,
+                    num_arrivals,
+                    volume
+                )
+                SELECT time, cluster, num_arrivals, volume
+                FROM other.arrival_counts;
+            """
+        )
+        self.write.execute(
+            """--sql
+                INSERT INTO break_events (time, duration, id_route)
+                SELECT time, duration, id_route + ?
+                FROM other.break_events;
+            """,
+            (offset,),
+        )
+        self.write.execute(
+            """--sql
+                INSERT INTO service_events (
+                    time,
+                    duration,
+                    cluster,
+                    id_route,
+                    num_arrivals,
+                    volume
+                )
+                SELECT time,
+                       duration,
+                       cluster,
+                       id_route + ?,
+                       num_arrivals,
+                       volume
+                FROM other.service_events;
+            """,
+            (offset,),
+        )
+
+        self.write.commit()
+        self.write.execute("DETACH DATABASE other;")
+        self._id_routes = None  # continue after the appended routes
+
+    def _max_route_id(self) -> int:
+        row = self.write.execute(
+            "SELECT MAX(id_route) FROM routes;"
+        ).fetchone()
+        return row[0] if row[0] is not None else 0
+
+    def close(self):
+        """
+        Commits any buffered events, stops the background writer thread (if
+        any), and closes the database connections. Calling this method again
+        has no effect.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+
+        try:
+            buffers = (self.buffer, self.route_buffer, self.count_buffer)
+            if any(buffers) or self._queue is not None:
+                self.commit()
+        finally:
+            if self._queue is not None and self._writer is not None:
+                self._queue.put(None)
+                self._writer.join()
+
+            self.read.close()
+            self.write.close()
 
     def __del__(self):
-        if self.buffer:
-            self.commit()
+        self.close()
+
+
+def _to_timestamps(seconds: list[int]) -> list[str]:
+    # Converts all given times (in seconds since the epoch) at once into the
+    # same text format as sqlite3 uses when storing datetimes.
+    stamps = np.datetime_as_string(np.array(seconds, dtype="datetime64[s]"))
+    return np.char.replace(stamps, "T", " ").tolist()
+
 
-        self.read.close()
-        self.write.close()
+def _to_seconds(when: datetime) -> int:
+    # Same as ``waste.functions.to_seconds()``, which cannot be imported here
+    # due to an import cycle.
+    return (when - EPOCH) // timedelta(seconds=1)
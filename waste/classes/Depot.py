@@ -1,4 +1,6 @@
 class Depot:
+    __slots__ = ("location", "name")
+
     def __init__(self, name: str, location: tuple[float, float]):
         self.name = name
         self.location = location  # (lat, lon) pair
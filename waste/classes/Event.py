@@ -6,30 +6,37 @@ from typing import TYPE_CHECKING, Optional
 from waste.enums import EventStatus
 
 if TYPE_CHECKING:
-    from datetime import datetime, timedelta
-
     from .Cluster import Cluster
     from .Vehicle import Vehicle
 
 
 class Event(ABC):
     """
-    Event class. Events have a time at which they are fired. See subclasses for
-    more detail.
+    Event class. Events have a time at which they are fired, in seconds since
+    the epoch (see ``waste.constants.EPOCH``). See subclasses for more detail.
+
+    Events use ``__slots__``, since many of them may be alive at once. For the
+    same reason, the event's status is stored as a simple flag.
     """
 
-    def __init__(self, time: datetime):
+    __slots__ = ("_sealed", "time")
+
+    def __init__(self, time: int):
         self.time = time
-        self.status = EventStatus.PENDING
+        self._sealed = False
+
+    @property
+    def status(self) -> EventStatus:
+        return EventStatus.SEALED if self._sealed else EventStatus.PENDING
 
     def is_pending(self) -> bool:
-        return self.status == EventStatus.PENDING
+        return not self._sealed
 
     def is_sealed(self) -> bool:
-        return self.status == EventStatus.SEALED
+        return self._sealed
 
     def seal(self):
-        self.status = EventStatus.SEALED
+        self._sealed = True
 
     def __str__(self) -> str:
         class_name = self.__class__.__name__
@@ -39,12 +46,22 @@ class Event(ABC):
 class ServiceEvent(Event):
     """
     Service event. This event models a cluster being serviced by a vehicle.
+    The service duration is given in seconds.
     """
 
+    __slots__ = (
+        "_num_arrivals",
+        "_volume",
+        "cluster",
+        "duration",
+        "id_route",
+        "vehicle",
+    )
+
     def __init__(
         self,
-        time: datetime,
-        duration: timedelta,
+        time: int,
+        duration: int,
         id_route: int,
         cluster: Cluster,
         vehicle: Vehicle,
@@ -61,7 +78,7 @@ class ServiceEvent(Event):
 
     @property
     def num_arrivals(self) -> int:
-        if self.is_sealed():
+        if self._sealed:
             assert self._num_arrivals is not None
             return self._num_arrivals
 
@@ -69,14 +86,14 @@ class ServiceEvent(Event):
 
     @property
     def volume(self) -> float:
-        if self.is_sealed():
+        if self._sealed:
             assert self._volume is not None
             return self._volume
 
         return self.cluster.volume
 
     def seal(self):
-        if self.is_sealed():  # then this is a no-op
+        if self._sealed:  # then this is a no-op
             return
 
         super().seal()
@@ -89,7 +106,9 @@ class ArrivalEvent(Event):
     Arrival event. This event models a deposit at a cluster.
     """
 
-    def __init__(self, time: datetime, cluster: Cluster, volume: float):
+    __slots__ = ("cluster", "volume")
+
+    def __init__(self, time: int, cluster: Cluster, volume: float):
         super().__init__(time)
         self.cluster = cluster
         self.volume = volume
@@ -100,20 +119,24 @@ class ShiftPlanEvent(Event):
     Shift plan event. This event models the planning of a shift.
     """
 
-    def __init__(self, time: datetime):
+    __slots__ = ()
+
+    def __init__(self, time: int):
         super().__init__(time)
 
 
 class BreakEvent(Event):
     """
     Break event. This event models a driver (of the given vehicle) taking
-    a break of the given duration back at the depot.
+    a break of the given duration (in seconds) back at the depot.
     """
 
+    __slots__ = ("duration", "id_route", "vehicle")
+
     def __init__(
         self,
-        time: datetime,
-        duration: timedelta,
+        time: int,
+        duration: int,
         id_route: int,
         vehicle: Vehicle,
     ):
@@ -114,7 +114,7 @@ class OverflowModel:
         )
 
     def observe(self, x: int, y: bool):
-        logger.debug(f"{self.cluster.name}: observing ({x}, {y}).")
+        logger.debug("%s: observing (%s, %s).", self.cluster.name, x, y)
         self.data = np.vstack([self.data, [x, y]])
 
     def _update_estimates(self, tol: float):
@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class RolloutResult:
+    """
+    Outcomes of Monte Carlo rollouts of a single candidate shift plan. Each
+    rollout simulates the candidate plan, followed by the shift plans of some
+    base policy, over a number of days under sampled arrivals. There is one
+    entry for each rollout in each of the arrays below.
+    """
+
+    # Number of overflows: the number of services at clusters with a volume
+    # exceeding capacity, plus the number of clusters that exceed capacity at
+    # the end of the rollout.
+    overflows: np.ndarray
+
+    # Excess volume (in liters) at those overflowing services and clusters.
+    excess_volumes: np.ndarray
+
+    # Total distance driven (in meters).
+    distances: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.overflows)
+
+    @property
+    def expected_overflows(self) -> float:
+        """
+        Average number of overflows over the rollouts.
+        """
+        return float(np.mean(self.overflows))
+
+    @property
+    def expected_excess_volume(self) -> float:
+        """
+        Average excess volume over the rollouts.
+        """
+        return float(np.mean(self.excess_volumes))
+
+    @property
+    def expected_distance(self) -> float:
+        """
+        Average distance driven over the rollouts.
+        """
+        return float(np.mean(self.distances))
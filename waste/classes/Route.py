@@ -1,5 +1,4 @@
 from dataclasses import dataclass
-from datetime import datetime
 
 from .Vehicle import Vehicle
 
@@ -8,7 +7,7 @@ from .Vehicle import Vehicle
 class Route:
     plan: list[int]  # visited clusters (indices starting at 0)
     vehicle: Vehicle
-    start_time: datetime
+    start_time: int  # in seconds since the epoch
 
     def __len__(self) -> int:
         return len(self.plan)
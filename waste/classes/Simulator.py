@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import copy
+import io
 import logging
-from datetime import datetime
-from heapq import heappop, heappush
-from itertools import count
-from typing import TYPE_CHECKING, Callable, Iterator, Optional
+import pickle
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
 
+import numpy as np
+
+from waste.constants import EPOCH, SECONDS_IN_DAY
+from waste.queues import HeapQueue
+
+from .Checkpoint import Checkpoint
+from .ClusterState import ClusterState
 from .Configuration import Configuration
 from .Event import (
     ArrivalEvent,
@@ -16,11 +24,14 @@ from .Event import (
 )
 
 if TYPE_CHECKING:
-    import numpy as np
+    from concurrent.futures import Executor
+
     from numpy.random import Generator
 
+    from waste.queues import EventQueue
     from waste.strategies import Strategy
 
+    from .ArrivalTrace import ArrivalTrace
     from .Cluster import Cluster
     from .Depot import Depot
     from .Route import Route
@@ -29,35 +40,16 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-class _EventQueue:
-    """
-    Simple internal event queue that efficiently manages events in order of
-    time.
-    """
-
-    def __init__(self):
-        self._events = []
-        self._counter = count(0)
-
-    def __len__(self) -> int:
-        return len(self._events)
-
-    def push(self, event: Event):
-        logger.debug(f"Adding event {event} to the queue at t = {event.time}.")
-
-        tiebreaker = next(self._counter)
-        heappush(self._events, (event.time, tiebreaker, event))
-
-    def pop(self) -> Event:
-        *_, event = heappop(self._events)
-        return event
-
-
 class Simulator:
     """
     The simulator class. This class is responsible for running the main
     simulation event queue, and has a few attributes that describe the
     simulation environment.
+
+    Inside the simulation, all times are integer seconds since the epoch (see
+    ``waste.constants.EPOCH``), and all durations are integer seconds. This
+    includes the duration matrix. Conversion to and from datetimes happens
+    only at the boundaries, e.g., when storing results in the database.
     """
 
     def __init__(
@@ -78,12 +70,67 @@ class Simulator:
         self.vehicles = vehicles
         self.config = config
 
+        # Array-based store of the clusters' data. The clusters are views into
+        # this store, so it always reflects the clusters' current state.
+        self.state = ClusterState.of(clusters)
+
+        # The configuration specifies breaks and service times as times and
+        # timedeltas. We convert those once to seconds, as used internally.
+        second = timedelta(seconds=1)
+        self._breaks = [
+            (
+                (datetime.combine(EPOCH.date(), start) - EPOCH) // second,
+                dur // second,
+            )
+            for start, dur in config.BREAKS
+        ]
+
+        # Service duration at each cluster: a fixed set-up time, plus a time
+        # per container in the cluster.
+        num_containers = self.state.num_containers
+        self._service_durations = (
+            config.TIME_PER_CLUSTER // second
+            + num_containers * (config.TIME_PER_CONTAINER // second)
+        ).astype(np.int64)
+
+    def clone(self, generator: Generator) -> Simulator:
+        """
+        Returns a copy of this simulator that uses the given random number
+        generator. The copy has its own clusters with a copy of the current
+        cluster state, so simulating with the copy does not affect this
+        simulator. Everything else that does not change during simulation,
+        like the depot, vehicles, and distance and duration matrices, is
+        shared with this simulator. That makes cloning cheap, e.g. to simulate
+        many short rollouts from the current state.
+        """
+        state = self.state.copy()
+        clusters = [copy.copy(cluster) for cluster in self.clusters]
+        for idx, cluster in enumerate(clusters):
+            cluster.bind(state, idx)
+
+        return Simulator(
+            generator,
+            self.depot,
+            self.distances,
+            self.durations,
+            clusters,
+            self.vehicles,
+            self.config,
+        )
+
     def __call__(
         self,
         store: Callable[[Event | Route], Optional[int]],
         strategy: Strategy,
-        initial_events: list[Event],
-    ):
+        initial_events: Iterable[Event],
+        arrivals: Optional[ArrivalTrace] = None,
+        stream: Iterable[Event] = (),
+        queue: Optional[EventQueue] = None,
+        checkpoint: Optional[Callable[[Checkpoint], None]] = None,
+        until: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        store_arrivals: bool = True,
+    ) -> Checkpoint:
         """
         Applies a strategy for a simulation starting with the given initial
         events.
@@ -97,107 +144,565 @@ class Simulator:
             Shift plan strategy to apply. Is called to generate new shift
             plans on shift plan events.
         initial_events
-            Initial list of events to seed the simulation with.
+            Initial events to seed the simulation with.
+        arrivals
+            Optional arrival trace. When given, the arrivals in this trace are
+            not processed as separate events, but are instead applied in bulk
+            to each cluster just before that cluster is serviced, or a shift
+            plan is generated. The initial events should then not contain any
+            arrival events. Default None, in which case all arrivals are
+            expected to be part of the initial events.
+        stream
+            Optional stream of additional events, ordered in time. Unlike the
+            initial events, these events are not all added to the event queue
+            up front. Instead, each event is pulled from the stream only when
+            it is next to happen. This is useful to keep memory use bounded
+            over long time horizons, for example with ``generate_arrivals()``.
+        queue
+            Optional empty event queue to use for the simulation. Default None,
+            in which case a binary heap-based queue is used.
+        checkpoint
+            Optional function that is called with a checkpoint of the current
+            simulation state just before each shift plan event. Can be used to
+            save that state, so the simulation can later be resumed from it
+            using ``resume()``. Default None.
+        until
+            Time (in seconds since the epoch) at which to stop the simulation.
+            The simulation stops just before the first shift plan event at or
+            after this time. Default None, in which case all events are
+            simulated.
+        executor
+            Optional process pool executor. When given, each shift plan is
+            generated in a worker process of this executor. Meanwhile, the
+            simulation continues with the events that cannot depend on the
+            shift plan. The results are the same as when planning in this
+            process. Default None, in which case shift plans are generated in
+            this process.
+        store_arrivals
+            Whether to store the arrivals in the arrival trace, if any. When
+            these are not stored, and the strategy does not observe arrival
+            events, the arrivals are applied to the clusters without creating
+            arrival events for them. Default True.
+
+        Returns
+        -------
+        Checkpoint
+            The simulation state at the moment the simulation stopped. When
+            the simulation stopped early, it can be resumed from this state.
         """
-        events = _EventQueue()
+        events = queue if queue is not None else HeapQueue()
 
         for event in initial_events:
             events.push(event)
 
-        while events:
+        stream = iter(stream)
+        upcoming = next(stream, None)
+
+        state = Checkpoint(self, strategy, events, stream, upcoming, arrivals)
+        return self._run(
+            store, state, checkpoint, until, executor, store_arrivals
+        )
+
+    def resume(
+        self,
+        store: Callable[[Event | Route], Optional[int]],
+        state: Checkpoint,
+        checkpoint: Optional[Callable[[Checkpoint], None]] = None,
+        until: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        store_arrivals: bool = True,
+    ) -> Checkpoint:
+        """
+        Resumes a simulation from the given checkpoint. The checkpoint must
+        have been taken of this simulator, which is the case for the simulator
+        that is loaded together with the checkpoint.
+
+        Parameters
+        ----------
+        store
+            Function that is called for each new event. See ``__call__()``.
+        state
+            Checkpoint to resume the simulation from.
+        checkpoint
+            Optional function that is called with a checkpoint of the current
+            simulation state just before each shift plan event. Default None.
+        until
+            Time at which to stop the simulation. See ``__call__()``.
+        executor
+            Optional executor to generate shift plans with. See
+            ``__call__()``.
+        store_arrivals
+            Whether to store the arrivals in the arrival trace. See
+            ``__call__()``.
+
+        Returns
+        -------
+        Checkpoint
+            The simulation state at the moment the simulation stopped.
+        """
+        if state.sim is not self:
+            raise ValueError("Checkpoint was not taken of this simulator.")
+
+        return self._run(
+            store, state, checkpoint, until, executor, store_arrivals
+        )
+
+    def _run(
+        self,
+        store: Callable[[Event | Route], Optional[int]],
+        state: Checkpoint,
+        checkpoint: Optional[Callable[[Checkpoint], None]],
+        until: Optional[int],
+        executor: Optional[Executor],
+        store_arrivals: bool,
+    ) -> Checkpoint:
+        # Arrivals from the trace are only stored when requested. Otherwise,
+        # no arrival events are created for them at all, unless the strategy
+        # observes those.
+        arrival_store = store if store_arrivals else None
+        events = state.queue
+        cluster2idx = {id(c): idx for idx, c in enumerate(self.clusters)}
+
+        while self._push_due(state):
+            # Checkpoints are taken just before a shift plan event is handled.
+            # That is also the moment at which we stop early, if requested.
+            if isinstance(events.peek(), ShiftPlanEvent):
+                if until is not None and events.peek().time >= until:
+                    return state
+
+                if checkpoint is not None:
+                    checkpoint(state)
+
             event = events.pop()
+            self._process(
+                event, store, arrival_store, state, cluster2idx, executor
+            )
 
-            # First seal the event. This ensures all data that was previously
-            # linked to changing objects is made static at their current
-            # values ("sealed"). After sealing, an event's state has become
-            # independent from that of the objects it references.
-            event.seal()
+        if state.arrivals is not None:
+            # Apply any remaining arrivals that happen after the last event, so
+            # that all arrivals in the trace have happened (and are stored).
+            end = np.iinfo(np.int64).max
+            for idx in range(len(self.clusters)):
+                self._arrive(
+                    state.arrivals, idx, end, arrival_store, state.strategy
+                )
+
+        state.upcoming = None
+        return state
+
+    def _push_due(
+        self, state: Checkpoint, before: Optional[int] = None
+    ) -> bool:
+        """
+        Adds the upcoming stream event to the event queue once it is due: that
+        is, when it happens no later than the first queued event. If ``before``
+        is given, the upcoming event is only added when it happens before that
+        time. Returns whether there are any queued events to process.
+        """
+        events = state.queue
+        upcoming = state.upcoming
 
-            # Store the event, and pass it to the strategy so it can do its
-            # own thing.
-            store(event)
-            strategy.observe(event)
+        if (
+            upcoming is not None
+            and (not events or upcoming.time <= events.peek().time)
+            and (before is None or upcoming.time < before)
+        ):
+            events.push(upcoming)
+            state.upcoming = next(state.stream, None)
+
+        return bool(events)
 
+    def _process(
+        self,
+        event: Event,
+        store: Callable[[Event | Route], Optional[int]],
+        arrival_store: Optional[Callable[[Event | Route], Optional[int]]],
+        state: Checkpoint,
+        cluster2idx: dict[int, int],
+        executor: Optional[Executor],
+    ):
+        strategy = state.strategy
+        arrivals = state.arrivals
+
+        if arrivals is not None:
+            # Arrivals only matter when a cluster is serviced, or when the
+            # strategy needs to make decisions. So that is the only time we
+            # need to bring the clusters' state up to date. Arrivals at the
+            # same time as a service happen before it, but those at the same
+            # time as a shift plan happen after it: that is the order in which
+            # the event queue processes the corresponding arrival events.
             match event:
-                case ArrivalEvent(time=time, cluster=c, volume=vol):
-                    logger.debug(f"Arrival at {c.name} at t = {time}.")
-                    c.arrive(vol)
                 case ServiceEvent(time=time, cluster=c):
-                    logger.debug(f"Service at {c.name} at t = {time}.")
-                    c.service()
-                case BreakEvent(time=time, vehicle=v):
-                    logger.debug(f"Break for {v.name} at t = {time}.")
+                    idx = cluster2idx[id(c)]
+                    self._arrive(arrivals, idx, time, arrival_store, strategy)
                 case ShiftPlanEvent(time=time):
-                    logger.info(f"Generating shift plan at t = {time}.")
-                    for route in strategy.plan(event):
-                        id_route = store(route)
-                        assert id_route is not None
-
-                        for event in self._plan_route(route, id_route):
-                            events.push(event)
-                case _:
-                    msg = f"Unhandled event of type {type(event)}."
-                    logger.error(msg)
-                    raise ValueError(msg)
-
-    def _plan_route(self, route: Route, id_route: int) -> Iterator[Event]:
-        now = route.start_time
-        prev = 0  # start from depot
+                    for idx in range(len(self.clusters)):
+                        self._arrive(
+                            arrivals,
+                            idx,
+                            time,
+                            arrival_store,
+                            strategy,
+                            inclusive=False,
+                        )
+
+        # First seal the event. This ensures all data that was previously
+        # linked to changing objects is made static at their current values
+        # ("sealed"). After sealing, an event's state has become independent
+        # from that of the objects it references.
+        event.seal()
+
+        # Store the event, and pass it to the strategy so it can do its own
+        # thing - but only if the strategy is interested in it.
+        store(event)
+        if isinstance(event, getattr(strategy, "observes", (Event,))):
+            strategy.observe(event)
+
+        # The debug messages below use lazy formatting, so they are only
+        # formatted when debug logging is enabled. Otherwise, formatting the
+        # messages takes a large share of the simulation's runtime.
+        match event:
+            case ArrivalEvent(time=time, cluster=c, volume=vol):
+                logger.debug("Arrival at %s at t = %s.", c.name, time)
+                c.arrive(vol)
+            case ServiceEvent(time=time, cluster=c):
+                logger.debug("Service at %s at t = %s.", c.name, time)
+                c.service()
+            case BreakEvent(time=time, vehicle=v):
+                logger.debug("Break for %s at t = %s.", v.name, time)
+            case ShiftPlanEvent(time=time):
+                logger.info(f"Generating shift plan at t = {time}.")
+
+                deferred: list[Event | Route] = []
+
+                if executor is None:
+                    routes = strategy.plan(event)
+                else:
+                    routes, deferred = self._plan_speculatively(
+                        event, arrival_store, state, cluster2idx, executor
+                    )
+
+                for route in routes:
+                    id_route = store(route)
+                    assert id_route is not None
+
+                    for route_event in self._plan_route(route, id_route):
+                        state.queue.push(route_event)
+
+                # Events that were processed while planning are stored only
+                # after the routes, exactly as if they were processed after
+                # planning.
+                for deferred_event in deferred:
+                    store(deferred_event)
+            case _:
+                msg = f"Unhandled event of type {type(event)}."
+                logger.error(msg)
+                raise ValueError(msg)
+
+    def _plan_speculatively(
+        self,
+        event: ShiftPlanEvent,
+        arrival_store: Optional[Callable[[Event | Route], Optional[int]]],
+        state: Checkpoint,
+        cluster2idx: dict[int, int],
+        executor: Executor,
+    ) -> tuple[list[Route], list[Event | Route]]:
+        """
+        Plans routes for the given shift plan event in a worker process, and
+        meanwhile processes the events that happen before the earliest moment
+        at which any of the planned events could happen. Those events cannot
+        depend on the plan, so this does not change the simulation's results.
+        Returns the planned routes and the processed events. The latter have
+        not yet been stored.
+
+        The strategy's ``plan()`` method runs on a copy of the simulator and
+        strategy. Afterwards, the strategy takes on the state of its copy, and
+        then observes again the processed events it observed while planning.
+        The simulator takes on the state of its copy's random number generator.
+        The strategy's ``plan()`` method may not change any other state of the
+        simulator, and its ``observe()`` method should only depend on the
+        observed events.
+        """
+        # The simulator and strategy are pickled here, rather than in the
+        # executor, to ensure the worker sees their current state, and not
+        # that after processing some of the events below.
+        payload = pickle.dumps((self, state.strategy, event))
+        future = executor.submit(_plan_in_worker, payload)
+
+        deferred: list[Event | Route] = []
+        earliest = self._earliest_plan_time(event.time)
+
+        while self._push_due(state, before=earliest):
+            upcoming = state.queue.peek()
+            if (
+                isinstance(upcoming, ShiftPlanEvent)
+                or upcoming.time >= earliest
+            ):
+                break
+
+            # Arrivals from the trace are deferred too, but only if they are
+            # stored at all.
+            defer_arrivals = None if arrival_store is None else deferred.append
+            state.queue.pop()
+            self._process(
+                upcoming,
+                deferred.append,
+                defer_arrivals,
+                state,
+                cluster2idx,
+                None,
+            )
+
+        result, generator_state = future.result()
+        self.generator.bit_generator.state = generator_state
+
+        # The routes and strategy refer to the simulator objects of the worker,
+        # which are replaced by this simulator's objects when unpickling.
+        unpickler = _SimulatorUnpickler(io.BytesIO(result), self)
+        routes, planned = unpickler.load()
+
+        # The strategy is updated in place, since it may also be referenced
+        # elsewhere. Its observations of the processed events are lost that
+        # way, so those events are observed again by the updated strategy.
+        strategy = state.strategy
+        vars(strategy).update(vars(planned))
+
+        observes = getattr(strategy, "observes", (Event,))
+        for processed in deferred:
+            assert isinstance(processed, Event)  # no routes while planning
+            if isinstance(processed, observes):
+                strategy.observe(processed)
+
+        return routes, deferred
+
+    def _earliest_plan_time(self, now: int) -> int:
+        """
+        Returns the earliest time at which any event resulting from a shift
+        plan made at the given time could happen. Routes start no earlier than
+        the shift plan, and then first travel from the depot to a cluster, or
+        have a break at its usual start time.
+        """
+        if len(self.clusters) == 0:
+            return now
+
+        earliest = now + int(self.durations[0, 1:].min())
+
+        day = now - now % SECONDS_IN_DAY
+        for start, _ in self._breaks:
+            if day + start >= now:
+                earliest = min(earliest, day + start)
+            else:
+                earliest = min(earliest, day + SECONDS_IN_DAY + start)
+
+        return earliest
+
+    def _arrive(
+        self,
+        arrivals: ArrivalTrace,
+        idx: int,
+        time: int,
+        store: Optional[Callable[[Event | Route], Optional[int]]],
+        strategy: Strategy,
+        inclusive: bool = True,
+    ):
+        cluster = self.clusters[idx]
+        times, volumes = arrivals.advance(idx, time, inclusive)
+        observes = getattr(strategy, "observes", (Event,))
+        observe = issubclass(ArrivalEvent, observes)
+
+        # The arrivals are still stored and observed, so the results of this
+        # bulk update are the same as when processing each arrival event
+        # separately. The events are created already sealed, since they have
+        # already happened. When the arrivals are neither stored nor observed,
+        # we do not need the events at all.
+        if store is not None or observe:
+            for arr_time, volume in zip(times.tolist(), volumes):
+                event = ArrivalEvent(arr_time, cluster=cluster, volume=volume)
+                event.seal()
+
+                if store is not None:
+                    store(event)
+
+                if observe:
+                    strategy.observe(event)
+
+        cluster.arrive_many(volumes)
+
+    def _plan_route(self, route: Route, id_route: int) -> list[Event]:
+        if not route.plan:
+            return []
+
+        plan = np.asarray(route.plan)
+        stops = plan + 1  # + 1 because 0 is depot
+        service = self._service_durations[plan]
 
         # We filter the breaks: only those breaks that are *after* the route's
         # start time must be taken. If we start later than a break, we can
-        # freely skip that one.
-        break_idx = 0
+        # freely skip that one. Break start times are given in seconds since
+        # midnight, so we offset those by the start of the current day.
+        route_start = route.start_time
+        route_day = route_start - route_start % SECONDS_IN_DAY
         breaks = [
             (start, break_dur)
-            for start, break_dur in self.config.BREAKS
-            if datetime.combine(now.date(), start) >= route.start_time
+            for start, break_dur in self._breaks
+            if route_day + start >= route_start
         ]
 
-        for cluster_idx in route.plan:
-            idx = cluster_idx + 1  # + 1 because 0 is depot
-            cluster = self.clusters[cluster_idx]
-
-            service_duration = (
-                self.config.TIME_PER_CLUSTER
-                + cluster.num_containers * self.config.TIME_PER_CONTAINER
+        # The route is timed in segments that are separated by breaks. Within
+        # a segment, the stop times follow from cumulative sums of the travel
+        # and service durations. A break is had before the first stop where
+        # servicing that stop and then returning to the depot would make us
+        # late for the break. Each stop is checked against one break at most:
+        # after a break before some stop, the next break is checked only from
+        # the stop after it on.
+        service_starts = np.empty(len(plan), dtype=np.int64)
+        break_events: list[tuple[int, BreakEvent]] = []
+
+        now = route_start
+        first = 0  # index of the first stop in the current segment
+        prev = 0  # start from depot
+        check = 0  # index of the first stop to check against the next break
+
+        for start, break_dur in breaks:
+            seg = stops[first:]
+            frm, departs, arrives, finishes = self._time_stops(seg, prev, now)
+
+            # Breaks start at the given time on the day we leave for each
+            # stop. That is the route's start day, unless the route runs past
+            # midnight.
+            break_starts = departs - departs % SECONDS_IN_DAY + start
+            returns = finishes + self.durations[seg, 0]
+            is_late = returns > break_starts
+            is_late[: check - first] = False
+
+            if not is_late.any():
+                break
+
+            # We're travelling back to the depot to take this break, which
+            # happens just before the stop at index ``pos``. We travel back to
+            # the depot, which takes less time than the start of the break. So
+            # we have to wait a little bit, and then have the break starting
+            # at the break's start time.
+            offset = int(np.argmax(is_late))
+            pos = first + offset
+            service_starts[first:pos] = arrives[:offset]
+
+            now = break_starts[offset].item()
+            assert now >= departs[offset] + self.durations[frm[offset], 0]
+
+            event = BreakEvent(now, break_dur, id_route, route.vehicle)
+            break_events.append((pos, event))
+
+            now += break_dur
+            first = pos
+            prev = 0
+            check = pos + 1
+
+        *_, arrives, _ = self._time_stops(stops[first:], prev, now)
+        service_starts[first:] = arrives
+
+        events: list[Event] = [
+            ServiceEvent(
+                time,
+                duration,
+                id_route=id_route,
+                cluster=self.clusters[cluster_idx],
+                vehicle=route.vehicle,
+            )
+            for time, duration, cluster_idx in zip(
+                service_starts.tolist(),
+                service.tolist(),
+                plan.tolist(),
             )
+        ]
 
-            if break_idx < len(breaks):
-                start, break_dur = breaks[break_idx]
-                break_start = datetime.combine(now.date(), start)
+        # Insert the breaks before the stops they precede. Going in reverse
+        # keeps the positions of the earlier breaks valid.
+        for pos, event in reversed(break_events):
+            events.insert(pos, event)
 
-                # If servicing the current cluster makes us late for the break,
-                # we first plan the break. A break is had at the depot.
-                travel = self.durations[prev, idx].item()
-                finish_at = now + travel + service_duration
+        return events
 
-                if finish_at + self.durations[idx, 0].item() > break_start:
-                    # We're travelling back to the depot to take this break.
-                    # Increases the break index, and yield a break event.
-                    break_idx += 1
+    def _time_stops(
+        self,
+        stops: np.ndarray,
+        prev: int,
+        now: int,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Times visiting the given stops (indices into the duration matrix) in
+        order, when leaving from ``prev`` at time ``now``. Returns the previous
+        location of each stop, and the times at which we leave for each stop,
+        arrive at each stop, and finish service at each stop.
+        """
+        frm = np.empty_like(stops)
+        frm[0] = prev
+        frm[1:] = stops[:-1]
 
-                    # We travel back to the depot, which takes less time than
-                    # the start of the break. So we have to wait a little bit,
-                    # and then have the break starting at the start_time.
-                    assert break_start >= now + self.durations[prev, 0].item()
-                    now = break_start
+        travel = self.durations[frm, stops]
+        service = self._service_durations[stops - 1]
 
-                    yield BreakEvent(now, break_dur, id_route, route.vehicle)
+        finishes = now + np.cumsum(travel + service)
+        arrives = finishes - service
+        departs = arrives - travel
 
-                    now += break_dur
-                    prev = 0
+        return frm, departs, arrives, finishes
 
-            # Travel from prev to current cluster, and start service there.
-            now += self.durations[prev, idx].item()
 
-            yield ServiceEvent(
-                now,
-                service_duration,
-                id_route=id_route,
-                cluster=cluster,
-                vehicle=route.vehicle,
-            )
+def _plan_in_worker(payload: bytes) -> tuple[bytes, dict]:
+    """
+    Plans routes in a worker process. See ``Simulator._plan_speculatively()``.
+    Returns the pickled routes and strategy after planning, and the state of
+    the simulator's random number generator after planning.
+    """
+    sim, strategy, event = pickle.loads(payload)
+    routes = strategy.plan(event)
+
+    buffer = io.BytesIO()
+    _SimulatorPickler(buffer, sim).dump((routes, strategy))
+    return buffer.getvalue(), sim.generator.bit_generator.state
+
+
+def _simulator_objects(sim: Simulator) -> dict[str, Any]:
+    """
+    Returns the simulator and the objects it owns, by a key that identifies
+    each object among those of any copy of the simulator.
+    """
+    objects = {
+        "sim": sim,
+        "generator": sim.generator,
+        "depot": sim.depot,
+        "state": sim.state,
+    }
+    objects.update((f"cluster {i}", c) for i, c in enumerate(sim.clusters))
+    objects.update((f"vehicle {i}", v) for i, v in enumerate(sim.vehicles))
+    return objects
+
+
+class _SimulatorPickler(pickle.Pickler):
+    """
+    Pickler that pickles the given simulator and the objects it owns by their
+    keys, rather than by value. See ``_SimulatorUnpickler``.
+    """
+
+    def __init__(self, file, sim: Simulator):
+        super().__init__(file)
+        objects = _simulator_objects(sim)
+        self._keys = {id(obj): key for key, obj in objects.items()}
+
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        return self._keys.get(id(obj))
+
+
+class _SimulatorUnpickler(pickle.Unpickler):
+    """
+    Unpickler that replaces the simulator objects pickled by key by those of
+    the given simulator. See ``_SimulatorPickler``.
+    """
+
+    def __init__(self, file, sim: Simulator):
+        super().__init__(file)
+        self._objects = _simulator_objects(sim)
 
-            now += service_duration
-            prev = idx
+    def persistent_load(self, pid: str) -> Any:
+        return self._objects[pid]
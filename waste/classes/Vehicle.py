@@ -2,6 +2,8 @@ from datetime import time
 
 
 class Vehicle:
+    __slots__ = ("capacity", "name", "shift_end", "shift_start")
+
     def __init__(
         self,
         name: str,
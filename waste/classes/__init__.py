@@ -1,4 +1,9 @@
+from .ArrivalStream import ArrivalStream as ArrivalStream
+from .ArrivalTrace import ArrivalTrace as ArrivalTrace
+from .BatchSimulator import BatchSimulator as BatchSimulator
+from .Checkpoint import Checkpoint as Checkpoint
 from .Cluster import Cluster as Cluster
+from .ClusterState import ClusterState as ClusterState
 from .Configuration import Configuration as Configuration
 from .Database import Database as Database
 from .Depot import Depot as Depot
@@ -8,6 +13,7 @@ from .Event import Event as Event
 from .Event import ServiceEvent as ServiceEvent
 from .Event import ShiftPlanEvent as ShiftPlanEvent
 from .OverflowModel import OverflowModel as OverflowModel
+from .RolloutResult import RolloutResult as RolloutResult
 from .Route import Route as Route
 from .Simulator import Simulator as Simulator
 from .Vehicle import Vehicle as Vehicle
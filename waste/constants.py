@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from waste.enums import LocationType
 
 # Stadsbeheer; the junkyard is ~200m down the road from this location.
@@ -13,3 +15,9 @@ DEPOT = (
 
 BUFFER_SIZE = 999
 HOURS_IN_DAY = 24
+SECONDS_IN_HOUR = 3_600
+SECONDS_IN_DAY = 86_400
+
+# Inside the simulation, times are integer seconds since this epoch. The epoch
+# is at midnight, so a time modulo SECONDS_IN_DAY gives its time of day.
+EPOCH = datetime(1970, 1, 1)
@@ -0,0 +1,14 @@
+from enum import IntEnum
+
+
+class Sampling(IntEnum):
+    """
+    Sampling methods for generating arrivals. The standard method uses numpy's
+    samplers directly. The other methods transform uniform random numbers by
+    inverting the distribution functions, which allows variance reduction.
+    """
+
+    STANDARD = 0
+    INVERSION = 1  # independent uniforms
+    ANTITHETIC = 2  # antithetic uniforms, paired with INVERSION
+    STRATIFIED = 3  # stratified uniforms
@@ -1,2 +1,3 @@
 from .EventStatus import EventStatus as EventStatus
 from .LocationType import LocationType as LocationType
+from .Sampling import Sampling as Sampling
@@ -1,3 +1,13 @@
+from .cluster_seeds import cluster_seeds as cluster_seeds
+from .confidence_interval import confidence_interval as confidence_interval
+from .evaluate_plans import evaluate_plans as evaluate_plans
 from .f2i import f2i as f2i
+from .generate_arrivals import generate_arrivals as generate_arrivals
 from .generate_events import generate_events as generate_events
+from .generate_trace import generate_trace as generate_trace
+from .generate_traces import generate_traces as generate_traces
 from .make_model import make_model as make_model
+from .replay_arrivals import replay_arrivals as replay_arrivals
+from .split_horizon import split_horizon as split_horizon
+from .to_datetime import to_datetime as to_datetime
+from .to_seconds import to_seconds as to_seconds
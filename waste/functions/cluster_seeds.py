@@ -0,0 +1,21 @@
+import numpy as np
+
+from waste.classes import Cluster
+
+
+def cluster_seeds(
+    entropy: int, clusters: list[Cluster]
+) -> list[np.random.SeedSequence]:
+    """
+    Returns an independent seed sequence for each of the given clusters, all
+    derived from the given entropy. The seed sequence of a cluster is keyed by
+    the cluster's name, rather than by its position in the list of clusters.
+    So the random numbers drawn for a cluster do not depend on which other
+    clusters there are, or on the order of the clusters: adding or removing a
+    cluster does not change the random numbers of any of the others. Cluster
+    names are assumed to be unique.
+    """
+    return [
+        np.random.SeedSequence(entropy, spawn_key=tuple(c.name.encode()))
+        for c in clusters
+    ]
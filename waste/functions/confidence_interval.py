@@ -0,0 +1,42 @@
+import numpy as np
+from scipy.stats import t
+
+
+def confidence_interval(
+    values: np.ndarray,
+    antithetic: bool = False,
+    level: float = 0.95,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the mean of the given values of independent replications, and
+    the half-width of a confidence interval around that mean. The values are
+    stacked along the first axis, one entry for each replication.
+
+    When antithetic is set, consecutive replications are antithetic pairs: the
+    first and second replications form a pair, the third and fourth, and so
+    on. The replications within a pair are not independent, but the pairs
+    are. So the values are first averaged within each pair, and the confidence
+    interval is based on those pair averages.
+
+    Returns
+    -------
+    tuple
+        The mean and the half-width of the confidence interval.
+    """
+    values = np.asarray(values, dtype=float)
+
+    if antithetic:
+        if len(values) % 2 != 0:
+            raise ValueError("Expected an even number of replications.")
+
+        values = (values[::2] + values[1::2]) / 2
+
+    num_samples = len(values)
+    if num_samples < 2:
+        raise ValueError("Expected at least two independent samples.")
+
+    mean = values.mean(axis=0)
+    std_err = values.std(axis=0, ddof=1) / np.sqrt(num_samples)
+    quantile = t.ppf((1 + level) / 2, df=num_samples - 1)
+
+    return mean, quantile * std_err
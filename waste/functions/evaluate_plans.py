@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import logging
+import pickle
+import time
+from itertools import count
+from typing import TYPE_CHECKING, Callable, Optional
+
+import numpy as np
+
+from waste.classes import (
+    Event,
+    RolloutResult,
+    Route,
+    ServiceEvent,
+    ShiftPlanEvent,
+    Simulator,
+)
+from waste.constants import SECONDS_IN_DAY
+
+from .generate_trace import generate_trace
+from .to_datetime import to_datetime
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from waste.strategies import Strategy
+
+logger = logging.getLogger(__name__)
+
+
+def evaluate_plans(
+    sim: Simulator,
+    event: ShiftPlanEvent,
+    candidates: list[list[Route]],
+    policy: Callable[[Simulator], Strategy],
+    num_rollouts: int,
+    num_days: int,
+    seed: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> list[RolloutResult]:
+    """
+    Evaluates candidate shift plans for the given shift plan event by Monte
+    Carlo rollouts. Each rollout starts from a clone of the simulator's current
+    state, executes the candidate plan, and then simulates the next days with
+    shift plans from the given base policy, under sampled arrivals. Rollout
+    ``k`` uses the same arrivals for every candidate (common random numbers),
+    so differences between the candidates are not due to sampling noise in the
+    arrivals alone.
+
+    Parameters
+    ----------
+    sim
+        Simulation environment. Its current cluster state is the starting
+        point of each rollout, and is not changed by this function.
+    event
+        The shift plan event for which the candidate plans are evaluated.
+    candidates
+        Candidate shift plans to evaluate.
+    policy
+        Function that creates the base policy for a rollout, given the
+        rollout's simulator. This is typically a strategy class, or a partial
+        application thereof (when the strategy requires arguments).
+    num_rollouts
+        Number of rollouts to simulate for each candidate.
+    num_days
+        Number of days to simulate in each rollout, starting at the shift plan
+        event. This includes the day of the candidate plan.
+    seed
+        Seed for the rollouts' random number generators. Default None, in which
+        case a seed is drawn from the simulator's random number generator.
+    executor
+        Optional process pool executor. When given, the rollouts of each
+        candidate are simulated in a worker process of this executor. Default
+        None, in which case all rollouts are simulated in this process.
+
+    Returns
+    -------
+    list
+        Rollout results, one for each candidate plan.
+    """
+    if num_rollouts < 1:
+        raise ValueError("Expected num_rollouts >= 1.")
+
+    if num_days < 1:
+        raise ValueError("Expected num_days >= 1.")
+
+    if seed is None:
+        seed = int(sim.generator.integers(np.iinfo(np.int64).max))
+
+    seeds = np.random.SeedSequence(seed).spawn(num_rollouts)
+    start = time.perf_counter()
+
+    if executor is None:
+        results = [
+            _rollouts(sim, event, routes, policy, num_days, seeds)
+            for routes in candidates
+        ]
+    else:
+        # The simulator is pickled only once, and then sent to each worker
+        # together with the candidate plans.
+        payload = pickle.dumps((sim, event, candidates, policy, num_days))
+        futures = [
+            executor.submit(_rollouts_in_worker, payload, idx, seeds)
+            for idx in range(len(candidates))
+        ]
+        results = [future.result() for future in futures]
+
+    runtime = time.perf_counter() - start
+    total = num_rollouts * len(candidates)
+    logger.info(
+        f"Simulated {total} rollouts of {num_days} days in {runtime:.2f}s "
+        f"({total / max(runtime, 1e-9):.1f} rollouts/s)."
+    )
+
+    return results
+
+
+def _rollouts_in_worker(
+    payload: bytes,
+    idx: int,
+    seeds: list[np.random.SeedSequence],
+) -> RolloutResult:
+    sim, event, candidates, policy, num_days = pickle.loads(payload)
+    return _rollouts(sim, event, candidates[idx], policy, num_days, seeds)
+
+
+def _rollouts(
+    sim: Simulator,
+    event: ShiftPlanEvent,
+    routes: list[Route],
+    policy: Callable[[Simulator], Strategy],
+    num_days: int,
+    seeds: list[np.random.SeedSequence],
+) -> RolloutResult:
+    outcomes = [
+        _rollout(sim, event, routes, policy, num_days, seed) for seed in seeds
+    ]
+
+    overflows, excess_volumes, distances = zip(*outcomes)
+    return RolloutResult(
+        np.array(overflows, dtype=int),
+        np.array(excess_volumes, dtype=float),
+        np.array(distances, dtype=float),
+    )
+
+
+def _rollout(
+    sim: Simulator,
+    event: ShiftPlanEvent,
+    routes: list[Route],
+    policy: Callable[[Simulator], Strategy],
+    num_days: int,
+    seed: np.random.SeedSequence,
+) -> tuple[int, float, float]:
+    clone = sim.clone(np.random.default_rng(seed))
+    now = event.time
+    end = now + num_days * SECONDS_IN_DAY
+
+    # Arrivals before now have already happened, and are reflected in the
+    # current cluster state. So we skip those in the sampled arrival trace.
+    # Arrivals at exactly this time happen after the shift plan is made.
+    first, last = to_datetime(now).date(), to_datetime(end).date()
+    arrivals = generate_trace(clone, first, last)
+    for idx in range(len(clone.clusters)):
+        arrivals.advance(idx, now, inclusive=False)
+
+    capacities = clone.state.capacities
+    distances: np.ndarray = clone.distances
+    overflows = 0
+    excess = 0.0
+    distance = 0.0
+    id_routes = count(1)
+
+    def store(item: Event | Route) -> Optional[int]:
+        nonlocal overflows, excess, distance
+
+        match item:
+            case Route(plan=plan):
+                stops = [0, *(np.asarray(plan) + 1), 0]
+                distance += float(distances[stops[:-1], stops[1:]].sum())
+                return next(id_routes)
+            case ServiceEvent(cluster=cluster, volume=volume):
+                if volume > cluster.capacity:
+                    overflows += 1
+                    excess += volume - cluster.capacity
+
+        return None
+
+    # The rollout stops just before the shift plan event at the end, so the
+    # candidate plan and the policy's plans for the other days are simulated.
+    init = [
+        ShiftPlanEvent(now + day * SECONDS_IN_DAY)
+        for day in range(num_days + 1)
+    ]
+
+    # The arrivals are not stored, since only services and routes matter for
+    # the rollout's results.
+    strategy = _CandidateStrategy(routes, policy(clone))
+    clone(store, strategy, init, arrivals, until=end, store_arrivals=False)
+
+    # Clusters that overflow at the end of the rollout also count. These
+    # include the arrivals that happened since the last service event.
+    for idx, cluster in enumerate(clone.clusters):
+        _, volumes = arrivals.advance(idx, end, inclusive=False)
+        cluster.arrive_many(volumes)
+
+    volumes = clone.state.volumes
+    overflows += int(np.count_nonzero(volumes > capacities))
+    excess += float(np.maximum(volumes - capacities, 0).sum())
+
+    return overflows, excess, distance
+
+
+class _CandidateStrategy:
+    """
+    Strategy that returns the candidate plan at the first shift plan event,
+    and defers to the base policy after that.
+    """
+
+    def __init__(self, routes: list[Route], policy: Strategy):
+        self.routes: Optional[list[Route]] = routes
+        self.policy = policy
+        self.observes = getattr(policy, "observes", (Event,))
+
+    def plan(self, event: ShiftPlanEvent) -> list[Route]:
+        if self.routes is not None:
+            routes, self.routes = self.routes, None
+            return routes
+
+        return self.policy.plan(event)
+
+    def observe(self, event: Event):
+        self.policy.observe(event)
@@ -0,0 +1,38 @@
+from datetime import date, datetime, time
+
+import numpy as np
+
+from waste.classes import ArrivalStream, Simulator
+
+from .cluster_seeds import cluster_seeds
+from .to_seconds import to_seconds
+
+
+def generate_arrivals(
+    sim: Simulator,
+    start: date,
+    end: date,
+) -> ArrivalStream:
+    """
+    Generates a lazy stream of arrival events for the simulator, ordered in
+    time. Unlike ``generate_events()``, the arrivals are not generated up
+    front, but only when they are pulled from the stream. This keeps memory use
+    constant in the length of the time horizon.
+
+    The per-cluster random number generators are all derived from a single
+    draw from the simulator's generator, which is made when calling this
+    function. This ensures we have common random numbers for the arrivals, no
+    matter what a strategy later does with the simulator's generator. Each
+    generator is keyed by its cluster (see ``cluster_seeds()``), so the
+    arrivals at a cluster do not depend on the other clusters.
+    """
+    entropy = sim.generator.integers(np.iinfo(np.int64).max)
+    seeds = cluster_seeds(entropy, sim.clusters)
+
+    return ArrivalStream(
+        sim.clusters,
+        [np.random.default_rng(seed) for seed in seeds],
+        to_seconds(datetime.combine(start, time.min)),
+        to_seconds(datetime.combine(end, time.max)),
+        sim.config.VOLUME_RANGE,
+    )
@@ -1,7 +1,6 @@
-from datetime import date, datetime, time, timedelta
+from datetime import date, datetime, time
 
 import numpy as np
-import pandas as pd
 
 from waste.classes import (
     ArrivalEvent,
@@ -10,6 +9,11 @@ from waste.classes import (
     ShiftPlanEvent,
     Simulator,
 )
+from waste.constants import SECONDS_IN_DAY
+from waste.enums import Sampling
+
+from .generate_trace import generate_trace
+from .to_seconds import to_seconds
 
 
 def generate_events(
@@ -17,54 +21,69 @@ def generate_events(
     start: date,
     end: date,
     seed_events: bool = False,
+    arrivals: bool = True,
+    sampling: Sampling = Sampling.STANDARD,
 ) -> list[Event]:
     """
     Generates initial events for the simulator. This includes arrivals and the
     shift plan events. Can also be used to create some "seed events", which are
     fake service events that may be helpful to seed a strategy. These seed
     events are fake, but are based on the same distributional assumptions as
-    the arrivals.
+    the arrivals. Generating arrivals can be turned off, for example when the
+    arrivals are instead obtained from ``generate_arrivals()``.
+
+    All arrivals are drawn in bulk, as in ``generate_trace()``: for the same
+    seed and sampling method, the arrival events are those of the arrival
+    trace. See ``generate_trace()`` for the sampling methods that can be used
+    to reduce variance, e.g. with antithetic pairs of simulations.
     """
     volume_range = sim.config.VOLUME_RANGE
+    gen = sim.generator
 
-    earliest = datetime.combine(start, time.min)
-    latest = datetime.combine(end, time.max)
+    first_shift = to_seconds(
+        datetime.combine(start, sim.config.SHIFT_PLAN_TIME)
+    )
+    latest = to_seconds(datetime.combine(end, time.max))
 
-    gen = sim.generator
+    events: list[Event] = [
+        ShiftPlanEvent(now)
+        for now in range(first_shift, latest + 1, SECONDS_IN_DAY)
+    ]
 
-    events: list[Event] = []
-    first_shift = datetime.combine(start, sim.config.SHIFT_PLAN_TIME)
-    for now in pd.date_range(first_shift, latest, freq="D").to_pydatetime():
-        events.append(ShiftPlanEvent(now))
-
-    for cluster in sim.clusters:
-        for now in pd.date_range(earliest, latest, freq="H").to_pydatetime():
-            # Non-homogeneous Poisson arrivals, with hourly rates as given by
-            # the rates list for this cluster.
-            num_deposits = gen.poisson(cluster.rates[now.hour])
-            time_offsets = gen.uniform(size=num_deposits)
-            volumes = gen.triangular(*volume_range, num_deposits)
-
-            for offset, volume in zip(time_offsets, volumes):
-                events.append(
-                    ArrivalEvent(
-                        now + timedelta(hours=offset),
-                        cluster=cluster,
-                        volume=volume,
-                    )
-                )
+    if arrivals:
+        # Non-homogeneous Poisson arrivals, with hourly rates as given by the
+        # rates of each cluster. These are drawn in bulk for all clusters and
+        # hours at once, by generating an arrival trace.
+        trace = generate_trace(sim, start, end, sampling=sampling)
+        for cluster, times, volumes in zip(
+            sim.clusters, trace.times, trace.volumes
+        ):
+            events.extend(
+                ArrivalEvent(arr_time, cluster=cluster, volume=volume)
+                for arr_time, volume in zip(times.tolist(), volumes.tolist())
+            )
+
+    if seed_events:
+        # Seed the strategy with some initial service events. These service
+        # events are not real, but do reflect the underlying dynamics and help
+        # cut down on the overall warm-up time.
+        avg_volume = np.mean(volume_range)
+        seed_time = to_seconds(datetime.min)
 
-        if seed_events:
-            # Seed the strategy with some initial service events. These service
-            # events are not real, but do reflect the underlying dynamics and
-            # help cut down on the overall warm-up time.
-            avg_volume = np.mean(sim.config.VOLUME_RANGE)
+        for cluster in sim.clusters:
             stop = 2 * int(cluster.capacity / avg_volume + 1)
+            num_arrivals = np.arange(start=1, stop=stop)
+
+            # The volumes of all seed events of this cluster are drawn at once,
+            # and then summed per event.
+            volumes = gen.triangular(*volume_range, num_arrivals.sum())
+            offsets = np.cumsum(num_arrivals) - num_arrivals
+            totals = np.add.reduceat(volumes, offsets)
 
-            for num_arrivals in np.arange(start=1, stop=stop):
+            for num_arrs, volume in zip(num_arrivals.tolist(), totals):
                 event = ServiceEvent(
-                    time=datetime.min,
-                    duration=timedelta(hours=0),
+                    time=seed_time,
+                    duration=0,
                     id_route=0,
                     cluster=cluster,
                     vehicle=sim.vehicles[0],
@@ -79,8 +98,7 @@ def generate_events(
                 # values.
                 event.seal()
 
-                event._num_arrivals = num_arrivals  # noqa: SLF001
-                volumes = gen.triangular(*volume_range, num_arrivals)
-                event._volume = sum(volumes[:num_arrivals])  # noqa: SLF001
+                event._num_arrivals = num_arrs  # noqa: SLF001
+                event._volume = volume  # noqa: SLF001
 
     return events
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from datetime import date, datetime, time
+from itertools import repeat
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+from scipy.stats import poisson
+
+from waste.classes import ArrivalTrace, Simulator
+from waste.constants import SECONDS_IN_DAY, SECONDS_IN_HOUR
+from waste.enums import Sampling
+
+from .cluster_seeds import cluster_seeds
+from .to_seconds import to_seconds
+
+# Above this rate, exp(-rate) is too close to zero for a sequential search
+# from zero arrivals, so the Poisson distribution is inverted by SciPy.
+_MAX_SEARCH_RATE = 500
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+logger = logging.getLogger(__name__)
+
+
+def generate_trace(
+    sim: Simulator,
+    start: date,
+    end: date,
+    executor: Optional[Executor] = None,
+    cache_dir: Optional[str] = None,
+    sampling: Sampling = Sampling.STANDARD,
+) -> ArrivalTrace:
+    """
+    Generates an arrival trace for the simulator, with the same arrivals as
+    those from ``generate_events()`` for the same seed. The random numbers for
+    each cluster are drawn from that cluster's own random number generator, in
+    a few bulk draws: the number of arrivals in each hour is drawn at once,
+    and so are all arrival time offsets and volumes.
+
+    The cluster generators are all seeded from a single draw from the
+    simulator's generator, which is made when calling this function. Each is
+    keyed by its cluster (see ``cluster_seeds()``), so the arrivals at a
+    cluster do not depend on the other clusters. As a result, the arrivals of
+    each cluster can be generated independently. When an executor is given,
+    the clusters' arrivals are generated in parallel using that executor.
+
+    When a cache directory is given, generated traces are saved there, and
+    later calls that would generate the same trace instead load it from the
+    cache, memory-mapped. A trace is identified by everything it depends on:
+    the draw from the simulator's generator (and thus the seed), the dates,
+    the configured volume range, the sampling method, and the clusters' names
+    and arrival rates.
+
+    The sampling method can be used to reduce the variance of estimates based
+    on simulations with these arrivals. With ``Sampling.INVERSION``, the
+    numbers of arrivals, time offsets, and volumes are obtained by inverting
+    their distribution functions at independent uniform random numbers. Then
+    ``Sampling.ANTITHETIC`` uses antithetic uniforms: one minus those of
+    ``Sampling.INVERSION`` for the same seed. A simulation with either is an
+    antithetic pair with the other. With ``Sampling.STRATIFIED``, the uniforms
+    for the numbers of arrivals in each clock hour are stratified over the
+    days, and those for the time offsets within the hour and for the volumes
+    are each stratified over all arrivals at each cluster.
+    """
+    entropy = sim.generator.integers(np.iinfo(np.int64).max)
+    seeds = cluster_seeds(entropy, sim.clusters)
+
+    earliest = to_seconds(datetime.combine(start, time.min))
+    latest = to_seconds(datetime.combine(end, time.max))
+
+    if cache_dir is not None:
+        key = _cache_key(sim, int(entropy), earliest, latest, sampling)
+        where = os.path.join(cache_dir, key)
+
+        if os.path.isdir(where):
+            logger.info(f"Loading arrival trace from '{where}'.")
+            return ArrivalTrace.load(where)
+
+    # Non-homogeneous Poisson arrivals, with hourly rates as given by the
+    # rates of each cluster.
+    hours = np.arange(earliest, latest + 1, SECONDS_IN_HOUR)
+    clock = hours % SECONDS_IN_DAY // SECONDS_IN_HOUR
+    rates = sim.state.rates[:, clock]
+
+    args = (
+        seeds,
+        rates,
+        repeat(hours),
+        repeat(sim.config.VOLUME_RANGE),
+        repeat(sampling),
+    )
+    if executor is None:
+        arrivals = list(map(_cluster_arrivals, *args))
+    else:
+        chunksize = max(len(seeds) // 32, 1)
+        arrivals = list(
+            executor.map(_cluster_arrivals, *args, chunksize=chunksize)
+        )
+
+    trace = ArrivalTrace(
+        [times for times, _ in arrivals],
+        [volumes for _, volumes in arrivals],
+    )
+
+    if cache_dir is not None:
+        logger.info(f"Saving arrival trace to '{where}'.")
+        trace.save(where)
+
+    return trace
+
+
+def _cache_key(
+    sim: Simulator,
+    entropy: int,
+    earliest: int,
+    latest: int,
+    sampling: Sampling,
+) -> str:
+    digest = hashlib.sha256()
+    digest.update(repr((entropy, earliest, latest, int(sampling))).encode())
+    digest.update(repr(tuple(sim.config.VOLUME_RANGE)).encode())
+    digest.update(repr([cluster.name for cluster in sim.clusters]).encode())
+    digest.update(np.ascontiguousarray(sim.state.rates, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def _cluster_arrivals(
+    seed: np.random.SeedSequence,
+    rates: np.ndarray,
+    hours: np.ndarray,
+    volume_range: tuple[float, float, float],
+    sampling: Sampling,
+) -> tuple[np.ndarray, np.ndarray]:
+    if sampling == Sampling.STANDARD:
+        gen = np.random.default_rng(seed)
+
+        counts = gen.poisson(rates)
+        num_arrivals = counts.sum()
+        offsets = gen.uniform(size=num_arrivals)
+        volumes = gen.triangular(*volume_range, num_arrivals)
+    else:
+        # The numbers of arrivals, offsets, and volumes each get their own
+        # generator. That way, the k-th volume uniform is the same for all
+        # sampling methods, even when the numbers of arrivals differ. That is
+        # needed to pair the volumes of antithetic simulations.
+        count_gen, offset_gen, volume_gen = map(
+            np.random.default_rng, seed.spawn(3)
+        )
+
+        clock = hours % SECONDS_IN_DAY // SECONDS_IN_HOUR
+        count_u = _uniforms(count_gen, clock, sampling)
+        counts = _poisson_ppf(count_u, rates)
+
+        num_arrivals = counts.sum()
+        offsets = _uniforms(offset_gen, np.zeros(num_arrivals, int), sampling)
+        volume_u = _uniforms(volume_gen, np.zeros(num_arrivals, int), sampling)
+        volumes = _triangular_ppf(volume_u, *volume_range)
+
+    times = np.repeat(hours, counts)
+    times += (SECONDS_IN_HOUR * offsets).astype(np.int64)
+
+    # The arrivals are in order of hour, but within each hour the arrival
+    # times are not yet sorted, so we sort those here.
+    order = np.argsort(times, kind="stable")
+    return times[order], volumes[order]
+
+
+def _uniforms(
+    gen: np.random.Generator,
+    groups: np.ndarray,
+    sampling: Sampling,
+) -> np.ndarray:
+    """
+    Returns uniform random numbers, one for each of the given groups. With
+    stratified sampling, the m uniforms of each group are stratified: there is
+    exactly one in each interval [k / m, (k + 1) / m), in random order.
+    """
+    uniforms = gen.uniform(size=len(groups))
+
+    if sampling == Sampling.ANTITHETIC:
+        return 1 - uniforms
+
+    if sampling == Sampling.STRATIFIED and len(groups) > 0:
+        # Orders the uniforms by group, and randomly within each group. The
+        # position in that order within the group is the stratum.
+        order = np.lexsort((gen.uniform(size=len(groups)), groups))
+        sizes = np.bincount(groups)
+        starts = np.cumsum(sizes) - sizes
+
+        strata = np.empty(len(groups), dtype=np.int64)
+        strata[order] = np.arange(len(groups)) - starts[groups[order]]
+        return (strata + uniforms) / sizes[groups]
+
+    return uniforms
+
+
+def _poisson_ppf(uniforms: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """
+    Inverts the Poisson distribution functions with the given rates at the
+    given uniforms, by sequential search. Large rates are instead inverted
+    using SciPy, since the search starts from the probability of no arrivals,
+    which underflows for such rates.
+    """
+    counts = np.zeros(len(uniforms), dtype=np.int64)
+    large = rates > _MAX_SEARCH_RATE
+
+    if large.any():
+        ppf = poisson.ppf(uniforms[large], rates[large])
+        counts[large] = np.maximum(ppf, 0).astype(np.int64)
+
+    prob = np.exp(-rates)
+    cdf = prob.copy()
+
+    # Only the entries whose count is not yet final are updated. The check on
+    # the probability avoids an endless loop due to rounding errors when the
+    # uniform is extremely close to one.
+    idcs = np.flatnonzero((uniforms > cdf) & ~large)
+    while len(idcs):
+        counts[idcs] += 1
+        prob[idcs] *= rates[idcs] / counts[idcs]
+        cdf[idcs] += prob[idcs]
+        idcs = idcs[(uniforms[idcs] > cdf[idcs]) & (prob[idcs] > 0)]
+
+    return counts
+
+
+def _triangular_ppf(
+    uniforms: np.ndarray,
+    left: float,
+    mode: float,
+    right: float,
+) -> np.ndarray:
+    """
+    Inverts the triangular distribution function at the given uniforms.
+    """
+    width = right - left
+    below = uniforms * width <= mode - left
+
+    return np.where(
+        below,
+        left + np.sqrt(uniforms * width * (mode - left)),
+        right - np.sqrt((1 - uniforms) * width * (right - mode)),
+    )
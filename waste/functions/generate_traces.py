@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import logging
+import os
+from datetime import date, datetime, time
+from typing import Optional
+
+import numpy as np
+
+from waste.classes import ArrivalTrace, Simulator
+from waste.constants import SECONDS_IN_DAY, SECONDS_IN_HOUR
+from waste.enums import Sampling
+
+from .cluster_seeds import cluster_seeds
+from .generate_trace import (
+    _cache_key,
+    _poisson_ppf,
+    _triangular_ppf,
+    _uniforms,
+)
+from .to_seconds import to_seconds
+
+logger = logging.getLogger(__name__)
+
+
+def generate_traces(
+    sims: list[Simulator],
+    start: date,
+    end: date,
+    samplings: Optional[list[Sampling]] = None,
+    cache_dir: Optional[str] = None,
+) -> list[ArrivalTrace]:
+    """
+    Generates an arrival trace for each of the given simulators, for example
+    the replications of a ``BatchSimulator``. Each trace has exactly the same
+    arrivals as ``generate_trace()`` returns for that simulator and sampling
+    method, which default to ``Sampling.STANDARD``.
+
+    The random numbers of each cluster are still drawn from that cluster's own
+    generators, so that replications keep their common random numbers. All
+    other work is vectorised across the clusters of all replications: the
+    distribution functions are inverted, and the arrival times are assembled
+    and sorted, for all seeds at once.
+
+    When a cache directory is given, traces are loaded from and saved to that
+    cache as in ``generate_trace()``. Only the traces that are not cached are
+    generated.
+    """
+    if samplings is None:
+        samplings = [Sampling.STANDARD] * len(sims)
+
+    assert len(samplings) == len(sims)
+
+    earliest = to_seconds(datetime.combine(start, time.min))
+    latest = to_seconds(datetime.combine(end, time.max))
+
+    hours = np.arange(earliest, latest + 1, SECONDS_IN_HOUR)
+    clock = hours % SECONDS_IN_DAY // SECONDS_IN_HOUR
+
+    traces: list[Optional[ArrivalTrace]] = [None] * len(sims)
+    where: dict[int, str] = {}
+    todo: list[int] = []
+
+    # Segments are the clusters of the replications whose traces must still
+    # be generated. These are the rows of the arrays below.
+    seeds: list[np.random.SeedSequence] = []
+    seg_samplings: list[Sampling] = []
+    seg_ranges: list[tuple[float, float, float]] = []
+    seg_rates: list[np.ndarray] = []
+
+    for rep, (sim, sampling) in enumerate(zip(sims, samplings)):
+        entropy = sim.generator.integers(np.iinfo(np.int64).max)
+
+        if cache_dir is not None:
+            key = _cache_key(sim, int(entropy), earliest, latest, sampling)
+            where[rep] = os.path.join(cache_dir, key)
+
+            if os.path.isdir(where[rep]):
+                logger.info(f"Loading arrival trace from '{where[rep]}'.")
+                traces[rep] = ArrivalTrace.load(where[rep])
+                continue
+
+        todo.append(rep)
+        seeds.extend(cluster_seeds(entropy, sim.clusters))
+        seg_samplings.extend([sampling] * len(sim.clusters))
+        seg_ranges.extend([sim.config.VOLUME_RANGE] * len(sim.clusters))
+        seg_rates.extend(sim.state.rates[:, clock])
+
+    num_segs = len(seeds)
+    rates = np.array(seg_rates, dtype=float).reshape(num_segs, len(hours))
+    invert = np.array([s != Sampling.STANDARD for s in seg_samplings], bool)
+
+    # Numbers of arrivals in each hour. The standard draws are made directly
+    # by the generators; the other uniforms are inverted all at once below.
+    gens: list[tuple[np.random.Generator, ...]] = []
+    counts = np.zeros((num_segs, len(hours)), dtype=np.int64)
+    count_u = np.zeros((num_segs, len(hours)))
+
+    for seg, (seed, sampling) in enumerate(zip(seeds, seg_samplings)):
+        if sampling == Sampling.STANDARD:
+            gens.append((np.random.default_rng(seed),))
+            counts[seg] = gens[seg][0].poisson(rates[seg])
+        else:
+            # See _cluster_arrivals() for why these are separate generators.
+            gens.append(tuple(map(np.random.default_rng, seed.spawn(3))))
+            count_u[seg] = _uniforms(gens[seg][0], clock, sampling)
+
+    counts[invert] = _poisson_ppf(
+        count_u[invert].ravel(), rates[invert].ravel()
+    ).reshape(-1, len(hours))
+
+    # Time offsets within the hour and volumes of all arrivals, in the order
+    # of the segments. Inverted volumes use the volume ranges of their own
+    # segments, which are repeated for each arrival.
+    sizes = counts.sum(axis=1)
+    offsets = np.empty(sizes.sum())
+    volumes = np.empty(sizes.sum())
+    volume_u = np.empty(sizes.sum())
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+
+    for seg, sampling in enumerate(seg_samplings):
+        lo, hi = bounds[seg], bounds[seg + 1]
+
+        if sampling == Sampling.STANDARD:
+            gen = gens[seg][0]
+            offsets[lo:hi] = gen.uniform(size=sizes[seg])
+            volumes[lo:hi] = gen.triangular(*seg_ranges[seg], sizes[seg])
+        else:
+            groups = np.zeros(sizes[seg], int)
+            offsets[lo:hi] = _uniforms(gens[seg][1], groups, sampling)
+            volume_u[lo:hi] = _uniforms(gens[seg][2], groups, sampling)
+
+    inverted = np.repeat(invert, sizes)
+    ranges = np.repeat(np.array(seg_ranges, float).reshape(-1, 3), sizes, 0)
+    volumes[inverted] = _triangular_ppf(
+        volume_u[inverted], *ranges[inverted].T
+    )
+
+    times = np.repeat(np.tile(hours, num_segs), counts.ravel())
+    times += (SECONDS_IN_HOUR * offsets).astype(np.int64)
+
+    # Sorts the arrival times within each segment, in one stable sort for all
+    # segments. The key orders by segment first, so arrivals never move to
+    # another segment, and ties keep their order as in _cluster_arrivals().
+    span = latest + SECONDS_IN_HOUR - earliest
+    segments = np.repeat(np.arange(num_segs), sizes)
+    order = np.argsort(segments * span + times - earliest, kind="stable")
+    times = times[order]
+    volumes = volumes[order]
+
+    first = 0
+    for rep in todo:
+        num_clusters = len(sims[rep].clusters)
+        segs = range(first, first + num_clusters)
+        first += num_clusters
+
+        trace = ArrivalTrace(
+            [times[bounds[seg] : bounds[seg + 1]] for seg in segs],
+            [volumes[bounds[seg] : bounds[seg + 1]] for seg in segs],
+        )
+
+        if cache_dir is not None:
+            logger.info(f"Saving arrival trace to '{where[rep]}'.")
+            trace.save(where[rep])
+
+        traces[rep] = trace
+
+    return [trace for trace in traces if trace is not None]
@@ -1,12 +1,12 @@
 from datetime import datetime, timedelta
 from typing import Optional
 
-import numpy as np
 from pyvrp import Model
 
 from waste.classes import ShiftPlanEvent, Simulator, Vehicle
 
 from .f2i import f2i
+from .to_datetime import to_datetime
 
 
 def make_model(
@@ -31,6 +31,11 @@ def make_model(
     if shift_duration is None:
         shift_duration = sim.config.SHIFT_DURATION
 
+    # Times in the model are relative to the shift plan event, in seconds. The
+    # clusters' and vehicles' time windows are times of day, so we need the
+    # event's date and time to translate those.
+    event_time = to_datetime(event.time)
+
     model = Model()
     model.add_depot(
         x=f2i(sim.depot.location[0]),
@@ -40,15 +45,15 @@ def make_model(
 
     for idx, cluster_idx in enumerate(cluster_idcs):
         cluster = sim.clusters[cluster_idx]
-        tw_late = datetime.combine(event.time.date(), cluster.tw_late)
-        assert tw_late >= event.time
+        tw_late = datetime.combine(event_time.date(), cluster.tw_late)
+        assert tw_late >= event_time
 
         service_duration = (
             sim.config.TIME_PER_CLUSTER
             + cluster.num_containers * sim.config.TIME_PER_CONTAINER
         )
 
-        last_moment = min(tw_late - event.time, shift_duration)
+        last_moment = min(tw_late - event_time, shift_duration)
         model.add_client(
             x=f2i(cluster.location[0]),
             y=f2i(cluster.location[1]),
@@ -59,20 +64,20 @@ def make_model(
         )
 
     for vehicle in vehicles if vehicles else sim.vehicles:
-        start_time = datetime.combine(event.time.date(), vehicle.shift_start)
-        end_time = datetime.combine(event.time.date(), vehicle.shift_end)
+        start_time = datetime.combine(event_time.date(), vehicle.shift_start)
+        end_time = datetime.combine(event_time.date(), vehicle.shift_end)
         assert end_time >= start_time
 
         model.add_vehicle_type(
-            tw_early=int(max((start_time - event.time).total_seconds(), 0)),
-            tw_late=int(max((end_time - event.time).total_seconds(), 0)),
+            tw_early=int(max((start_time - event_time).total_seconds(), 0)),
+            tw_late=int(max((end_time - event_time).total_seconds(), 0)),
         )
 
     # These are the full distance and duration matrices, but we are only
     # interested in the subset we are actually visiting. That subset is
     # given by the indices below.
     distances = sim.distances
-    durations = sim.durations / np.timedelta64(1, "s")
+    durations = sim.durations
     indices = [0] + [idx + 1 for idx in cluster_idcs]
 
     for frm_idx, frm in zip(indices, model.locations):
@@ -0,0 +1,58 @@
+from datetime import date, datetime, time
+from typing import Iterator
+
+import numpy as np
+
+from waste.classes import ArrivalEvent, Cluster, Database, Simulator
+
+
+def replay_arrivals(
+    sim: Simulator,
+    db: Database,
+    start: date,
+    end: date,
+) -> Iterator[ArrivalEvent]:
+    """
+    Replays the historical arrivals from the source database as a lazy stream
+    of arrival events for the simulator, ordered in time. Like the stream of
+    ``generate_arrivals()``, this can be passed to the simulator as its source
+    of arrivals. The arrivals are read from the database in chunks, only when
+    they are pulled from the stream, so memory use does not depend on the
+    length of the time horizon. Arrivals at clusters that are not part of the
+    simulator are skipped.
+
+    The historical data do not contain the volume of each deposit, so these
+    are sampled from the configured volume range. The random number generator
+    for the volumes is derived from a single draw from the simulator's
+    generator, which is made when calling this function.
+    """
+    entropy = sim.generator.integers(np.iinfo(np.int64).max)
+    gen = np.random.default_rng(entropy)
+
+    chunks = db.arrivals(
+        datetime.combine(start, time.min),
+        datetime.combine(end, time.max),
+    )
+
+    name2cluster = {cluster.name: cluster for cluster in sim.clusters}
+    return _replay(chunks, name2cluster, gen, sim.config.VOLUME_RANGE)
+
+
+def _replay(
+    chunks: Iterator[list[tuple[str, int]]],
+    name2cluster: dict[str, Cluster],
+    gen: np.random.Generator,
+    volume_range: tuple[float, float, float],
+) -> Iterator[ArrivalEvent]:
+    for chunk in chunks:
+        arrivals = [
+            (name2cluster[name], arr_time)
+            for name, arr_time in chunk
+            if name in name2cluster
+        ]
+
+        # The volumes of all arrivals in this chunk are drawn at once.
+        volumes = gen.triangular(*volume_range, len(arrivals))
+
+        for (cluster, arr_time), volume in zip(arrivals, volumes.tolist()):
+            yield ArrivalEvent(arr_time, cluster=cluster, volume=volume)
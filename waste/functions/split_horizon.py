@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+
+def split_horizon(
+    start: date,
+    end: date,
+    num_segments: int,
+    warmup: timedelta,
+) -> list[tuple[date, date, date]]:
+    """
+    Splits the time horizon from start to end (inclusive) into the given number
+    of consecutive segments of (nearly) equal numbers of days. Each segment is
+    preceded by a warmup period of the given length, which overlaps with the
+    previous segment. The first segment starts at the start of the horizon, so
+    it does not get a warmup period.
+
+    Returns a list of (warmup start, segment start, segment end) tuples, one
+    for each segment. The segment end is inclusive.
+    """
+    num_days = (end - start).days + 1
+
+    if not (1 <= num_segments <= num_days):
+        raise ValueError("Expected 1 <= num_segments <= #days in horizon.")
+
+    segments = []
+    for days in np.array_split(np.arange(num_days), num_segments):
+        seg_start = start + timedelta(days=int(days[0]))
+        seg_end = start + timedelta(days=int(days[-1]))
+        warmup_start = max(start, seg_start - warmup)
+        segments.append((warmup_start, seg_start, seg_end))
+
+    return segments
@@ -0,0 +1,11 @@
+from datetime import datetime, timedelta
+
+from waste.constants import EPOCH
+
+
+def to_datetime(seconds: int) -> datetime:
+    """
+    Translates the given simulation time, in seconds since the epoch, back
+    into a datetime.
+    """
+    return EPOCH + timedelta(seconds=int(seconds))
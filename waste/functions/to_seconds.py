@@ -0,0 +1,11 @@
+from datetime import datetime, timedelta
+
+from waste.constants import EPOCH
+
+
+def to_seconds(when: datetime) -> int:
+    """
+    Translates the given datetime into the simulation's time base: the number
+    of whole seconds since the epoch.
+    """
+    return (when - EPOCH) // timedelta(seconds=1)
@@ -60,6 +60,10 @@ def make_tables(con: sqlite3.Connection):
             successful BOOLEAN
         );
 
+        -- Historical arrivals are replayed in time order. See
+        -- ``Database.arrivals()``.
+        CREATE INDEX arrivals_date ON arrivals (date);
+
         CREATE TABLE cluster_rates (
             cluster VARCHAR REFERENCES clusters(name),
             hour INT,
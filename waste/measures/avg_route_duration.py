@@ -21,7 +21,7 @@ def avg_route_duration(db: Database, after: datetime) -> timedelta:
 
     for route in _routes_with_stops(db.write, after):
         stops = np.array([0, *[loc2idx[name] for name in route["plan"]], 0])
-        dur += mat[stops[:-1], stops[1:]].sum().item()
+        dur += timedelta(seconds=mat[stops[:-1], stops[1:]].sum().item())
         dur += timedelta(seconds=route["duration"])
 
     return dur / max(_num_routes(db.write, after), 1)
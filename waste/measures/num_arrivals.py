@@ -5,12 +5,22 @@ from waste.classes import Database
 
 def num_arrivals(db: Database, after: datetime) -> int:
     """
-    Total number of arrivals during the entire simulation.
+    Total number of arrivals during the entire simulation, after the given
+    datetime. Arrivals stored as hourly counts are included for the hours
+    starting at or after the given datetime. Those counts exclude arrivals at
+    the start of their hour, so both ways of storing arrivals agree when the
+    given datetime is at the start of an hour.
     """
     sql = """--sql
-        SELECT COUNT(*)
-        FROM arrival_events
-        WHERE time > ?;
+        SELECT (
+            SELECT COUNT(*)
+            FROM arrival_events
+            WHERE time > ?
+        ) + (
+            SELECT IFNULL(SUM(num_arrivals), 0)
+            FROM arrival_counts
+            WHERE time >= ?
+        );
     """
-    row = db.write.execute(sql, [after]).fetchone()
+    row = db.write.execute(sql, [after, after]).fetchone()
     return row[0] if row[0] is not None else 0
@@ -7,18 +7,31 @@ from waste.constants import HOURS_IN_DAY
 def num_arrivals_per_hour(db: Database, after: datetime) -> list[int]:
     """
     Number of arrivals at each hour of the day, over all clusters. This is
-    helpful to quickly check that our arrival process is OK.
+    helpful to quickly check that our arrival process is OK. Only arrivals
+    after the given datetime are counted. See also ``num_arrivals()``.
     """
     sql = """-- sql
-        SELECT CAST(strftime('%H', time) AS INT) AS hour,
-               COUNT(*)                          AS num_arrivals
-        FROM arrival_events
-        WHERE time > ?
+        SELECT hour, SUM(num_arrivals)
+        FROM (
+            SELECT CAST(strftime('%H', time) AS INT) AS hour,
+                   COUNT(*)                          AS num_arrivals
+            FROM arrival_events
+            WHERE time > ?
+            GROUP BY hour
+
+            UNION ALL
+
+            SELECT CAST(strftime('%H', time) AS INT) AS hour,
+                   SUM(num_arrivals)                 AS num_arrivals
+            FROM arrival_counts
+            WHERE time >= ?
+            GROUP BY hour
+        )
         GROUP BY hour
         ORDER BY hour;
     """
     histogram = [0] * HOURS_IN_DAY
-    for hour, num_arrivals in db.write.execute(sql, [after]):
+    for hour, num_arrivals in db.write.execute(sql, [after, after]):
         histogram[hour] = num_arrivals
 
     return histogram
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+from heapq import heapify, heappop, heappush
+from typing import TYPE_CHECKING
+
+from waste.constants import SECONDS_IN_HOUR
+
+if TYPE_CHECKING:
+    from waste.classes.Event import Event
+
+logger = logging.getLogger(__name__)
+
+
+class CalendarQueue:
+    """
+    Calendar event queue that buckets events by time. Only the bucket
+    containing the earliest events is kept in heap order: events added to any
+    later bucket are simply appended to it, and that bucket is ordered just
+    once when it becomes the earliest bucket. When each bucket holds only a
+    modest number of events, this results in amortised O(1) enqueue and
+    dequeue operations. Events that happen at the same time are returned in
+    the order in which they were added.
+
+    Parameters
+    ----------
+    width
+        Width of each bucket, in seconds. Default one hour.
+    scan_limit
+        Number of subsequent buckets to check when the current bucket runs
+        empty. If none of those contain events, the earliest non-empty bucket
+        is looked up directly instead. Default 24.
+    """
+
+    def __init__(
+        self,
+        width: int = SECONDS_IN_HOUR,
+        scan_limit: int = 24,
+    ):
+        if width <= 0:
+            raise ValueError("Expected width > 0.")
+
+        if scan_limit < 0:
+            raise ValueError("Expected scan_limit >= 0.")
+
+        self.width = width
+        self.scan_limit = scan_limit
+
+        self._buckets: dict[int, list[tuple[int, int, Event]]] = {}
+        self._current = 0  # key of the bucket with the earliest events
+        self._counter = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, event: Event):
+        logger.debug(
+            "Adding event %s to the queue at t = %s.", event, event.time
+        )
+
+        key = event.time // self.width
+        self._counter += 1
+        item = (event.time, self._counter, event)
+
+        if not self._size or key < self._current:
+            # Then the new event is the earliest event in the queue, and its
+            # bucket becomes the current bucket. Such a bucket cannot already
+            # exist, since all non-empty buckets are at or after the current.
+            self._current = key
+            self._buckets[key] = [item]
+        elif key == self._current:
+            heappush(self._buckets[key], item)
+        else:
+            self._buckets.setdefault(key, []).append(item)
+
+        self._size += 1
+
+    def peek(self) -> Event:
+        *_, event = self._buckets[self._current][0]
+        return event
+
+    def pop(self) -> Event:
+        *_, event = heappop(self._buckets[self._current])
+        self._size -= 1
+
+        if not self._buckets[self._current]:
+            del self._buckets[self._current]
+
+            if self._size:
+                self._advance()
+
+        return event
+
+    def _advance(self):
+        # The next non-empty bucket is usually one of the next few buckets, so
+        # we first try a short linear scan. If that fails (e.g., after a long
+        # gap between events) we look up the earliest bucket directly.
+        first = self._current + 1
+        for key in range(first, first + self.scan_limit):
+            if key in self._buckets:
+                break
+        else:
+            key = min(self._buckets)
+
+        heapify(self._buckets[key])
+        self._current = key
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import logging
+from heapq import heappop, heappush
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from waste.classes.Event import Event
+
+logger = logging.getLogger(__name__)
+
+
+class HeapQueue:
+    """
+    Simple event queue that efficiently manages events in order of time, using
+    a binary heap. Events that happen at the same time are returned in the
+    order in which they were added.
+    """
+
+    def __init__(self):
+        self._events = []
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def push(self, event: Event):
+        logger.debug(
+            "Adding event %s to the queue at t = %s.", event, event.time
+        )
+
+        # The tiebreaker is a plain counter, rather than e.g. itertools.count,
+        # so that the queue can be pickled when checkpointing.
+        self._counter += 1
+        heappush(self._events, (event.time, self._counter, event))
+
+    def peek(self) -> Event:
+        *_, event = self._events[0]
+        return event
+
+    def pop(self) -> Event:
+        *_, event = heappop(self._events)
+        return event
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Protocol
+
+from .CalendarQueue import CalendarQueue as CalendarQueue
+from .HeapQueue import HeapQueue as HeapQueue
+
+if TYPE_CHECKING:
+    from waste.classes.Event import Event
+
+
+class EventQueue(Protocol):
+    """
+    Event queue used by the simulator. Manages events in order of time, and
+    returns events that happen at the same time in the order in which they
+    were added.
+    """
+
+    def __len__(self) -> int:
+        pass
+
+    def push(self, event: Event):
+        pass
+
+    def peek(self) -> Event:
+        pass
+
+    def pop(self) -> Event:
+        pass
+
+
+QUEUES: dict[str, type[EventQueue]] = {
+    "heap": HeapQueue,
+    "calendar": CalendarQueue,
+}
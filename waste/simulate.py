@@ -7,13 +7,42 @@ with open("logging.toml", "rb") as file:
     logging.config.dictConfig(tomli.load(file))
 
 import argparse
+import atexit
 import logging
-from datetime import date
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing.queues import Queue as ProcessQueue
+from pathlib import Path
+from queue import Queue
+from tempfile import TemporaryDirectory
+from typing import Callable, Iterable, Optional
 
 import numpy as np
 
-from waste.classes import Database, Simulator
-from waste.functions import generate_events
+from waste.classes import (
+    ArrivalEvent,
+    BatchSimulator,
+    Checkpoint,
+    Database,
+    Event,
+    Route,
+    Simulator,
+)
+from waste.constants import BUFFER_SIZE
+from waste.enums import Sampling
+from waste.functions import (
+    generate_arrivals,
+    generate_events,
+    generate_trace,
+    generate_traces,
+    replay_arrivals,
+    split_horizon,
+    to_seconds,
+)
+from waste.queues import QUEUES
+from waste.sinks import MemorySink, NullSink, ResultSink
 from waste.strategies import STRATEGIES
 
 logger = logging.getLogger(__name__)
@@ -26,6 +55,11 @@ def parse_args():
     parser.add_argument("src_db", help="Location of the input database.")
     parser.add_argument("res_db", help="Location of the output database.")
     parser.add_argument("--seed", type=int, required=True)
+    parser.add_argument(
+        "--log_level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        help="Log level for this run. Default as set in logging.toml.",
+    )
     parser.add_argument(
         "--num_vehicles",
         type=int,
@@ -48,6 +82,115 @@ def parse_args():
         type=date.fromisoformat,
         help="Finish date in ISO format, e.g. 2023-08-11 (inclusive).",
     )
+    parser.add_argument(
+        "--aggregate_arrivals",
+        action="store_true",
+        help="Whether to apply arrivals in bulk, rather than one-by-one.",
+    )
+    parser.add_argument(
+        "--trace_cache",
+        help="Directory of cached arrival traces, shared between runs.",
+    )
+    parser.add_argument(
+        "--stream_arrivals",
+        action="store_true",
+        help="Whether to generate arrivals lazily, rather than up front.",
+    )
+    parser.add_argument(
+        "--sampling",
+        choices=[sampling.name.lower() for sampling in Sampling],
+        default="standard",
+        help="""
+        Arrival sampling method. With multiple replications, 'antithetic'
+        simulates antithetic pairs of replications. Default 'standard'.
+        """,
+    )
+    parser.add_argument(
+        "--replay_arrivals",
+        action="store_true",
+        help="Whether to replay the historical arrivals from src_db.",
+    )
+    parser.add_argument(
+        "--queue",
+        choices=QUEUES.keys(),
+        default="heap",
+        help="Event queue implementation to use. Default 'heap'.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Checkpoint file, written before each shift plan event.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Whether to resume the simulation from the checkpoint file.",
+    )
+    parser.add_argument(
+        "--warmup_end",
+        type=datetime.fromisoformat,
+        help="End ISO datetime of the warmup period. Used with --snapshot.",
+    )
+    parser.add_argument(
+        "--snapshot",
+        help="Snapshot file to write at the end of the warmup period.",
+    )
+    parser.add_argument(
+        "--from_snapshot",
+        help="Snapshot file to start the simulation from, after warmup.",
+    )
+    parser.add_argument(
+        "--plan_in_worker",
+        action="store_true",
+        help="Whether to generate shift plans in a worker process.",
+    )
+    parser.add_argument(
+        "--num_segments",
+        type=int,
+        default=1,
+        help="Number of horizon segments to simulate in parallel. Default 1.",
+    )
+    parser.add_argument(
+        "--segment_warmup",
+        type=int,
+        default=28,
+        help="Warmup period of each segment, in days. Default 28.",
+    )
+    parser.add_argument(
+        "--num_replications",
+        type=int,
+        default=1,
+        help="Number of replications to simulate in a batch. Default 1.",
+    )
+    parser.add_argument(
+        "--fast_write",
+        action="store_true",
+        help="Whether to trade result database durability for write speed.",
+    )
+    parser.add_argument(
+        "--buffer_size",
+        type=int,
+        default=BUFFER_SIZE,
+        help=f"Number of events to buffer per write. Default {BUFFER_SIZE}.",
+    )
+    parser.add_argument(
+        "--sink",
+        choices=["sqlite", "memory", "null"],
+        default="sqlite",
+        help="""
+        Where to store the results. With 'memory' or 'null', results are kept
+        in memory or discarded, and res_db is not written. Default 'sqlite'.
+        """,
+    )
+    parser.add_argument(
+        "--arrival_counts",
+        action="store_true",
+        help="Whether to store hourly arrival counts, rather than arrivals.",
+    )
+    parser.add_argument(
+        "--background_write",
+        action="store_true",
+        help="Whether to write results in a background thread.",
+    )
 
     baseline = subparsers.add_parser("baseline")
     baseline.add_argument("--deposit_volume", type=float, required=True)
@@ -72,18 +215,289 @@ def validate_args(args):
     if args.start >= args.end:
         raise ValueError("start >= end not understood.")
 
+    if args.aggregate_arrivals and args.stream_arrivals:
+        raise ValueError("Cannot both aggregate and stream arrivals.")
 
-def main():
-    args = parse_args()
-    validate_args(args)
+    # Historical arrivals are replayed as a stream, which is read lazily from
+    # the source database. Such a stream cannot be checkpointed.
+    if args.replay_arrivals and (
+        args.aggregate_arrivals or args.stream_arrivals
+    ):
+        raise ValueError("Cannot replay arrivals and also generate those.")
 
-    logger.info(f"Running simulation with arguments {vars(args)}.")
+    if args.replay_arrivals and (args.checkpoint or args.snapshot):
+        raise ValueError("Cannot checkpoint when replaying arrivals.")
+
+    # Replications always aggregate arrivals, so those can also be cached.
+    aggregates = args.aggregate_arrivals or args.num_replications > 1
+    if args.trace_cache and not aggregates:
+        raise ValueError("Can only cache aggregated arrivals.")
+
+    lazy = args.stream_arrivals or args.replay_arrivals
+    if args.sampling != "standard" and lazy:
+        raise ValueError("Cannot use this sampling method for the stream.")
+
+    antithetic = args.sampling == "antithetic"
+    if antithetic and args.num_replications % 2 != 0:
+        raise ValueError("Expected an even number of antithetic replications.")
+
+    if args.buffer_size < 1:
+        raise ValueError("Expected buffer_size >= 1.")
+
+    # Checkpoints record and restore the state of the result database, and
+    # horizon segments are combined there, so these need the sqlite sink.
+    sqlite = args.sink == "sqlite"
+    if not sqlite and (args.checkpoint or args.resume):
+        raise ValueError("Can only checkpoint with the sqlite sink.")
+
+    if not sqlite and args.num_segments > 1:
+        raise ValueError("Can only split the horizon with the sqlite sink.")
+
+    if args.resume and not args.checkpoint:
+        raise ValueError("Cannot resume without a checkpoint file.")
+
+    if args.snapshot and not args.warmup_end:
+        raise ValueError("Cannot snapshot without the end of the warmup.")
+
+    if args.snapshot and args.from_snapshot:
+        raise ValueError("Cannot both write and start from a snapshot.")
+
+    if args.num_replications < 1:
+        raise ValueError("Expected num_replications >= 1.")
+
+    multiple_reps = args.num_replications > 1
+    if multiple_reps and (args.checkpoint or args.snapshot):
+        raise ValueError("Cannot checkpoint multiple replications.")
+
+    sources = (args.from_snapshot, args.stream_arrivals, args.replay_arrivals)
+    if multiple_reps and any(sources):
+        raise ValueError("Cannot simulate replications from this source.")
+
+    if multiple_reps and args.plan_in_worker:
+        raise ValueError("Cannot plan replications in a worker process.")
+
+    if args.num_segments < 1:
+        raise ValueError("Expected num_segments >= 1.")
+
+    if args.segment_warmup < 0:
+        raise ValueError("Expected segment_warmup >= 0.")
+
+    multiple_segs = args.num_segments > 1
+    if multiple_segs and (args.checkpoint or args.snapshot or args.resume):
+        raise ValueError("Cannot checkpoint multiple segments.")
+
+    if multiple_segs and (args.from_snapshot or multiple_reps):
+        raise ValueError("Cannot split the horizon with these options.")
+
+
+def configure_logging(level: str | None):
+    """
+    Sets the root logger's level, if given, and moves its handlers behind a
+    queue. That queue is drained by a background thread, so the simulation
+    does not block on writing log records. Worker processes log to the main
+    process through a separate queue, see ``make_process_pool()``.
+    """
+    root = logging.getLogger()
+
+    if level is not None:
+        root.setLevel(level)
+
+    log_queue: Queue[logging.LogRecord] = Queue()
+    listener = QueueListener(
+        log_queue,
+        *root.handlers,
+        respect_handler_level=True,
+    )
+
+    root.handlers = [QueueHandler(log_queue)]
+    listener.start()
+
+    # Stopping the listener flushes any remaining records in the queue, so all
+    # records are handled before the program exits.
+    atexit.register(listener.stop)
+
+
+def configure_worker_logging(level: int, log_queue: ProcessQueue):
+    """
+    Sets up logging in a worker process. Its log records are put on the given
+    queue, which is drained in the main process.
+    """
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers = [QueueHandler(log_queue)]
 
+
+def make_process_pool(max_workers: Optional[int] = None) -> Executor:
+    """
+    Returns a process pool whose workers log to a queue shared with the main
+    process. A background thread passes the records on that queue to the main
+    process's handlers. Workers would otherwise inherit those handlers, which
+    may write to a queue that only exists in the main process.
+    """
+    root = logging.getLogger()
+
+    # Only the pool's workers log through this (slower) process queue. The
+    # listener is stopped when the program exits, after the pool has been
+    # shut down, so it handles all records of the workers.
+    log_queue: ProcessQueue[logging.LogRecord] = multiprocessing.Queue()
+    listener = QueueListener(log_queue, *root.handlers)
+    listener.start()
+    atexit.register(listener.stop)
+
+    return ProcessPoolExecutor(
+        max_workers,
+        initializer=configure_worker_logging,
+        initargs=(root.level, log_queue),
+    )
+
+
+def make_executor(plan_in_worker: bool) -> Optional[Executor]:
+    if not plan_in_worker:
+        return None
+
+    # A single worker suffices, since there is at most one shift plan being
+    # generated at any time. The worker is shut down when the program exits.
+    executor = make_process_pool(max_workers=1)
+    atexit.register(executor.shutdown)
+    return executor
+
+
+def make_database(args, res_db: str, exists_ok: bool = False) -> Database:
+    db = Database(
+        args.src_db,
+        res_db,
+        exists_ok,
+        fast_write=args.fast_write,
+        buffer_size=args.buffer_size,
+        background=args.background_write,
+        arrival_counts=args.arrival_counts,
+    )
+
+    # Closing the database writes any remaining results, and stops the
+    # background writer thread, if any. This happens when the program exits.
+    atexit.register(db.close)
+    return db
+
+
+def make_sink(args, db: Database) -> ResultSink:
+    match args.sink:
+        case "memory":
+            return MemorySink()
+        case "null":
+            return NullSink()
+        case _:
+            return db
+
+
+def make_checkpointer(
+    db: Database,
+    where: Optional[str],
+) -> Optional[Callable[[Checkpoint], None]]:
+    if where is None:
+        return None
+
+    def save(checkpoint: Checkpoint):
+        logger.info(f"Saving checkpoint to '{where}'.")
+        checkpoint.watermark = db.watermark()
+        checkpoint.save(where)
+
+    return save
+
+
+def simulate_replications(args):
+    """
+    Simulates several replications in a batch, with seeds ``seed``,
+    ``seed + 1``, and so on. The results of each replication are stored in a
+    separate result database, named after the given result database and the
+    replication's seed. The arrivals of all replications are generated
+    together as arrival traces, and applied in bulk.
+
+    With antithetic sampling, the replications are antithetic pairs. Both
+    replications in a pair use the same seed, and the second replication's
+    result database name ends with ``_antithetic``.
+    """
+    num_reps = args.num_replications
+    res_db = Path(args.res_db)
+
+    if args.sampling == "antithetic":
+        seeds = [args.seed + rep // 2 for rep in range(num_reps)]
+        samplings = [Sampling.INVERSION, Sampling.ANTITHETIC] * (num_reps // 2)
+        suffixes = ["", "_antithetic"] * (num_reps // 2)
+    else:
+        seeds = [args.seed + rep for rep in range(num_reps)]
+        samplings = [Sampling[args.sampling.upper()]] * num_reps
+        suffixes = [""] * num_reps
+
+    stems = [
+        f"{res_db.stem}_{seed}{suffix}"
+        for seed, suffix in zip(seeds, suffixes)
+    ]
+    if args.sink == "sqlite":
+        dbs = [
+            make_database(args, str(res_db.with_stem(stem))) for stem in stems
+        ]
+        sinks: list[ResultSink] = list(dbs)
+    else:
+        dbs = [make_database(args, ":memory:")]
+        sinks = [make_sink(args, dbs[0]) for _ in stems]
+
+    # All replications share the same data, so we only load it once.
+    db = dbs[0]
+    num_veh = args.num_vehicles if args.num_vehicles else len(db.vehicles())
+    batch = BatchSimulator(
+        [np.random.default_rng(seed) for seed in seeds],
+        db.depot(),
+        db.distances(),
+        db.durations(),
+        db.clusters(),
+        db.vehicles()[:num_veh],
+    )
+
+    # As in the single replication case, we generate the initial events and
+    # arrivals before creating the strategies to have common random numbers.
+    init_events = [
+        generate_events(
+            sim,
+            args.start,
+            args.end,
+            seed_events=True,
+            arrivals=False,
+        )
+        for sim in batch.sims
+    ]
+
+    arrivals = generate_traces(
+        batch.sims,
+        args.start,
+        args.end,
+        samplings,
+        cache_dir=args.trace_cache,
+    )
+    strategies = [
+        STRATEGIES[args.strategy](sim, **vars(args)) for sim in batch.sims
+    ]
+
+    # The null sink discards all arrivals, so there is no need to create
+    # arrival events for those.
+    batch(
+        [sink.store for sink in sinks],
+        strategies,
+        init_events,
+        arrivals,
+        store_arrivals=args.sink != "null",
+    )
+
+
+def simulate(args, db: Database, cutoff: Optional[int] = None):
+    """
+    Runs a single simulation with the given arguments, and stores the results
+    in the given database, or in the sink selected by the arguments. When a
+    cutoff time is given, only results from that time onwards are stored.
+    """
     # Set up simulation environment and data. The number of actually available
     # vehicles can be limited via a command-line argument - a bit of a hack
     # that only works if all vehicles are identical (which is the case for our
     # data, but need not be true generally).
-    db = Database(args.src_db, args.res_db)
     num_veh = args.num_vehicles if args.num_vehicles else len(db.vehicles())
     sim = Simulator(
         np.random.default_rng(args.seed),
@@ -96,10 +510,238 @@ def main():
 
     # Generate initial events *before* calling the strategy. This ensures we
     # have common random numbers for the arrivals, no matter what the strategy
-    # does with the RNG.
-    init_events = generate_events(sim, args.start, args.end, seed_events=True)
+    # does with the RNG. When aggregating arrivals, those are drawn directly
+    # into an arrival trace that is applied in bulk only when the arrivals
+    # matter. The trace is drawn first, so it has the same arrivals as
+    # ``generate_events()``.
+    sampling = Sampling[args.sampling.upper()]
+
+    arrivals = None
+    if args.aggregate_arrivals:
+        arrivals = generate_trace(
+            sim,
+            args.start,
+            args.end,
+            cache_dir=args.trace_cache,
+            sampling=sampling,
+        )
+
+    init_events = generate_events(
+        sim,
+        args.start,
+        args.end,
+        seed_events=True,
+        sampling=sampling,
+        arrivals=not (
+            args.stream_arrivals
+            or args.aggregate_arrivals
+            or args.replay_arrivals
+        ),
+    )
+
+    stream: Iterable[Event] = []
+    if args.stream_arrivals:
+        stream = generate_arrivals(sim, args.start, args.end)
+    elif args.replay_arrivals:
+        stream = replay_arrivals(sim, db, args.start, args.end)
+
     strategy = STRATEGIES[args.strategy](sim, **vars(args))
-    sim(db.store, strategy, init_events)
+    queue = QUEUES[args.queue]()
+    save = make_checkpointer(db, args.checkpoint)
+    sink = make_sink(args, db)
+
+    # When writing a snapshot, we record all events other than arrivals. Those
+    # are later observed by the strategies that start from the snapshot. We
+    # also record the routes, and all events after the end of the warmup
+    # period. Those are later stored by the strategies that start from the
+    # snapshot, so their results after warmup are complete.
+    history: list[Event] = []
+    results: list[Event] = []
+    routes: dict[int, Route] = {}
+    warmup_end = to_seconds(args.warmup_end) if args.snapshot else None
+
+    def record(item: Event | Route, id_route: Optional[int]):
+        assert warmup_end is not None
+
+        match item:
+            case Route():
+                assert id_route is not None
+                routes[id_route] = item
+            case ArrivalEvent():
+                pass
+            case _:
+                history.append(item)
+
+        if isinstance(item, Event) and item.time >= warmup_end:
+            results.append(item)
+
+    def store(item: Event | Route) -> Optional[int]:
+        # Results from before the cutoff are not stored. Routes that are not
+        # stored get a dummy route ID.
+        if cutoff is not None:
+            match item:
+                case Route() if item.start_time < cutoff:
+                    return 0
+                case Event() if item.time < cutoff:
+                    return None
+
+        id_route = sink.store(item)
+        if args.snapshot:
+            record(item, id_route)
+
+        return id_route
+
+    # The null sink discards all arrivals, so there is no need to create
+    # events for the arrivals in the trace - unless they are recorded for a
+    # snapshot.
+    state = sim(
+        store,
+        strategy,
+        init_events,
+        arrivals,
+        stream,
+        queue,
+        save,
+        until=warmup_end,
+        executor=make_executor(args.plan_in_worker),
+        store_arrivals=args.sink != "null" or bool(args.snapshot),
+    )
+
+    if isinstance(sink, MemorySink):
+        logger.info(f"Kept {len(sink)} results in memory.")
+
+    if args.snapshot:
+        logger.info(f"Saving snapshot to '{args.snapshot}'.")
+        state.history = history
+        state.results = results
+        state.routes = routes
+        state.save(args.snapshot)
+
+
+def simulate_from_snapshot(args, db: Database):
+    """
+    Starts a simulation from the state at the end of a shared warmup period,
+    and stores the results in the given database, or in the sink selected by
+    the arguments. Only the strategy is new: it first observes what happened
+    during warmup, and then continues the simulation from there. The results
+    after the end of the warmup period are the same as those of a single run
+    with this strategy after warmup.
+    """
+    snapshot = Checkpoint.load(args.from_snapshot)
+    snapshot.fork(STRATEGIES[args.strategy](snapshot.sim, **vars(args)))
+
+    sink = make_sink(args, db)
+    snapshot.store_results(sink.store)
+
+    save = make_checkpointer(db, args.checkpoint)
+    snapshot.sim.resume(
+        sink.store,
+        snapshot,
+        save,
+        executor=make_executor(args.plan_in_worker),
+        store_arrivals=args.sink != "null",
+    )
+
+
+def simulate_segment(args, res_db: str, cutoff: Optional[int]):
+    """
+    Simulates a single segment of the time horizon, in a worker process. See
+    ``simulate_segments()``.
+    """
+    db = make_database(args, res_db)
+    simulate(args, db, cutoff)
+    db.close()  # results must be written before the segments are combined
+
+
+def segment_jobs(
+    args, res_dir: str
+) -> list[tuple[argparse.Namespace, str, Optional[int]]]:
+    """
+    Splits the time horizon into segments. Returns the arguments to
+    ``simulate_segment()`` for each segment, in order. The results of each
+    segment are written to a database in the given directory. Each segment
+    starts with a warmup period that overlaps with the previous segment, and
+    has its own seed. Only results after each segment's warmup period are
+    stored.
+    """
+    segments = split_horizon(
+        args.start,
+        args.end,
+        args.num_segments,
+        timedelta(days=args.segment_warmup),
+    )
+
+    jobs = []
+    for idx, (warmup_start, start, end) in enumerate(segments):
+        logger.info(f"Simulating segment {idx} from {start} to {end}.")
+
+        seg_args = argparse.Namespace(**vars(args))
+        seg_args.seed = [args.seed, idx]
+        seg_args.start = warmup_start
+        seg_args.end = end
+
+        # The first segment has no warmup period, and stores everything -
+        # including any seed events - just like a sequential run would.
+        res_db = str(Path(res_dir) / f"segment_{idx}.db")
+        midnight = datetime.combine(start, time.min)
+        cutoff = to_seconds(midnight) if idx > 0 else None
+        jobs.append((seg_args, res_db, cutoff))
+
+    return jobs
+
+
+def simulate_segments(args):
+    """
+    Simulates the segments of the time horizon in parallel, and then combines
+    their results in the result database. See ``segment_jobs()``.
+    """
+    with TemporaryDirectory() as tmp_dir, make_process_pool() as executor:
+        jobs = segment_jobs(args, tmp_dir)
+        futures = [executor.submit(simulate_segment, *job) for job in jobs]
+
+        db = make_database(args, args.res_db)
+        for (_, res_db, _), future in zip(jobs, futures):
+            future.result()  # raises if the segment failed
+            db.append(res_db)
+
+
+def main():
+    args = parse_args()
+    validate_args(args)
+    configure_logging(args.log_level)
+
+    logger.info(f"Running simulation with arguments {vars(args)}.")
+
+    # Results are only written to the result database with the sqlite sink.
+    # Other sinks still use an in-memory database to read the source data.
+    res_db = args.res_db if args.sink == "sqlite" else ":memory:"
+
+    if args.resume:
+        # Continue from the last checkpoint. Any results stored after that
+        # checkpoint was taken are discarded, so that the final results are
+        # the same as those of an uninterrupted run.
+        db = make_database(args, args.res_db, exists_ok=True)
+        checkpoint = Checkpoint.load(args.checkpoint)
+        db.truncate(checkpoint.watermark)
+
+        save = make_checkpointer(db, args.checkpoint)
+        executor = make_executor(args.plan_in_worker)
+        checkpoint.sim.resume(db.store, checkpoint, save, executor=executor)
+        return
+
+    if args.from_snapshot:
+        simulate_from_snapshot(args, make_database(args, res_db))
+        return
+
+    if args.num_replications > 1:
+        simulate_replications(args)
+        return
+
+    if args.num_segments > 1:
+        simulate_segments(args)
+        return
+
+    simulate(args, make_database(args, res_db))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import logging
+from itertools import count
+from typing import Optional
+
+import numpy as np
+
+from waste.classes import (
+    ArrivalEvent,
+    BreakEvent,
+    Event,
+    Route,
+    ServiceEvent,
+    ShiftPlanEvent,
+)
+
+logger = logging.getLogger(__name__)
+
+# Tables and their columns, named as in the result database. Times are kept in
+# seconds since the epoch, however, rather than as datetimes.
+_COLUMNS = {
+    "routes": ("id_route", "vehicle", "start_time"),
+    "arrival_events": ("time", "cluster", "volume"),
+    "break_events": ("time", "duration", "id_route"),
+    "service_events": (
+        "time",
+        "duration",
+        "cluster",
+        "id_route",
+        "num_arrivals",
+        "volume",
+    ),
+}
+
+
+class MemorySink:
+    """
+    Result sink that keeps all results in memory, as columns: one array for
+    each column of each table of the result database (see ``Database``).
+    Vehicles and clusters are identified by their names.
+    """
+
+    def __init__(self):
+        self._id_routes = count(1)
+        self._columns: dict[str, tuple[list, ...]] = {
+            table: tuple([] for _ in columns)
+            for table, columns in _COLUMNS.items()
+        }
+
+    def __len__(self) -> int:
+        return sum(len(columns[0]) for columns in self._columns.values())
+
+    def __getitem__(self, table: str) -> dict[str, np.ndarray]:
+        """
+        Returns the columns of the given table, as arrays by column name.
+        """
+        names = _COLUMNS[table]
+        return {
+            name: np.array(column)
+            for name, column in zip(names, self._columns[table])
+        }
+
+    def store(
+        self,
+        item: Event | Route,
+        id_route: Optional[int] = None,
+    ) -> Optional[int]:
+        row: tuple
+
+        match item:
+            case Route(vehicle=vehicle, start_time=start_time):
+                if id_route is None:
+                    id_route = next(self._id_routes)
+
+                row = (id_route, vehicle.name, start_time)
+                self._append("routes", row)
+                return id_route
+            case ArrivalEvent() as e:
+                row = (e.time, e.cluster.name, e.volume)
+                self._append("arrival_events", row)
+            case ServiceEvent() as e:
+                row = (
+                    e.time,
+                    e.duration,
+                    e.cluster.name,
+                    e.id_route,
+                    e.num_arrivals,
+                    e.volume,
+                )
+                self._append("service_events", row)
+            case BreakEvent() as e:
+                row = (e.time, e.duration, e.id_route)
+                self._append("break_events", row)
+            case ShiftPlanEvent():
+                pass
+            case _:
+                msg = f"Item of type {type(item)} not understood."
+                logger.error(msg)
+                raise TypeError(msg)
+
+        return None
+
+    def _append(self, table: str, row: tuple):
+        for column, value in zip(self._columns[table], row):
+            column.append(value)
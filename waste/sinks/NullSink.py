@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from itertools import count
+from typing import TYPE_CHECKING, Optional
+
+from waste.classes import Route
+
+if TYPE_CHECKING:
+    from waste.classes import Event
+
+
+class NullSink:
+    """
+    Result sink that discards all results. It only hands out route IDs, so
+    that the simulator can continue. This is useful to measure the throughput
+    of the simulation itself, without the cost of storing results.
+    """
+
+    def __init__(self):
+        self._id_routes = count(1)
+
+    def store(
+        self,
+        item: Event | Route,
+        id_route: Optional[int] = None,
+    ) -> Optional[int]:
+        if isinstance(item, Route):
+            return next(self._id_routes) if id_route is None else id_route
+
+        return None
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from waste.classes import Event, Route
+
+    from . import ResultSink
+
+
+class TeeSink:
+    """
+    Result sink that passes all results on to each of the given sinks, in
+    order. Route IDs are allocated by the first sink, unless given, and the
+    other sinks store each route with that same ID. Events that refer to a
+    route carry that ID, so routes and events can be joined in each of the
+    sinks.
+    """
+
+    def __init__(self, *sinks: ResultSink):
+        if not sinks:
+            raise ValueError("Expected at least one sink.")
+
+        self.sinks = sinks
+
+    def store(
+        self,
+        item: Event | Route,
+        id_route: Optional[int] = None,
+    ) -> Optional[int]:
+        first, *others = self.sinks
+        id_route = first.store(item, id_route)
+
+        for sink in others:
+            sink.store(item, id_route)
+
+        return id_route
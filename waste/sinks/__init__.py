@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Protocol
+
+from .MemorySink import MemorySink as MemorySink
+from .NullSink import NullSink as NullSink
+from .TeeSink import TeeSink as TeeSink
+
+if TYPE_CHECKING:
+    from waste.classes import Event, Route
+
+
+class ResultSink(Protocol):
+    """
+    Sink for the simulation results: the events and routes that the simulator
+    passes to its store callback. The ``store()`` method of a sink is such a
+    callback. ``Database`` is the sink that writes results to SQLite.
+    """
+
+    def store(
+        self,
+        item: Event | Route,
+        id_route: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Stores the given event or route. Returns the route's ID when given a
+        route, and None otherwise. That ID is the given route ID, if any, and
+        is otherwise allocated by the sink.
+        """
+        pass
@@ -1,5 +1,4 @@
 import logging
-from datetime import timedelta
 
 import numpy as np
 from pyvrp.stop import MaxRuntime
@@ -31,6 +30,8 @@ class BaselineStrategy:
         when deciding which clusters to visit. Default False.
     """
 
+    observes = ()  # this strategy does not observe any events
+
     def __init__(
         self,
         sim: Simulator,
@@ -77,7 +78,7 @@ class BaselineStrategy:
                 # cluster indices.
                 plan=[cluster_idcs[idx - 1] for idx in route],
                 vehicle=self.sim.vehicles[route.vehicle_type()],
-                start_time=event.time + timedelta(seconds=route.start_time()),
+                start_time=event.time + route.start_time(),
             )
             for route in result.best.get_routes()
         ]
@@ -86,25 +87,24 @@ class BaselineStrategy:
         pass  # unused by this strategy
 
     def _get_cluster_idcs(self) -> np.ndarray[int]:
-        clusters = self.sim.clusters
+        state = self.sim.state
 
-        if self.num_clusters >= len(clusters):
-            return np.arange(0, len(clusters))
+        if self.num_clusters >= len(state):
+            return np.arange(0, len(state))
 
         # Step 1. Determine current volume in each cluster based on the current
         # number of arrivals. Or, when perfect information is used, just get
         # the actual current volume.
         if self.perfect_information:
-            curr_vols = np.array([c.volume for c in clusters])
+            curr_vols = state.volumes
         else:
-            arrivals = np.array([c.num_arrivals for c in clusters])
-            curr_vols = self.deposit_volume * arrivals
+            curr_vols = self.deposit_volume * state.num_arrivals
 
         # Step 2. Determine the amount of time it'll take for each cluster to
         # fill up, given the current volume and the average arrival rate.
-        capacities = np.array([c.corrected_capacity for c in clusters])
+        capacities = state.corrected_capacities
         max_extra = np.maximum(capacities - curr_vols, 0) / self.deposit_volume
-        avg_rates = np.array([np.mean(c.rates) for c in clusters])
+        avg_rates = state.rates.mean(axis=1)
 
         # Divide max_extra / avg_rates, with some special precautions in case
         # avg_rates is zero somewhere (we set num_hours to +inf in that case).
@@ -1,6 +1,6 @@
 import logging
 from collections import defaultdict
-from datetime import datetime, time, timedelta
+from datetime import datetime, time
 from itertools import pairwise
 
 import numpy as np
@@ -15,7 +15,7 @@ from waste.classes import (
     Simulator,
     Vehicle,
 )
-from waste.functions import make_model
+from waste.functions import make_model, to_datetime
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +44,8 @@ class PrizeCollectingStrategy:
         visit into a required visit. Default 99%.
     """
 
+    observes = (ServiceEvent,)
+
     def __init__(
         self,
         sim: Simulator,
@@ -68,8 +70,8 @@ class PrizeCollectingStrategy:
         self.perfect_information = perfect_information
         self.required_threshold = required_threshold
 
-        self.models: dict[int, OverflowModel] = {
-            id(cluster): OverflowModel(cluster) for cluster in sim.clusters
+        self.models: dict[str, OverflowModel] = {
+            cluster.name: OverflowModel(cluster) for cluster in sim.clusters
         }
 
     def plan(self, event: ShiftPlanEvent) -> list[Route]:
@@ -79,7 +81,8 @@ class PrizeCollectingStrategy:
         # the end of the first break to the beginning of the second, etc. until
         # the last shift, which lasts from the end of the last break to the end
         # of the shift plan duration.
-        event_date = event.time.date()
+        event_dt = to_datetime(event.time)
+        event_date = event_dt.date()
         shifts: list[tuple[time, time]] = [
             (start, (datetime.combine(event_date, start) + dur).time())
             for start, dur in self.sim.config.BREAKS
@@ -88,14 +91,14 @@ class PrizeCollectingStrategy:
         # Shift duration excludes breaks. We schedule those breaks as part of
         # the VRP we solve, so we need to add the time to the overall shift
         # duration to compensate.
-        event_time = event.time.time()
+        event_time = event_dt.time()
         shift_duration = sum(
             (dur for _, dur in self.sim.config.BREAKS),
             start=self.sim.config.SHIFT_DURATION,
         )
 
         shifts.insert(0, (time.min, event_time))
-        shifts.append(((event.time + shift_duration).time(), time.max))
+        shifts.append(((event_dt + shift_duration).time(), time.max))
 
         vehicles = [
             Vehicle(vehicle.name, vehicle.capacity, start, end)
@@ -103,12 +106,17 @@ class PrizeCollectingStrategy:
             for (_, start), (end, _) in pairwise(shifts)
         ]
 
+        state = self.sim.state
+        rates = state.rates.sum(axis=1)
+
         if self.perfect_information:
             probs = [
                 # When perfect information may be used, we base everything
                 # on the actual cluster volume.
-                self.models[id(c)].prob_volume(c.volume, sum(c.rates))
-                for c in self.sim.clusters
+                self.models[c.name].prob_volume(volume, rate)
+                for c, volume, rate in zip(
+                    self.sim.clusters, state.volumes, rates
+                )
             ]
         else:
             probs = [
@@ -116,8 +124,10 @@ class PrizeCollectingStrategy:
                 # moment. This is based on the number of arrivals that have
                 # already happened (certainty) plus the rate of arrivals that
                 # will likely happen over the next 24 hours.
-                self.models[id(c)].prob_arrivals(c.num_arrivals, sum(c.rates))
-                for c in self.sim.clusters
+                self.models[c.name].prob_arrivals(num_arrivals, rate)
+                for c, num_arrivals, rate in zip(
+                    self.sim.clusters, state.num_arrivals, rates
+                )
             ]
 
         prizes = [int(self.rho * prob) for prob in probs]
@@ -169,7 +179,7 @@ class PrizeCollectingStrategy:
                 # the index returned by PyVRP.
                 [idx - 1 for route in routes for idx in route],
                 name2vehicle[name],
-                event.time + timedelta(seconds=routes[0].start_time()),
+                event.time + routes[0].start_time(),
             )
             for name, routes in name2routes.items()
         ]
@@ -180,5 +190,5 @@ class PrizeCollectingStrategy:
             num_arrivals = event.num_arrivals
             has_overflow = event.volume > cluster.capacity
 
-            model = self.models[id(cluster)]
+            model = self.models[cluster.name]
             model.observe(num_arrivals, has_overflow)
@@ -8,6 +8,8 @@ class RandomStrategy:
     Random routing and dispatch strategy.
     """
 
+    observes = ()  # this strategy does not observe any events
+
     def __init__(self, sim: Simulator, clusters_per_route: int, **kwargs):
         if clusters_per_route < 0:
             raise ValueError("Expected clusters_per_route >= 0.")
@@ -18,7 +20,7 @@ class RandomStrategy:
     def plan(self, event: ShiftPlanEvent) -> list[Route]:
         # We select randomly from clusters with arrivals, favouring those
         # with more arrivals.
-        arrivals = [c.num_arrivals for c in self.sim.clusters]
+        arrivals = self.sim.state.num_arrivals
         clusters = self.sim.generator.choice(
             np.arange(len(self.sim.clusters)),
             size=(len(self.sim.vehicles), self.clusters_per_route),
@@ -13,6 +13,13 @@ if TYPE_CHECKING:
 
 
 class Strategy(Protocol):
+    # Event types this strategy observes. The simulator only passes events of
+    # these types to ``observe()``, and skips all other events. An empty tuple
+    # means the strategy does not observe any events. Strategies that do not
+    # declare this observe all events.
+    @property
+    def observes(self) -> tuple[type[Event], ...]:
+        pass
 
     # Should be able to take arbitrary arguments, some of which may be
     # discarded. This makes it much easier to work with the strategies from